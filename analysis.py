@@ -0,0 +1,177 @@
+"""Headless TradeSense analysis: indicators, company profile and the educational recommendation.
+
+Everything here is a pure function of price history and the yfinance `info`
+dict, so it runs the same inside the Streamlit page, batch jobs and workers.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from indicators import IndicatorGraph
+from rules import CAUTIOUS, EXPLORE, OBSERVE, RSI_OVERBOUGHT, RSI_OVERSOLD, sector_pe_for
+
+EMOJI = {EXPLORE: "🔎", CAUTIOUS: "⚠️", OBSERVE: "👀"}
+RULE_INDICATORS = ("SMA50", "SMA200", "RSI14")
+GRAPH_CACHE_SIZE = 32
+
+
+@dataclass
+class Recommendation:
+    ticker: str
+    recommendation: str
+    emoji: str
+    price: float
+    sma50: float = None
+    sma200: float = None
+    rsi14: float = None
+    pe_ratio: float = None
+    sector: str = "N/A"
+    sector_pe: float = None
+    reasons: list = field(default_factory=list)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def data_version(df):
+    """Cheap fingerprint of a price frame: changes when bars are added or the last bar moves."""
+    if df.empty:
+        return (0,)
+    return (len(df), df.index[0], df.index[-1], float(df['Close'].iloc[-1]))
+
+
+# ---- Indicators: one lazy graph per (key, data version), shared across reruns and sessions ----
+_graphs = OrderedDict()
+_graphs_lock = threading.Lock()
+
+
+def indicator_graph(df, key=None):
+    """Memoized IndicatorGraph over `df`; `key` (e.g. the ticker) keeps equal-looking frames apart."""
+    version = (key, data_version(df))
+    with _graphs_lock:
+        graph = _graphs.get(version)
+        if graph is not None:
+            _graphs.move_to_end(version)
+            return graph
+    graph = IndicatorGraph.from_frame(df)
+    with _graphs_lock:
+        graph = _graphs.setdefault(version, graph)
+        while len(_graphs) > GRAPH_CACHE_SIZE:
+            _graphs.popitem(last=False)
+    return graph
+
+
+def add_indicators(df, names=RULE_INDICATORS, key=None):
+    """Copy of an OHLCV frame with a column per indicator in `names` (SMA50, SMA200 and RSI14 by default).
+
+    Only indicators not already in `df` are evaluated, on the graph shared
+    through `indicator_graph(df, key)`.
+    """
+    missing = [name for name in dict.fromkeys(names) if name not in df]
+    if not missing:
+        return df
+    graph = indicator_graph(df, key)
+    df = df.copy()
+    for name in missing:
+        df[name] = graph[name]
+    return df
+
+
+def company_profile(info, ticker):
+    """Pick the company profile fields shown on the analysis page out of a yfinance `info` dict."""
+    hq = info.get('city', '') + (', ' + info.get('state', '') if info.get('state') else '')
+    founded = info.get('startDate', None)
+    return {
+        "long_name": info.get('longName', ticker),
+        "business_summary": info.get('longBusinessSummary', None),
+        "ceo": (info.get('companyOfficers') or [{}])[0].get('name', None),
+        "market_cap": info.get('marketCap', None),
+        "dividend_yield": info.get('dividendYield', None),
+        "headquarters": hq.strip(', ') or None,
+        "founded": pd.to_datetime(founded, unit='s').year if founded else None,
+        "website": info.get('website', None),
+    }
+
+
+# ---- Helper: Human Readable Large Numbers -----
+def human_format(num):
+    if not num or num == 0:
+        return "N/A"
+    for unit in ['','K','M','B','T']:
+        if abs(num) < 1000.0:
+            return f"{num:3.1f}{unit}"
+        num /= 1000.0
+    return f"{num:.1f}P"
+
+
+def _latest(df, column):
+    value = df[column].iloc[-1]
+    return None if np.isnan(value) else float(value)
+
+
+def analyze(ticker, history, info):
+    """Apply the SMA / P/E / RSI rule to the latest bar of `history`.
+
+    `history` needs a Close column; indicator columns already present (e.g.
+    computed on a longer window before slicing) are used as-is.
+    """
+    history = add_indicators(history, RULE_INDICATORS, key=ticker)
+    price = float(history['Close'].iloc[-1])
+    pe_ratio = info.get('trailingPE', None)
+    sector = info.get('sector', 'N/A')
+    sector_pe_avg = sector_pe_for(sector)
+
+    reasons = []
+    # Use latest available SMAs for logic
+    latest_sma_50 = _latest(history, 'SMA50')
+    latest_sma_200 = _latest(history, 'SMA200')
+
+    if latest_sma_50 and price > latest_sma_50:
+        reasons.append("The stock price is above its 50-day moving average (positive momentum).")
+    else:
+        reasons.append("The stock price is below its 50-day moving average (caution).")
+
+    if latest_sma_200 and price > latest_sma_200:
+        reasons.append("The stock price is above its 200-day moving average (long-term strength).")
+    elif latest_sma_200:
+        reasons.append("The stock price is below its 200-day moving average (long-term caution).")
+
+    if pe_ratio is not None:
+        if pe_ratio < sector_pe_avg:
+            reasons.append(f"The P/E ratio ({pe_ratio:.1f}) is below the sector average ({sector_pe_avg}).")
+        else:
+            reasons.append(f"The P/E ratio ({pe_ratio:.1f}) is above the sector average ({sector_pe_avg}).")
+    else:
+        reasons.append("P/E ratio not available.")
+
+    latest_rsi = float(history['RSI14'].iloc[-1])
+    if latest_rsi >= RSI_OVERBOUGHT:
+        reasons.append(f"RSI is {latest_rsi:.0f}: This stock may be overbought.")
+    elif latest_rsi <= RSI_OVERSOLD:
+        reasons.append(f"RSI is {latest_rsi:.0f}: This stock may be oversold.")
+    else:
+        reasons.append(f"RSI is {latest_rsi:.0f}: No overbought or oversold signal.")
+
+    if (latest_sma_50 and price > latest_sma_50) and pe_ratio is not None and pe_ratio < sector_pe_avg:
+        rec = EXPLORE
+    elif (latest_sma_50 and price < latest_sma_50) and pe_ratio is not None and pe_ratio > sector_pe_avg:
+        rec = CAUTIOUS
+    else:
+        rec = OBSERVE
+
+    return Recommendation(
+        ticker=ticker,
+        recommendation=rec,
+        emoji=EMOJI[rec],
+        price=price,
+        sma50=latest_sma_50,
+        sma200=latest_sma_200,
+        rsi14=None if np.isnan(latest_rsi) else latest_rsi,
+        pe_ratio=pe_ratio,
+        sector=sector,
+        sector_pe=sector_pe_avg,
+        reasons=reasons,
+    )
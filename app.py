@@ -1,15 +1,13 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import requests
 import os
-import ta  # Technical Analysis library
+import time
+import uuid
+
+from assets import load_logo
 
 # --------- MOBILE/BRAND CSS POLISH ---------
-st.set_page_config(page_title="TradeSense (Educational Only)", page_icon="logo/TradeSense transparent.png")
-st.image("logo/TradeSense transparent.png", width=80)
+st.set_page_config(page_title="TradeSense (Educational Only)", page_icon=load_logo())
+st.image(load_logo(), width=80)
 
 st.markdown(
     """
@@ -63,7 +61,7 @@ st.sidebar.markdown(
     "<h2 style='color:#0f8cff; font-family:sans-serif;'>TradeSense</h2>",
     unsafe_allow_html=True,
 )
-st.sidebar.image("logo/TradeSense transparent.png", width=60)
+st.sidebar.image(load_logo(), width=60)
 
 st.sidebar.markdown("---")
 st.sidebar.header("About TradeSense")
@@ -75,360 +73,371 @@ st.sidebar.write(
 st.sidebar.markdown("---")
 st.sidebar.header("📈 My Mock Portfolio")
 
-# ===== Mock Portfolio Simulator (Session State) =====
-if "portfolio" not in st.session_state:
-    st.session_state.portfolio = {}
-if "cash" not in st.session_state:
-    st.session_state.cash = 10000.0  # Start with $10,000
-
-add_ticker = st.sidebar.text_input("Add Ticker (e.g. AAPL)").strip().upper()
-add_qty = st.sidebar.number_input("Quantity", min_value=1, max_value=10000, value=1, step=1)
-if st.sidebar.button("Buy (Add)"):
-    if add_ticker:
-        # Get latest price
+# ===== Data & analysis modules =====
+# Imported only once the header is on screen: on a cold worker these imports
+# (pandas, NumPy and the data layer) dominate time to first paint. yfinance
+# and Plotly are deferred further, to the first fetch and the first chart.
+import pandas as pd  # noqa: E402
+
+from analysis import add_indicators, analyze, company_profile, data_version, human_format  # noqa: E402
+from bar_cache import period_start  # noqa: E402
+from charts import (  # noqa: E402
+    CANDLESTICK, DEFAULT_OVERLAYS, LINE, OVERLAYS, PANELS, POINT_BUDGET,
+    cached_figure, indicator_columns, panel_figure, price_figure,
+)
+from intraday import INTERVALS, intraday_bars  # noqa: E402
+from ledger import Ledger  # noqa: E402
+import metrics  # noqa: E402
+from market_cache import get_closes, get_history, get_info, get_latest_prices, stale_since  # noqa: E402
+from news import get_news  # noqa: E402
+from poller import get_poller  # noqa: E402
+from risk import (  # noqa: E402
+    CONFIDENCE, ROLLING_WINDOW, returns_matrix, risk_report, rolling_average_correlation, rolling_risk,
+)
+from sentiment import score_headlines  # noqa: E402
+from symbols import get_index  # noqa: E402
+
+# ===== Mock Portfolio Simulator (Ledger persisted to SQLite) =====
+# The portfolio id lives in the URL, so reloading the page reopens the same portfolio
+if "portfolio" not in st.query_params:
+    st.query_params["portfolio"] = uuid.uuid4().hex[:12]
+portfolio_id = st.query_params["portfolio"]
+if st.session_state.get("portfolio_id") != portfolio_id:
+    st.session_state.portfolio_id = portfolio_id
+    st.session_state.ledger = Ledger.open(portfolio_id)  # Starts with $10,000
+
+# Prometheus / log exporters, if configured through the environment
+metrics.start_exporter()
+
+# Holdings are valued from the background poller's snapshot, never fetched inline
+poller = get_poller()
+poller.register(portfolio_id, st.session_state.ledger.positions().index)
+
+def latest_price_for(tkr):
+    """Last known price for `tkr`, or None if it cannot be priced right now (never a $0 fallback)."""
+    price = poller.snapshot().get(tkr)
+    if price is None:
+        # Not polled yet (e.g. a ticker just typed into Buy): one coalesced bulk lookup
+        with metrics.span("portfolio.quote", ticker=tkr):
+            price = get_latest_prices([tkr]).get(tkr, float("nan"))
+        poller.publish({tkr: price})
+    return None if price != price else float(price)
+
+# ---- Risk analytics: one bulk history load for every holding ----
+RISK_PERIOD = "5y"
+
+def risk_section(holdings):
+    with metrics.span("portfolio.risk.history"):
+        closes = get_closes(holdings.index, RISK_PERIOD)
+    if len(closes) < 2:
+        st.caption("Not enough price history yet for risk analytics.")
+        return
+    held = holdings.reindex(closes.columns)
+    prices = pd.Series(poller.prices_for(closes.columns), index=closes.columns)
+    prices = prices.fillna(closes.ffill().iloc[-1])
+    with metrics.span("portfolio.risk.compute", holdings=len(closes.columns)):
+        report = risk_report(closes, held.to_numpy(), prices.to_numpy())
+    level = f"{CONFIDENCE:.0%}"
+    st.write(f"**Annualized Volatility:** {report['volatility']:.1%}")
+    st.write(f"**1-day VaR ({level}, historical):** ${report['historical_var_usd']:,.2f}")
+    st.write(f"**1-day VaR ({level}, parametric):** ${report['parametric_var_usd']:,.2f}")
+    st.write(f"**Max Drawdown ({RISK_PERIOD}):** {report['max_drawdown']:.1%}")
+    st.caption("Drawdown")
+    st.line_chart(report["drawdown"], height=150)
+    st.caption(f"Rolling {ROLLING_WINDOW}-day volatility and VaR")
+    st.line_chart(rolling_risk(report["returns"]), height=180)
+    if len(closes.columns) > 1:
+        with metrics.span("portfolio.risk.rolling_correlation", holdings=len(closes.columns)):
+            avg_corr = rolling_average_correlation(returns_matrix(closes))
+        st.caption(f"Rolling {ROLLING_WINDOW}-day average correlation between holdings")
+        st.line_chart(pd.Series(avg_corr, index=closes.index[1:], name="Avg Correlation"), height=150)
+        with st.expander("Correlation matrix"):
+            st.dataframe(report["correlation"].round(2))
+
+# Runs as a fragment: Buy / Sell / Reset clicks only re-execute the portfolio,
+# not the stock analysis in the main panel
+@st.fragment
+def portfolio_panel():
+    ledger = st.session_state.ledger
+    add_query = st.text_input("Add Ticker (e.g. AAPL or Apple)").strip()
+    # Resolved against the local symbol index: unknown names never reach the quote provider
+    add_ticker = get_index().resolve(add_query) if add_query else None
+    if add_ticker and add_ticker != add_query.upper():
+        st.caption(f"→ {add_ticker} ({get_index().name(add_ticker)})")
+    add_qty = st.number_input("Quantity", min_value=1, max_value=10000, value=1, step=1)
+    if st.button("Buy (Add)"):
+        if add_ticker:
+            latest_price = latest_price_for(add_ticker)
+            total_cost = (latest_price or 0.0) * add_qty
+
+            if latest_price is None:
+                st.warning(f"Could not fetch a price for {add_ticker}; market data may be temporarily unavailable.")
+            elif total_cost > ledger.cash:
+                st.warning(f"Not enough cash! You need ${total_cost:,.2f}, but only have ${ledger.cash:,.2f}.")
+            else:
+                ledger.record(add_ticker, add_qty, latest_price)
+                poller.register(portfolio_id, ledger.positions().index)
+                st.success(f"Bought {add_qty} {add_ticker} at ${latest_price:.2f} each (${total_cost:,.2f}).")
+        elif add_query:
+            st.warning(f"'{add_query}' is not a NASDAQ-listed symbol or company name.")
+
+    # Show portfolio table and value
+    holdings = ledger.positions()
+    if not holdings.empty:
         try:
-            latest_price = yf.Ticker(add_ticker).history(period="1d")['Close'][-1]
+            with metrics.span("portfolio.valuation", holdings=len(holdings)):
+                port_df = ledger.summary(dict(zip(holdings.index, poller.prices_for(holdings.index))))
+            st.dataframe(port_df, hide_index=True)
+            st.write(f"**Total Portfolio Value: ${port_df['Market Value'].sum():,.2f}**")
+            st.write(f"**Unrealized P&L:** ${port_df['Unrealized P&L'].sum():,.2f}")
+            if port_df["Latest Price"].isna().any():
+                st.caption("Some prices are still loading and are left out of the total.")
+            elif poller.is_stale():
+                st.caption(f"⚠️ Market data is delayed: prices as of "
+                           f"{time.strftime('%H:%M:%S', time.localtime(poller.updated_at))}")
+            elif poller.updated_at:
+                st.caption(f"Prices as of {time.strftime('%H:%M:%S', time.localtime(poller.updated_at))}")
         except Exception:
-            latest_price = 0
-        total_cost = latest_price * add_qty
-
-        if total_cost == 0:
-            st.sidebar.warning(f"Could not fetch price for {add_ticker}.")
-        elif total_cost > st.session_state.cash:
-            st.sidebar.warning(f"Not enough cash! You need ${total_cost:,.2f}, but only have ${st.session_state.cash:,.2f}.")
-        else:
-            st.session_state.portfolio.setdefault(add_ticker, 0)
-            st.session_state.portfolio[add_ticker] += add_qty
-            st.session_state.cash -= total_cost
-            st.sidebar.success(f"Bought {add_qty} {add_ticker} at ${latest_price:.2f} each (${total_cost:,.2f}).")
-
-# Show portfolio table and value
-if st.session_state.portfolio:
-    port_df = pd.DataFrame(list(st.session_state.portfolio.items()), columns=["Ticker", "Quantity"])
-    try:
-        # Get latest prices
-        prices = {}
-        for tkr in st.session_state.portfolio.keys():
-            try:
-                prices[tkr] = yf.Ticker(tkr).history(period="1d")['Close'][-1]
-            except Exception:
-                prices[tkr] = 0
-        port_df["Latest Price"] = port_df["Ticker"].map(prices)
-        port_df["Market Value"] = port_df["Quantity"] * port_df["Latest Price"]
-        st.sidebar.dataframe(port_df, hide_index=True)
-        st.sidebar.write(f"**Total Portfolio Value: ${port_df['Market Value'].sum():,.2f}**")
-    except Exception:
-        st.sidebar.dataframe(port_df, hide_index=True)
-        st.sidebar.write("Error fetching prices.")
-
-    # Sell logic
-    sell_ticker = st.sidebar.selectbox("Sell Ticker", [""] + list(st.session_state.portfolio.keys()))
-    sell_qty = st.sidebar.number_input("Sell Quantity", min_value=1, max_value=10000, value=1, step=1, key="sell_qty")
-    if st.sidebar.button("Sell"):
-        if sell_ticker and sell_ticker in st.session_state.portfolio:
-            try:
-                latest_price = yf.Ticker(sell_ticker).history(period="1d")['Close'][-1]
-            except Exception:
-                latest_price = 0
-            sell_qty_final = min(sell_qty, st.session_state.portfolio[sell_ticker])
-            st.session_state.portfolio[sell_ticker] -= sell_qty_final
-            st.session_state.cash += sell_qty_final * latest_price
-            if st.session_state.portfolio[sell_ticker] <= 0:
-                del st.session_state.portfolio[sell_ticker]
-            st.sidebar.success(f"Sold {sell_qty_final} {sell_ticker} at ${latest_price:.2f} each (${sell_qty_final * latest_price:,.2f}).")
-else:
-    st.sidebar.info("Your mock portfolio is empty. Add stocks above!")
-
-st.sidebar.write(f"**Cash Remaining:** ${st.session_state.cash:,.2f}")
+            st.dataframe(holdings.rename("Quantity").rename_axis("Ticker").reset_index(), hide_index=True)
+            st.write("Error fetching prices.")
+
+        if st.toggle("Show risk analytics"):
+            risk_section(holdings)
+
+        # Sell logic
+        sell_ticker = st.selectbox("Sell Ticker", [""] + list(holdings.index))
+        sell_qty = st.number_input("Sell Quantity", min_value=1, max_value=10000, value=1, step=1, key="sell_qty")
+        if st.button("Sell"):
+            if sell_ticker and sell_ticker in holdings.index:
+                latest_price = latest_price_for(sell_ticker)
+                sell_qty_final = min(sell_qty, ledger.position(sell_ticker))
+                if latest_price is None:
+                    st.warning(f"Could not fetch a price for {sell_ticker}, so nothing was sold. Try again shortly.")
+                else:
+                    ledger.record(sell_ticker, -sell_qty_final, latest_price)
+                    poller.register(portfolio_id, ledger.positions().index)
+                    st.success(f"Sold {sell_qty_final:g} {sell_ticker} at ${latest_price:.2f} each (${sell_qty_final * latest_price:,.2f}).")
+    else:
+        st.info("Your mock portfolio is empty. Add stocks above!")
 
-st.sidebar.markdown("---")
-if st.sidebar.button("🔄 Reset Portfolio & Cash"):
-    st.session_state.portfolio = {}
-    st.session_state.cash = 10000.0
-    st.sidebar.success("Portfolio and cash reset!")
+    st.write(f"**Cash Remaining:** ${ledger.cash:,.2f}")
+    if ledger.n:
+        st.write(f"**Realized P&L:** ${ledger.realized_pnl():,.2f}")
+        with st.expander("Trade history"):
+            st.dataframe(ledger.trades().iloc[::-1], hide_index=True)
 
-# ===== MAIN APP =====
+    st.markdown("---")
+    if st.button("🔄 Reset Portfolio & Cash"):
+        ledger.reset(10000.0)
+        poller.register(portfolio_id, [])
+        st.success("Portfolio and cash reset!")
 
-# ---- Helper: Human Readable Large Numbers -----
-def human_format(num):
-    if not num or num == 0:
-        return "N/A"
-    for unit in ['','K','M','B','T']:
-        if abs(num) < 1000.0:
-            return f"{num:3.1f}{unit}"
-        num /= 1000.0
-    return f"{num:.1f}P"
-
-# ---- Simple Sentiment Function ----
-def get_sentiment(text):
-    positive_keywords = [
-        "surge", "soar", "beats", "record", "growth", "profit", "acquire", "win", "rises", "gains",
-        "up", "tops", "outperform", "strong", "raises", "expands", "positive", "improves"
-    ]
-    negative_keywords = [
-        "slump", "drops", "lawsuit", "misses", "loss", "decline", "falls", "drops", "down",
-        "warning", "recall", "layoff", "cuts", "negative", "disappoint", "miss"
-    ]
-    text_lower = text.lower()
-    if any(word in text_lower for word in positive_keywords):
-        return "🟢 Positive"
-    elif any(word in text_lower for word in negative_keywords):
-        return "🔴 Negative"
-    else:
-        return "🟡 Neutral"
+with st.sidebar:
+    portfolio_panel()
 
-# ----- News Fetching Function -----
-def get_news(ticker, api_key):
-    url = (
-        f"https://newsapi.org/v2/everything?"
-        f"q={ticker}&language=en&sortBy=publishedAt&pageSize=5&apiKey={api_key}"
-    )
-    try:
-        response = requests.get(url)
-        data = response.json()
-        if data.get("status") == "ok":
-            return data["articles"]
-        else:
-            return []
-    except Exception:
-        return []
+# ===== MAIN APP =====
 
 # ----- Timeframes Map -----
 timeframes = {
     "1 Month": "1mo",
     "6 Months": "6mo",
     "1 Year": "1y",
-    "2 Years": "2y"
+    "2 Years": "2y",
+    # Intraday bars, all resampled from one 1-minute stream (see intraday.py)
+    "Intraday · 1 Minute": "1m",
+    "Intraday · 5 Minutes": "5m",
+    "Intraday · 15 Minutes": "15m",
+    "Intraday · 1 Hour": "1h",
 }
 
-# ===== Ticker Input & Selection =====
-st.markdown("---")
-st.header("🔍 Analyze a Stock")
-ticker = st.text_input("NASDAQ Stock Ticker (e.g. AAPL, TSLA, MSFT)").strip().upper()
-timeframe = st.selectbox(
-    "Select timeframe for analysis:",
-    list(timeframes.keys()),
-    index=1
-)
-period = timeframes[timeframe]
+# ----- Price History: fetched once per ticker, sliced per timeframe -----
+# Widest timeframe (2y) plus enough lookback to warm up SMA200 in every view
+HISTORY_PERIOD = "5y"
+
+# ---- Chart section: chart-type and rendering widgets only rerun this fragment ----
+# `bars` is the full daily history (sliced here, after indicator warm-up) or the intraday bars
+@st.fragment
+def chart_section(ticker, period, bars):
+    st.markdown("---")
+    st.header("📊 Price Trend & Technical Indicators")
+    chart_type = st.selectbox(
+        "Choose chart type", 
+        (CANDLESTICK, LINE)
+    )
 
-if ticker:
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        df = stock.history(period=period)
+    overlays = st.multiselect("Overlays", list(OVERLAYS), default=DEFAULT_OVERLAYS)
+    panels = st.multiselect(
+        "Indicator panels", list(PANELS),
+        default=["RSI 14"] if chart_type == LINE else [], key=f"panels-{chart_type}"
+    )
 
-        if df.empty:
-            st.warning("No historical data found for this ticker.")
-        else:
-            # ---- COMPANY PROFILE & METRICS ----
-            st.markdown("---")
-            st.header("🏢 Company Profile & Key Metrics")
-            long_name = info.get('longName', ticker)
-            business_summary = info.get('longBusinessSummary', None)
-            ceo = info.get('companyOfficers', [{}])[0].get('name', None)
-            market_cap = info.get('marketCap', None)
-            dividend_yield = info.get('dividendYield', None)
-            hq = info.get('city', '') + (', ' + info.get('state', '') if info.get('state') else '')
-            founded = info.get('startDate', None)
-            website = info.get('website', None)
-
-            col1, col2 = st.columns([2,2])
-
-            with col1:
-                if business_summary:
-                    st.write(f"**Description:** {business_summary}")
-                if ceo:
-                    st.write(f"**CEO:** {ceo}")
-                if market_cap:
-                    st.write(f"**Market Cap:** {human_format(market_cap)} USD")
-                if dividend_yield:
-                    st.write(f"**Dividend Yield:** {dividend_yield*100:.2f}%")
-            with col2:
-                if hq.strip(', '):
-                    st.write(f"**Headquarters:** {hq.strip(', ')}")
-                if founded:
-                    st.write(f"**Founded:** {pd.to_datetime(founded, unit='s').year}")
-                if website:
-                    st.write(f"**Website:** [{website}]({website})")
-
-            # ---- TECHNICAL EXPLANATIONS ----
-            st.info("**SMA:** Simple Moving Average. Shows price trends over a set period.")
-            st.info("**RSI:** Relative Strength Index (14 days). Measures recent price momentum; above 70 = overbought, below 30 = oversold.")
-            st.info("**P/E Ratio:** Price to Earnings. Compares stock price to company earnings; a basic value indicator.")
-
-            # ---- Calculate Indicators ----
-            close = df['Close']
-            price = close.iloc[-1]
-            pe_ratio = info.get('trailingPE', None)
-            sector = info.get('sector', 'N/A')
-
-            # SMAs
-            df['SMA50'] = close.rolling(window=50).mean()
-            df['SMA200'] = close.rolling(window=200).mean()
-
-            # RSI (14-period)
-            df['RSI14'] = ta.momentum.RSIIndicator(close, window=14).rsi()
-
-            # Sector P/E averages (static for demo; can use dynamic API later)
-            sector_pe_map = {
-                "Technology": 28,
-                "Healthcare": 20,
-                "Financial Services": 14,
-                "Consumer Cyclical": 25,
-                "Industrials": 20,
-                "Energy": 12,
-                "Consumer Defensive": 19,
-                "Communication Services": 18,
-                "Utilities": 16,
-                "Real Estate": 18,
-                "Basic Materials": 15,
-                "N/A": 20
-            }
-            sector_pe_avg = sector_pe_map.get(sector, 20)
-
-            # ---- Show Chart ----
-            st.markdown("---")
-            st.header("📊 Price Trend & Technical Indicators")
-            chart_type = st.selectbox(
-                "Choose chart type", 
-                ("Candlestick with SMAs", "Line Chart with SMAs & RSI")
+    fast_charts = st.checkbox(
+        "Fast charts (downsample long histories)", value=True,
+        help=f"Draws at most {POINT_BUDGET} points per trace using WebGL."
+    )
+    intraday = period in INTERVALS
+    # Only the indicators drawn below are computed, memoized per data version
+    needed = indicator_columns(overlays, panels)
+    with metrics.span("analysis.indicators", ticker=ticker, indicators=len(needed)):
+        df = add_indicators(bars, needed, key=(ticker, period) if intraday else ticker)
+    if not intraday:
+        df = df[df.index >= period_start(period)]
+    point_budget = POINT_BUDGET if fast_charts else len(df)
+    version = data_version(df)
+
+    with metrics.span("analysis.chart", ticker=ticker, chart=chart_type):
+        fig = cached_figure(
+            (ticker, period, chart_type, tuple(overlays), point_budget, version),
+            lambda: price_figure(df, chart_type, point_budget, intraday, overlays)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    for panel in panels:
+        st.markdown(f"#### {panel}")
+        with metrics.span("analysis.chart", ticker=ticker, chart=panel):
+            fig_panel = cached_figure(
+                (ticker, period, panel, point_budget, version),
+                lambda: panel_figure(df, panel, point_budget, intraday)
             )
+            st.plotly_chart(fig_panel, use_container_width=True)
 
-            if chart_type == "Candlestick with SMAs":
-                fig = go.Figure()
-                fig.add_trace(go.Candlestick(
-                    x=df.index,
-                    open=df['Open'],
-                    high=df['High'],
-                    low=df['Low'],
-                    close=df['Close'],
-                    name='Candlestick'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df['SMA50'],
-                    line=dict(color='royalblue', width=2), name='SMA 50'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df['SMA200'],
-                    line=dict(color='orange', width=2), name='SMA 200'
-                ))
-                fig.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Price (USD)",
-                    template="plotly_white",
-                    height=500
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df['Close'], mode='lines', name='Close Price'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df['SMA50'],
-                    line=dict(color='royalblue', width=2), name='SMA 50'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df['SMA200'],
-                    line=dict(color='orange', width=2), name='SMA 200'
-                ))
-                fig.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Price (USD)",
-                    template="plotly_white",
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-                # RSI Chart
-                st.markdown("#### Relative Strength Index (RSI 14)")
-                fig_rsi = go.Figure()
-                fig_rsi.add_trace(go.Scatter(
-                    x=df.index, y=df['RSI14'], mode='lines', name='RSI 14'
-                ))
-                fig_rsi.add_hline(y=70, line_dash="dot", line_color="red", annotation_text="Overbought", annotation_position="top left")
-                fig_rsi.add_hline(y=30, line_dash="dot", line_color="green", annotation_text="Oversold", annotation_position="bottom left")
-                fig_rsi.update_layout(
-                    yaxis_title="RSI",
-                    template="plotly_white",
-                    height=250
-                )
-                st.plotly_chart(fig_rsi, use_container_width=True)
-
-            # ---- Display News Headlines with Sentiment, in Expander ----
-            st.markdown("---")
-            st.header("📰 Latest News Headlines")
-            news_api_key = os.environ.get("NEWS_API_KEY")
-            with st.expander("Click to expand/collapse news"):
-                if news_api_key:
-                    news = get_news(ticker, news_api_key)
-                    if news:
-                        for article in news:
-                            sentiment = get_sentiment(article['title'])
-                            st.markdown(
-                                f"- **{sentiment}** &nbsp; [{article['title']}]({article['url']}) "
-                                f"<span style='font-size: 0.8em;'>({article['source']['name']})</span>",
-                                unsafe_allow_html=True
-                            )
-                    else:
-                        st.info("No recent news found for this stock.")
-                else:
-                    st.info("Add your NewsAPI.org key to an environment variable named `NEWS_API_KEY` to see latest headlines here.")
-
-            # ---- Recommendation Logic ----
-            st.markdown("---")
-            st.header("🎯 Educational Recommendation")
-            reasons = []
-            # Use latest available SMAs for logic
-            latest_sma_50 = df['SMA50'].iloc[-1] if not np.isnan(df['SMA50'].iloc[-1]) else None
-            latest_sma_200 = df['SMA200'].iloc[-1] if not np.isnan(df['SMA200'].iloc[-1]) else None
-
-            if latest_sma_50 and price > latest_sma_50:
-                reasons.append("The stock price is above its 50-day moving average (positive momentum).")
-            else:
-                reasons.append("The stock price is below its 50-day moving average (caution).")
-
-            if latest_sma_200 and price > latest_sma_200:
-                reasons.append("The stock price is above its 200-day moving average (long-term strength).")
-            elif latest_sma_200:
-                reasons.append("The stock price is below its 200-day moving average (long-term caution).")
 
-            if pe_ratio is not None:
-                if pe_ratio < sector_pe_avg:
-                    reasons.append(f"The P/E ratio ({pe_ratio:.1f}) is below the sector average ({sector_pe_avg}).")
-                else:
-                    reasons.append(f"The P/E ratio ({pe_ratio:.1f}) is above the sector average ({sector_pe_avg}).")
+# ===== Ticker Input & Selection =====
+# The analysis panel is its own fragment so sidebar interactions never re-run it
+@st.fragment
+def analysis_panel():
+    st.markdown("---")
+    st.header("🔍 Analyze a Stock")
+    query = st.text_input("NASDAQ Stock Ticker or company name (e.g. AAPL, Tesla, MSFT)").strip()
+    ticker = ""
+    if query:
+        # Validated against the local symbol index before anything is fetched
+        symbols = get_index()
+        if symbols.accepts(query):
+            ticker = query.upper()
+        else:
+            matches = symbols.search(query)
+            if matches:
+                ticker = st.selectbox(
+                    "Matching NASDAQ listings",
+                    [symbol for symbol, _ in matches],
+                    format_func=lambda symbol: f"{symbol} — {symbols.name(symbol)}",
+                )
             else:
-                reasons.append("P/E ratio not available.")
+                st.warning(f"'{query}' is not a NASDAQ-listed symbol or company name.")
+    timeframe = st.selectbox(
+        "Select timeframe for analysis:",
+        list(timeframes.keys()),
+        index=1
+    )
+    period = timeframes[timeframe]
 
-            latest_rsi = df['RSI14'].iloc[-1]
-            if latest_rsi >= 70:
-                reasons.append(f"RSI is {latest_rsi:.0f}: This stock may be overbought.")
-            elif latest_rsi <= 30:
-                reasons.append(f"RSI is {latest_rsi:.0f}: This stock may be oversold.")
+    if ticker:
+        try:
+            with metrics.span("analysis.info", ticker=ticker):
+                info = get_info(ticker)
+            with metrics.span("analysis.history", ticker=ticker):
+                history = get_history(ticker, HISTORY_PERIOD)
+            if period in INTERVALS:
+                # The chart shows intraday bars; the profile and recommendation stay on daily bars
+                with metrics.span("analysis.intraday", ticker=ticker, interval=period):
+                    bars = intraday_bars(ticker, period)
+                df = history
             else:
-                reasons.append(f"RSI is {latest_rsi:.0f}: No overbought or oversold signal.")
-
-            # Decision with new wording
-            if (latest_sma_50 and price > latest_sma_50) and pe_ratio is not None and pe_ratio < sector_pe_avg:
-                rec = "Explore Further"
-                emoji = "🔎"
-            elif (latest_sma_50 and price < latest_sma_50) and pe_ratio is not None and pe_ratio > sector_pe_avg:
-                rec = "Be Cautious"
-                emoji = "⚠️"
+                bars = history
+                df = history[history.index >= period_start(period)]
+            # Upstream degraded: the shared cache is serving its last good copy
+            stale = stale_since([("info", ticker), ("history", ticker, HISTORY_PERIOD)])
+            if stale:
+                st.caption(f"⚠️ Market data is delayed: showing cached data from "
+                           f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(stale))}.")
+
+            if df.empty:
+                st.warning("No historical data found for this ticker.")
             else:
-                rec = "Observe"
-                emoji = "👀"
+                # ---- COMPANY PROFILE & METRICS ----
+                st.markdown("---")
+                st.header("🏢 Company Profile & Key Metrics")
+                profile = company_profile(info, ticker)
+
+                col1, col2 = st.columns([2,2])
+
+                with col1:
+                    if profile["business_summary"]:
+                        st.write(f"**Description:** {profile['business_summary']}")
+                    if profile["ceo"]:
+                        st.write(f"**CEO:** {profile['ceo']}")
+                    if profile["market_cap"]:
+                        st.write(f"**Market Cap:** {human_format(profile['market_cap'])} USD")
+                    if profile["dividend_yield"]:
+                        st.write(f"**Dividend Yield:** {profile['dividend_yield']*100:.2f}%")
+                with col2:
+                    if profile["headquarters"]:
+                        st.write(f"**Headquarters:** {profile['headquarters']}")
+                    if profile["founded"]:
+                        st.write(f"**Founded:** {profile['founded']}")
+                    if profile["website"]:
+                        st.write(f"**Website:** [{profile['website']}]({profile['website']})")
+
+                # ---- TECHNICAL EXPLANATIONS ----
+                st.info("**SMA:** Simple Moving Average. Shows price trends over a set period.")
+                st.info("**RSI:** Relative Strength Index (14 days). Measures recent price momentum; above 70 = overbought, below 30 = oversold.")
+                st.info("**P/E Ratio:** Price to Earnings. Compares stock price to company earnings; a basic value indicator.")
+
+                # ---- Show Chart ----
+                if bars.empty:
+                    st.warning("No intraday bars available for this ticker right now.")
+                else:
+                    chart_section(ticker, period, bars)
+
+                # ---- Display News Headlines with Sentiment, in Expander ----
+                st.markdown("---")
+                st.header("📰 Latest News Headlines")
+                news_api_key = os.environ.get("NEWS_API_KEY")
+                with st.expander("Click to expand/collapse news"):
+                    if news_api_key:
+                        with metrics.span("analysis.news", ticker=ticker):
+                            news = get_news(ticker, news_api_key)
+                        if news:
+                            with metrics.span("analysis.sentiment", headlines=len(news)):
+                                sentiments = score_headlines([article['title'] for article in news])["label"]
+                            for article, sentiment in zip(news, sentiments):
+                                st.markdown(
+                                    f"- **{sentiment}** &nbsp; [{article['title']}]({article['url']}) "
+                                    f"<span style='font-size: 0.8em;'>({article['source']['name']})</span>",
+                                    unsafe_allow_html=True
+                                )
+                        else:
+                            st.info("No recent news found for this stock.")
+                    else:
+                        st.info("Add your NewsAPI.org key to an environment variable named `NEWS_API_KEY` to see latest headlines here.")
+
+                # ---- Recommendation Logic ----
+                st.markdown("---")
+                st.header("🎯 Educational Recommendation")
+                with metrics.span("analysis.recommendation", ticker=ticker):
+                    result = analyze(ticker, history, info)
+
+                st.markdown(f"## Recommendation: {result.recommendation} {result.emoji}")
+                st.markdown("### Why?")
+                for reason in result.reasons:
+                    st.write(f"- {reason}")
+
+                st.caption(
+                    "This recommendation is for educational purposes only and is not financial advice. "
+                    "Always do your own research and consult a financial advisor before investing."
+                )
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
 
-            st.markdown(f"## Recommendation: {rec} {emoji}")
-            st.markdown("### Why?")
-            for reason in reasons:
-                st.write(f"- {reason}")
 
-            st.caption(
-                "This recommendation is for educational purposes only and is not financial advice. "
-                "Always do your own research and consult a financial advisor before investing."
-            )
-    except Exception as e:
-        st.error(f"An error occurred: {e}")
+analysis_panel()
+
+# ===== Debug: per-stage timings and cache counters (open the app with ?debug=1) =====
+if st.query_params.get("debug"):
+    with st.expander("🛠️ Debug: timings & cache"):
+        registry = metrics.registry()
+        st.caption("Latency over recent samples in this process (all sessions).")
+        st.dataframe(registry.stage_summary().round(2), hide_index=True)
+        st.dataframe(registry.counters(), hide_index=True)
+        st.download_button("Download Prometheus metrics", registry.prometheus(), file_name="tradesense.prom")
@@ -0,0 +1,10 @@
+"""Static assets, read from disk once per process and shared by every session and page."""
+import streamlit as st
+
+LOGO_PATH = "logo/TradeSense transparent.png"
+
+
+@st.cache_resource
+def load_logo():
+    with open(LOGO_PATH, "rb") as f:
+        return f.read()
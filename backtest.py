@@ -0,0 +1,203 @@
+"""Vectorized backtest of the TradeSense recommendation rule.
+
+The rule becomes a boolean signal matrix over (tickers x bars): hold a stock
+while its close is above its SMA and its P/E is below the sector average
+(the "Explore Further" condition), optionally skipping entries when RSI is
+above a threshold. A signal seen at one bar's close is traded at the next
+bar's close, transaction costs are charged on every change, and each ticker
+is an equal-weight sleeve.
+Everything runs as whole-array NumPy operations; parameter sweeps fan out
+across a process pool; with `--store` the workers map the close matrix from
+the price store instead of receiving a pickled copy.
+
+Historical P/E is not available from yfinance, so the current trailing P/E
+is applied over the whole history.
+
+    python backtest.py --tickers-file tickers.txt --period 10y --sma 20,50,100 --rsi-max 70,100
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import period_start
+from fundamentals import FundamentalsStore
+from indicators import rsi, sma
+from price_store import PriceStore, StoreView
+from rules import sector_pe_for
+from screener import load_universe_data, report_skipped
+
+BARS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    sma_window: int = 50
+    rsi_window: int = 14
+    rsi_max: float = 100.0  # block entries when RSI >= rsi_max; 100 disables the filter (the app's rule)
+    use_pe: bool = True
+    cost_bps: float = 10.0
+
+
+def signal_matrix(close, pe, sector_pe, params):
+    """Boolean (tickers x bars) matrix: True where the rule says to hold as of that bar's close.
+
+    The RSI cap only gates entries: a position opened while RSI < rsi_max is
+    held for as long as the trend / P/E condition lasts, whatever RSI does.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    trend = close > sma(close, params.sma_window)
+    signal = trend
+    if params.use_pe:
+        pe = np.asarray(pe, dtype=np.float64)
+        cheap = np.isfinite(pe) & (pe < np.asarray(sector_pe, dtype=np.float64))
+        signal = signal & cheap[:, None]
+    if params.rsi_max < 100:
+        # Hold where an allowed entry happened since the condition last switched on
+        bars = np.arange(close.shape[-1])
+        entry = signal & (rsi(close, params.rsi_window) < params.rsi_max)
+        last_entry = np.maximum.accumulate(np.where(entry, bars, -1), axis=-1)
+        last_off = np.maximum.accumulate(np.where(signal, -1, bars), axis=-1)
+        signal = signal & (last_entry > last_off)
+    return signal
+
+
+def simulate(close, signal, cost_bps):
+    """Simulate next-bar execution of `signal`; returns per-bar portfolio returns and sleeve turnover.
+
+    A signal computed from bar t's close is filled at bar t+1's close and
+    earns from bar t+2 on, so no bar trades on a price it has not seen yet.
+    Tickers without a price at a bar are left out of that bar's equal weighting.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal, dtype=np.float64)
+    position = np.zeros_like(signal)
+    position[:, 1:] = signal[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = close[:, 1:] / close[:, :-1] - 1.0
+    held = position[:, :-1]
+    changes = np.abs(np.diff(position, axis=1, prepend=0.0))[:, :-1]
+    sleeve = held * returns - changes * cost_bps / 1e4
+    active = np.isfinite(returns)
+    sleeve = np.where(active, sleeve, 0.0)
+    counts = active.sum(axis=0)
+    portfolio = np.where(counts > 0, sleeve.sum(axis=0) / np.maximum(counts, 1), 0.0)
+    return portfolio, changes.sum()
+
+
+def performance(returns, trades=0, exposure=np.nan):
+    """Summary statistics for a series of per-bar portfolio returns."""
+    equity = np.cumprod(1.0 + returns)
+    years = len(returns) / BARS_PER_YEAR
+    total = equity[-1] - 1.0 if len(equity) else 0.0
+    vol = returns.std() * np.sqrt(BARS_PER_YEAR) if len(returns) else np.nan
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    return {
+        "total_return": total,
+        "cagr": (1.0 + total) ** (1.0 / years) - 1.0 if years > 0 and total > -1 else np.nan,
+        "volatility": vol,
+        "sharpe": returns.mean() * BARS_PER_YEAR / vol if vol else np.nan,
+        "max_drawdown": (equity / peak - 1.0).min() if len(equity) else 0.0,
+        "trades": int(trades),
+        "exposure": exposure,
+    }
+
+
+def run_backtest(close, pe, sector_pe, params=BacktestParams()):
+    """Backtest one parameter set; returns (stats dict, per-bar equity array)."""
+    signal = signal_matrix(close, pe, sector_pe, params)
+    returns, trades = simulate(close, signal, params.cost_bps)
+    stats = performance(returns, trades=trades, exposure=float(signal.mean()))
+    return stats, np.cumprod(1.0 + returns)
+
+
+# ---- Parameter sweeps ----
+_shared = {}
+
+
+def _init_worker(close, pe, sector_pe):
+    # The price matrix is shipped to each worker once, not once per parameter set;
+    # a StoreView is mapped from disk instead, sharing the pages between workers
+    if isinstance(close, StoreView):
+        close = close.load()
+    _shared.update(close=close, pe=pe, sector_pe=sector_pe)
+
+
+def _sweep_one(params):
+    stats, _ = run_backtest(_shared["close"], _shared["pe"], _shared["sector_pe"], params)
+    return {**asdict(params), **stats}
+
+
+def sweep(close, pe, sector_pe, grid, workers=None):
+    """Backtest every BacktestParams in `grid` across a process pool; returns a DataFrame sorted by Sharpe.
+
+    `close` is a (tickers x bars) array or a StoreView of the price store.
+    """
+    grid = list(grid)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(grid) <= 1:
+        _init_worker(close, pe, sector_pe)
+        rows = [_sweep_one(params) for params in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(close, pe, sector_pe)) as pool:
+            rows = list(pool.map(_sweep_one, grid))
+    return pd.DataFrame(rows).sort_values("sharpe", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def make_grid(sma_windows=(50,), rsi_maxes=(100.0,), cost_bps=(10.0,), use_pe=(True,)):
+    return [
+        BacktestParams(sma_window=w, rsi_max=r, cost_bps=c, use_pe=p)
+        for w, r, c, p in itertools.product(sma_windows, rsi_maxes, cost_bps, use_pe)
+    ]
+
+
+def _csv_list(cast):
+    return lambda text: [cast(v) for v in text.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the TradeSense recommendation rule.")
+    parser.add_argument("--tickers-file", required=True, help="file with one ticker per line")
+    parser.add_argument("--period", default="10y", help="history window (default: %(default)s)")
+    parser.add_argument("--sma", type=_csv_list(int), default=[50], help="comma-separated SMA windows")
+    parser.add_argument("--rsi-max", type=_csv_list(float), default=[100.0], help="comma-separated RSI entry caps")
+    parser.add_argument("--cost-bps", type=_csv_list(float), default=[10.0], help="comma-separated costs in bps")
+    parser.add_argument("--no-pe", action="store_true", help="ignore the P/E condition")
+    parser.add_argument("--workers", type=int, help="processes for loading and sweeping (default: CPU count)")
+    parser.add_argument("--cached", action="store_true", help="only fetch data missing from the local caches")
+    parser.add_argument("--store", action="store_true",
+                        help="read closes from the memory-mapped price store (tickers missing from it are skipped)")
+    parser.add_argument("--output", help="write the sweep table to a .csv or .json file")
+    args = parser.parse_args(argv)
+
+    with open(args.tickers_file, encoding="utf-8") as f:
+        tickers = [line.strip().upper() for line in f if line.strip()]
+    if args.store:
+        store = PriceStore()
+        tickers = [t for t in dict.fromkeys(tickers) if t in store]
+        closes = store.view("close", tickers, start=period_start(args.period))
+        fundamentals = FundamentalsStore().get_many(tickers)
+    else:
+        closes, fundamentals, skipped = load_universe_data(tickers, period=args.period, workers=args.workers,
+                                                           refresh=not args.cached)
+        report_skipped(skipped)
+        closes = closes.to_numpy(dtype=np.float64).T
+    pe = pd.to_numeric(fundamentals["trailing_pe"], errors="coerce").to_numpy(dtype=np.float64)
+    sector_pe = fundamentals["sector"].fillna("N/A").map(sector_pe_for).to_numpy(dtype=np.float64)
+    grid = make_grid(args.sma, args.rsi_max, args.cost_bps, (not args.no_pe,))
+    table = sweep(closes, pe, sector_pe, grid, workers=args.workers)
+    if args.output and args.output.endswith(".json"):
+        table.to_json(args.output, orient="records", indent=2)
+    elif args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Persistent, incrementally refreshed OHLCV bar store backed by SQLite.
+
+The first lookup for a ticker downloads the requested window; later lookups
+only request the bars after the last cached date and append them. Tickers are
+evicted least-recently-used first once the store exceeds its size budget.
+"""
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import metrics
+from providers import get_provider
+from settings import cache_path
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# yfinance period strings -> how far back they reach
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Rough on-disk cost of one bar (row + primary-key index), used for the size budget
+ROW_BYTES = 80
+
+_EPOCH = pd.Timestamp(0, tz="UTC")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    ticker TEXT PRIMARY KEY,
+    tz TEXT,
+    covered_from INTEGER NOT NULL,
+    last_ts INTEGER NOT NULL,
+    n_rows INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+"""
+
+
+def _provider_history(ticker, period=None, start=None):
+    return get_provider().history(ticker, period=period, start=start)
+
+
+def period_start(period, now=None):
+    """Return the UTC timestamp a yfinance `period` string reaches back to."""
+    now = now or pd.Timestamp.now(tz="UTC")
+    return (now - PERIOD_OFFSETS[period]).normalize()
+
+
+class BarCache:
+    """On-disk OHLCV store keyed by ticker with delta fetching and LRU eviction."""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, fetch=_provider_history):
+        self.path = path or cache_path("bars.sqlite")
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self._lock = threading.Lock()  # guards the SQLite read-modify-writes, never held across a fetch
+        self._ticker_locks = {}  # ticker -> lock held while that ticker is fetched
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # ---- Public API ----
+    def history(self, ticker, period, refresh=True):
+        """Return daily OHLCV bars for `ticker` covering `period`, fetching only what is missing.
+
+        With `refresh=False` a ticker whose cached bars already cover `period`
+        is served from disk without asking upstream for newer bars.
+        """
+        start = period_start(period)
+        # Concurrent lookups of one ticker wait for a single fetch; other tickers go ahead
+        with self._ticker_lock(ticker):
+            meta = self._meta(ticker)
+            covered = meta is not None and meta["covered_from"] <= int(start.timestamp())
+            metrics.cache_result("bars", "history", covered)
+            if not covered:
+                try:
+                    self._full_fetch(ticker, period, start)
+                except Exception as e:
+                    if meta is None:
+                        raise
+                    # Widening failed: serve the shorter history already on disk
+                    metrics.error("bars.full", e)
+            elif refresh:
+                try:
+                    self._delta_fetch(ticker, meta, period, start)
+                except Exception as e:
+                    # Upstream is degraded: serve the bars on disk, a later refresh catches up
+                    metrics.error("bars.delta", e)
+            df = self._read(ticker, start)
+            self._touch(ticker)
+        return df
+
+    def covers(self, ticker, period):
+        """True when the cached bars for `ticker` already reach back over `period`."""
+        meta = self._meta(ticker)
+        return meta is not None and meta["covered_from"] <= int(period_start(period).timestamp())
+
+    def closes(self, tickers, period):
+        """Cached closes for many tickers as one (dates x tickers) DataFrame, read in bulk.
+
+        Only reads what is already on disk; tickers with no cached bars are
+        left out. The index holds naive exchange-local dates.
+        """
+        tickers = list(tickers)
+        start = int(period_start(period).timestamp())
+        rows = []
+        with self._connect() as conn:
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows += conn.execute(
+                    f"SELECT b.ticker, m.tz, b.ts, b.close FROM bars b JOIN meta m ON m.ticker = b.ticker "
+                    f"WHERE b.ticker IN ({marks}) AND b.ts >= ?",
+                    chunk + [start],
+                ).fetchall()
+        if not rows:
+            return pd.DataFrame(dtype="float64")
+        long = pd.DataFrame(rows, columns=["ticker", "tz", "ts", "close"])
+        utc = pd.to_datetime(long["ts"], unit="s", utc=True)
+        long["date"] = utc.dt.tz_localize(None)
+        for tz in long["tz"].unique():
+            mask = long["tz"] == tz
+            long.loc[mask, "date"] = utc[mask].dt.tz_convert(tz).dt.tz_localize(None).dt.normalize()
+        wide = long.pivot(index="date", columns="ticker", values="close").sort_index()
+        return wide.reindex(columns=[t for t in tickers if t in wide.columns])
+
+    def invalidate(self, ticker):
+        """Drop every cached bar for `ticker` (e.g. after a split or dividend re-adjustment)."""
+        with self._ticker_lock(ticker), self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.execute("DELETE FROM meta WHERE ticker = ?", (ticker,))
+
+    def cached_tickers(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT ticker FROM meta ORDER BY ticker")]
+
+    def size_bytes(self):
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(n_rows), 0) FROM meta").fetchone()[0]
+        return total * ROW_BYTES
+
+    # ---- Fetching ----
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    def _full_fetch(self, ticker, period, start):
+        df = self.fetch(ticker, period=period)
+        if df is None or df.empty:
+            # Nothing usable (e.g. a throttled upstream): keep whatever is cached
+            return
+        self._write(ticker, df, covered_from=int(start.timestamp()), replace=True)
+
+    def _delta_fetch(self, ticker, meta, period, start):
+        last = pd.Timestamp(meta["last_ts"], unit="s", tz="UTC").tz_convert(meta["tz"])
+        # Re-request the last cached bar too: it may have been an intraday partial
+        delta = self.fetch(ticker, start=last.strftime("%Y-%m-%d"))
+        if delta is None or delta.empty:
+            return
+        new_rows = delta[delta.index > last]
+        if _has_adjustment(new_rows):
+            # A split or dividend back-adjusts the whole history, so the cached bars are stale
+            self._full_fetch(ticker, period, start)
+            return
+        self._write(ticker, delta, covered_from=meta["covered_from"])
+
+    # ---- Storage ----
+    def _meta(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tz, covered_from, last_ts FROM meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"tz": row[0], "covered_from": row[1], "last_ts": row[2]}
+
+    def _write(self, ticker, df, covered_from, replace=False):
+        """Store bars for `ticker`; with `replace` its old bars are dropped in the same transaction."""
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        ts = ((index - _EPOCH) // pd.Timedelta(seconds=1)).tolist()
+        values = df[COLUMNS].astype("float64").to_numpy().tolist()
+        rows = [(ticker, t, *v) for t, v in zip(ts, values)]
+        with self._lock, self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            n_rows, last_ts = conn.execute(
+                "SELECT COUNT(*), MAX(ts) FROM bars WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?, ?)",
+                (ticker, str(index.tz), covered_from, last_ts, n_rows, time.time()),
+            )
+            self._evict(conn)
+
+    def _read(self, ticker, start):
+        meta = self._meta(ticker)
+        if meta is None:
+            return pd.DataFrame(columns=COLUMNS, dtype="float64")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND ts >= ? ORDER BY ts",
+                (ticker, int(start.timestamp())),
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=["ts"] + COLUMNS)
+        index = pd.to_datetime(df.pop("ts"), unit="s", utc=True).dt.tz_convert(meta["tz"])
+        df.index = pd.DatetimeIndex(index, name="Date")
+        return df
+
+    def _touch(self, ticker):
+        with self._connect() as conn:
+            conn.execute("UPDATE meta SET last_access = ? WHERE ticker = ?", (time.time(), ticker))
+
+    def _evict(self, conn):
+        rows = conn.execute("SELECT ticker, n_rows FROM meta ORDER BY last_access DESC").fetchall()
+        budget = self.max_bytes // ROW_BYTES
+        kept = 0
+        for i, (ticker, n_rows) in enumerate(rows):
+            kept += n_rows
+            # Always keep the most recently used ticker, even if it alone exceeds the budget
+            if kept > budget and i > 0:
+                conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+                conn.execute("DELETE FROM meta WHERE ticker = ?", (ticker,))
+
+
+def _has_adjustment(df):
+    for col in ("Dividends", "Stock Splits"):
+        if col in df.columns and (df[col].fillna(0) != 0).any():
+            return True
+    return False
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Process-wide BarCache stored under CACHE_DIR."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = BarCache()
+    return _default_cache
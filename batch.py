@@ -0,0 +1,79 @@
+"""Batch TradeSense analysis without the Streamlit UI.
+
+    python batch.py tickers.txt --output results.json
+    python batch.py tickers.txt --output results.csv --workers 8 --cached
+
+Tickers are analyzed in chunks across a process pool; each worker loads
+history and fundamentals through the local caches and runs `analysis.analyze`.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analysis import analyze
+from fundamentals import FundamentalsStore
+from screener import CHUNK_SIZE, SCREEN_PERIOD, load_chunk
+
+
+def analyze_chunk(tickers, period=SCREEN_PERIOD, refresh=True):
+    """Process-pool worker: analyze one chunk of tickers and return a list of result dicts."""
+    closes, _ = load_chunk(tickers, period, refresh)
+    fundamentals = FundamentalsStore().get_many(list(closes.columns))
+    results = []
+    for ticker in closes.columns:
+        history = closes[ticker].dropna().to_frame("Close")
+        if history.empty:
+            continue
+        row = fundamentals.loc[ticker]
+        info = {"sector": row["sector"] if pd.notna(row["sector"]) else "N/A"}
+        if pd.notna(row["trailing_pe"]):
+            info["trailingPE"] = float(row["trailing_pe"])
+        results.append(analyze(ticker, history, info).to_dict())
+    return results
+
+
+def run_batch(tickers, period=SCREEN_PERIOD, workers=None, refresh=True):
+    """Analyze every ticker and return the results in input order (tickers without data are skipped)."""
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        parts = [analyze_chunk(chunk, period, refresh) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(analyze_chunk, chunks, [period] * len(chunks), [refresh] * len(chunks)))
+    return [result for part in parts for result in part]
+
+
+def write_results(results, path):
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    else:
+        df = pd.DataFrame(results)
+        if not df.empty:
+            df["reasons"] = df["reasons"].str.join(" | ")
+        df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the TradeSense analysis for a file of tickers.")
+    parser.add_argument("tickers_file", help="file with one ticker per line")
+    parser.add_argument("--output", default="tradesense_results.json", help="a .json or .csv path (default: %(default)s)")
+    parser.add_argument("--period", default=SCREEN_PERIOD, help="history window to load (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--cached", action="store_true", help="only fetch data missing from the local caches")
+    args = parser.parse_args(argv)
+
+    with open(args.tickers_file, encoding="utf-8") as f:
+        tickers = [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    results = run_batch(tickers, period=args.period, workers=args.workers, refresh=not args.cached)
+    write_results(results, args.output)
+    print(f"Analyzed {len(results)} of {len(tickers)} tickers -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def _session(ticker="AAPL"):
+    """An AppTest session with a ticker analysed and two holdings, warmed up once."""
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    for symbol in ("MSFT", "NVDA"):
+        at.sidebar.text_input[0].input(symbol)
+        at.sidebar.button[0].click().run()
+    next(t for t in at.text_input if "NASDAQ" in t.label).input(ticker).run()
+    assert not at.exception, at.exception
+    return at
+
+
+@pytest.mark.benchmark(group="app")
+def bench_app_cold_start(benchmark):
+    benchmark.pedantic(lambda: AppTest.from_file(APP, default_timeout=120).run(), rounds=5, iterations=1)
+
+
+@pytest.mark.benchmark(group="app")
+def bench_app_rerun(benchmark):
+    at = _session()
+    benchmark.pedantic(at.run, rounds=10, iterations=1)
+    assert not at.exception, at.exception
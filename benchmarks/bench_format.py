@@ -0,0 +1,11 @@
+import numpy as np
+import pytest
+
+from analysis import human_format
+
+
+@pytest.mark.benchmark(group="human_format")
+@pytest.mark.parametrize("n", [10_000, 100_000])
+def bench_human_format(benchmark, n):
+    values = np.random.default_rng(n).lognormal(15, 5, n).tolist()
+    benchmark(lambda: [human_format(v) for v in values])
@@ -0,0 +1,57 @@
+"""Cold-start import cost of app.py, with an `-X importtime` breakdown saved in the benchmark JSON."""
+import ast
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+APP = os.path.join(ROOT, "app.py")
+TOP_N = 15
+
+
+def _app_modules():
+    """Top-level modules app.py imports, in the order it imports them."""
+    with open(APP, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def _import_app_modules():
+    code = "; ".join(f"import {name}" for name in _app_modules())
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=os.environ.copy(), capture_output=True, text=True, check=True,
+    )
+    return result.stderr
+
+
+def _breakdown(stderr):
+    """{module: cumulative microseconds} for modules imported directly by the script (not nested)."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nesting is shown by indentation after the single separator space
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.benchmark(group="import")
+def bench_app_imports(benchmark):
+    stderr = benchmark.pedantic(_import_app_modules, rounds=5, iterations=1)
+    times = _breakdown(stderr)
+    top = sorted(times.items(), key=lambda item: item[1], reverse=True)[:TOP_N]
+    benchmark.extra_info["importtime_us"] = dict(top)
+    benchmark.extra_info["importtime_total_us"] = sum(times.values())
+    assert not re.search(r"\| +yfinance$", stderr, re.MULTILINE), "yfinance should only be imported on the first fetch"
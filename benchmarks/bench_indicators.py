@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from indicators import IndicatorGraph, rsi, sma
+
+BARS = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _closes(n):
+    rng = np.random.default_rng(n)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+@pytest.mark.benchmark(group="sma")
+@pytest.mark.parametrize("bars", BARS)
+def bench_sma(benchmark, bars):
+    close = _closes(bars)
+    benchmark(sma, close, 50)
+
+
+@pytest.mark.benchmark(group="rsi")
+@pytest.mark.parametrize("bars", BARS)
+def bench_rsi(benchmark, bars):
+    close = _closes(bars)
+    benchmark(rsi, close, 14)
+
+
+@pytest.mark.benchmark(group="indicator-graph")
+@pytest.mark.parametrize("indicators", [
+    ("SMA50", "SMA200", "RSI14"),
+    ("SMA50", "SMA200", "RSI14", "EMA20", "MACD_HIST", "BB_UPPER20", "BB_LOWER20", "ATR14", "OBV", "STOCH_D14"),
+], ids=["rule", "all"])
+def bench_indicator_graph(benchmark, indicators):
+    # A screener-sized (tickers x bars) matrix, evaluated on a fresh graph each round
+    close = np.vstack([_closes(2_520) * (1 + i / 100) for i in range(500)])
+    benchmark(lambda: IndicatorGraph(close, close * 1.01, close * 0.99, np.ones_like(close)).compute(indicators))
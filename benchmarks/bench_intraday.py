@@ -0,0 +1,32 @@
+import pytest
+
+from intraday import IntradaySeries
+from providers import SyntheticProvider
+
+
+@pytest.fixture(scope="module")
+def minutes():
+    return SyntheticProvider().intraday("AAPL")
+
+
+@pytest.mark.benchmark(group="intraday")
+def bench_intraday_seed(benchmark, minutes):
+    # Five sessions of 1-minute bars streamed into 1m / 5m / 15m / 1h
+    benchmark(lambda: IntradaySeries("AAPL").extend(minutes))
+
+
+@pytest.mark.benchmark(group="intraday")
+def bench_intraday_tick(benchmark, minutes):
+    # One revised in-progress minute, as on every refresh
+    series = IntradaySeries("AAPL")
+    series.extend(minutes)
+    last = minutes.iloc[-1:]
+    benchmark(series.extend, last)
+
+
+@pytest.mark.benchmark(group="intraday")
+@pytest.mark.parametrize("interval", ["1m", "5m", "1h"])
+def bench_intraday_frame(benchmark, minutes, interval):
+    series = IntradaySeries("AAPL")
+    series.extend(minutes)
+    benchmark(series.frame, interval)
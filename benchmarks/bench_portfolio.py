@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from ledger import Ledger
+from poller import QuotePoller
+
+HOLDINGS = [1, 10, 100, 1_000]
+
+
+def _portfolio(n):
+    """Ledger with `n` open holdings (two buys and a partial sell each) and a poller snapshot."""
+    rng = np.random.default_rng(n)
+    tickers = [f"T{i:04d}" for i in range(n)]
+    ledger = Ledger(initial_cash=1e9)
+    ledger.record_many(tickers * 3, np.r_[np.full(2 * n, 10.0), np.full(n, -5.0)],
+                       rng.uniform(10, 500, 3 * n), np.arange(3 * n, dtype=np.float64))
+    poller = QuotePoller(fetch=lambda tickers: None)
+    poller.publish(dict(zip(tickers, rng.uniform(10, 500, n))))
+    return ledger, poller
+
+
+def _value(ledger, poller):
+    # What the sidebar does on every rerun
+    holdings = ledger.positions()
+    summary = ledger.summary(dict(zip(holdings.index, poller.prices_for(holdings.index))))
+    return summary["Market Value"].sum(), summary["Unrealized P&L"].sum(), ledger.cash
+
+
+@pytest.mark.benchmark(group="portfolio")
+@pytest.mark.parametrize("holdings", HOLDINGS)
+def bench_portfolio_valuation(benchmark, holdings):
+    ledger, poller = _portfolio(holdings)
+    benchmark(_value, ledger, poller)
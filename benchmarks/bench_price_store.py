@@ -0,0 +1,30 @@
+import pytest
+
+from bar_cache import default_cache
+from price_store import PriceStore, update_store
+
+TICKERS = [f"T{i:03d}" for i in range(200)]
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    return update_store(TICKERS, period="2y", store=PriceStore(str(tmp_path_factory.mktemp("prices"))))
+
+
+@pytest.mark.benchmark(group="price-store")
+def bench_store_closes(benchmark, store):
+    # 200 tickers x 1y of closes as a DataFrame over the mapped file
+    benchmark(store.frame, "close", TICKERS, start=store.dates[-252])
+
+
+@pytest.mark.benchmark(group="price-store")
+def bench_bar_cache_closes(benchmark, store):
+    # The same closes read from the SQLite bar cache, for comparison
+    benchmark(default_cache().closes, TICKERS, "1y")
+
+
+@pytest.mark.benchmark(group="price-store")
+def bench_store_append_day(benchmark, store):
+    # The daily update: one bar per ticker, rewritten in place
+    last = {t: default_cache().history(t, "5d", refresh=False).iloc[-1:] for t in TICKERS}
+    benchmark(store.append, last)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from sentiment import NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS, get_sentiment, score_headlines
+
+BATCHES = [1_000, 10_000, 100_000]
+FILLER = ["shares", "company", "quarter", "market", "analysts", "update", "investors", "report"]
+
+
+def _headlines(n):
+    rng = np.random.default_rng(n)
+    words = np.array(FILLER * 4 + POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS)
+    return [" ".join(rng.choice(words, size=10)) for _ in range(n)]
+
+
+@pytest.mark.benchmark(group="sentiment")
+@pytest.mark.parametrize("n", BATCHES)
+def bench_get_sentiment(benchmark, n):
+    headlines = _headlines(n)
+    benchmark(lambda: [get_sentiment(h) for h in headlines])
+
+
+@pytest.mark.benchmark(group="sentiment")
+@pytest.mark.parametrize("n", BATCHES)
+def bench_score_headlines(benchmark, n):
+    headlines = _headlines(n)
+    benchmark(score_headlines, headlines)
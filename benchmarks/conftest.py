@@ -0,0 +1,15 @@
+"""Benchmark setup: offline synthetic market data and a throwaway cache directory.
+
+The environment is set before any TradeSense module is imported, so every
+provider and cache lookup in the benchmarks stays on this machine.
+"""
+import os
+import sys
+import tempfile
+
+os.environ["TRADESENSE_PROVIDER"] = "synthetic"
+os.environ["TRADESENSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="tradesense-bench-")
+os.environ.setdefault("NEWS_API_KEY", "offline")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,220 @@
+"""Plotly figures for the analysis page, downsampled to a point budget and cached.
+
+Line traces are reduced with Largest-Triangle-Three-Buckets (LTTB) and drawn
+as WebGL `Scattergl`; candles are aggregated into coarser OHLC bars. Payload
+size therefore stays roughly constant however long the history is. Built
+figures are cached by (ticker, window, chart type, data version).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+POINT_BUDGET = 1500
+FIGURE_CACHE_SIZE = 64
+
+CANDLESTICK = "Candlestick with SMAs"
+LINE = "Line Chart with SMAs & RSI"
+
+# Chart choices -> the indicator columns they draw (see indicators.IndicatorGraph)
+OVERLAYS = {
+    "SMA 50": ("SMA50",),
+    "SMA 200": ("SMA200",),
+    "EMA 20": ("EMA20",),
+    "Bollinger Bands (20, 2σ)": ("BB_UPPER20", "BB_LOWER20"),
+}
+DEFAULT_OVERLAYS = ["SMA 50", "SMA 200"]
+PANELS = {
+    "RSI 14": ("RSI14",),
+    "MACD (12, 26, 9)": ("MACD", "MACD_SIGNAL", "MACD_HIST"),
+    "ATR 14": ("ATR14",),
+    "OBV": ("OBV",),
+    "Stochastic (14, 3)": ("STOCH_K14", "STOCH_D14"),
+}
+# column -> (trace name, color)
+_STYLE = {
+    "SMA50": ("SMA 50", "royalblue"),
+    "SMA200": ("SMA 200", "orange"),
+    "EMA20": ("EMA 20", "purple"),
+    "BB_UPPER20": ("Bollinger upper", "gray"),
+    "BB_LOWER20": ("Bollinger lower", "gray"),
+    "MACD": ("MACD", "royalblue"),
+    "MACD_SIGNAL": ("Signal", "orange"),
+    "MACD_HIST": ("Histogram", "lightgray"),
+    "ATR14": ("ATR 14", "firebrick"),
+    "OBV": ("OBV", "teal"),
+    "STOCH_K14": ("%K", "royalblue"),
+    "STOCH_D14": ("%D", "orange"),
+}
+
+
+def indicator_columns(overlays, panels):
+    """Indicator columns needed to draw the chosen overlays and panels, in order."""
+    return list(dict.fromkeys(
+        [c for label in overlays for c in OVERLAYS[label]] + [c for label in panels for c in PANELS[label]]
+    ))
+
+
+# ---- Downsampling ----
+def lttb_indices(x, y, n_out):
+    """Indices of the `n_out` points LTTB keeps from (x, y); all indices when already small enough."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # NaNs (indicator warm-up) would poison the triangle areas
+    y = np.where(np.isfinite(y), y, np.nanmean(y) if np.isfinite(y).any() else 0.0)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        keep[i + 1] = a
+    return keep
+
+
+def aggregate_ohlc(df, max_bars):
+    """Merge consecutive bars so at most `max_bars` remain (open first, high max, low min, close last)."""
+    n = len(df)
+    if n <= max_bars:
+        return df.index, df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy()
+    step = -(-n // max_bars)
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n) - 1
+    return (
+        df.index[starts],
+        df['Open'].to_numpy()[starts],
+        np.maximum.reduceat(df['High'].to_numpy(), starts),
+        np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        df['Close'].to_numpy()[ends],
+    )
+
+
+def _x_numeric(index):
+    return index.asi8.astype(np.float64) if hasattr(index, "asi8") else np.arange(len(index), dtype=np.float64)
+
+
+# ---- Figures ----
+def _go():
+    # plotly.graph_objects takes a large share of cold-start time; only import it once a chart is drawn
+    import plotly.graph_objects as go
+
+    return go
+
+
+def _line_trace(df, column, idx, width=2):
+    name, color = _STYLE[column]
+    return _go().Scattergl(x=df.index[idx], y=df[column].to_numpy()[idx], line=dict(color=color, width=width), name=name)
+
+
+def _skip_closed_hours(fig):
+    # Intraday x axes: hide nights and weekends instead of drawing flat gaps
+    fig.update_xaxes(rangebreaks=[dict(bounds=["sat", "mon"]), dict(bounds=[16, 9.5], pattern="hour")])
+
+
+def price_figure(df, chart_type, point_budget=POINT_BUDGET, intraday=False, overlays=DEFAULT_OVERLAYS):
+    go = _go()
+    fig = go.Figure()
+    line_idx = lttb_indices(_x_numeric(df.index), df['Close'].to_numpy(), point_budget)
+    if chart_type == CANDLESTICK:
+        x, o, h, l, c = aggregate_ohlc(df, point_budget)
+        fig.add_trace(go.Candlestick(x=x, open=o, high=h, low=l, close=c, name='Candlestick'))
+        height = 500
+    else:
+        fig.add_trace(go.Scattergl(
+            x=df.index[line_idx], y=df['Close'].to_numpy()[line_idx], mode='lines', name='Close Price'
+        ))
+        height = 400
+    for label in overlays:
+        for column in OVERLAYS[label]:
+            fig.add_trace(_line_trace(df, column, line_idx, width=1 if column.startswith("BB_") else 2))
+    fig.update_layout(
+        xaxis_title="Time" if intraday else "Date",
+        yaxis_title="Price (USD)",
+        template="plotly_white",
+        height=height
+    )
+    if intraday:
+        _skip_closed_hours(fig)
+    return fig
+
+
+def rsi_figure(df, point_budget=POINT_BUDGET, intraday=False):
+    go = _go()
+    idx = lttb_indices(_x_numeric(df.index), df['RSI14'].to_numpy(), point_budget)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=df.index[idx], y=df['RSI14'].to_numpy()[idx], mode='lines', name='RSI 14'
+    ))
+    fig.add_hline(y=70, line_dash="dot", line_color="red", annotation_text="Overbought", annotation_position="top left")
+    fig.add_hline(y=30, line_dash="dot", line_color="green", annotation_text="Oversold", annotation_position="bottom left")
+    fig.update_layout(
+        yaxis_title="RSI",
+        template="plotly_white",
+        height=250
+    )
+    if intraday:
+        _skip_closed_hours(fig)
+    return fig
+
+
+def panel_figure(df, panel, point_budget=POINT_BUDGET, intraday=False):
+    """Lower-pane figure for one PANELS entry: RSI, MACD, ATR, OBV or the stochastic oscillator."""
+    if panel == "RSI 14":
+        return rsi_figure(df, point_budget, intraday)
+    go = _go()
+    columns = PANELS[panel]
+    idx = lttb_indices(_x_numeric(df.index), df[columns[0]].to_numpy(), point_budget)
+    fig = go.Figure()
+    for column in columns:
+        if column == "MACD_HIST":
+            name, color = _STYLE[column]
+            fig.add_trace(go.Bar(x=df.index[idx], y=df[column].to_numpy()[idx], name=name, marker_color=color))
+        else:
+            fig.add_trace(_line_trace(df, column, idx, width=1.5))
+    if columns[0].startswith("STOCH"):
+        fig.add_hline(y=80, line_dash="dot", line_color="red")
+        fig.add_hline(y=20, line_dash="dot", line_color="green")
+    fig.update_layout(
+        yaxis_title=panel,
+        template="plotly_white",
+        height=250
+    )
+    if intraday:
+        _skip_closed_hours(fig)
+    return fig
+
+
+# ---- Figure cache ----
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+
+
+def cached_figure(key, build):
+    """Return the figure cached under `key`, building it with `build()` on a miss (LRU-bounded)."""
+    with _figures_lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+    metrics.cache_result("figures", "figure", fig is not None)
+    if fig is not None:
+        return fig
+    fig = build()
+    with _figures_lock:
+        _figures[key] = fig
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+    return fig
@@ -0,0 +1,64 @@
+"""On-disk cache of the per-ticker fundamentals the recommendation rule needs (sector, trailing P/E)."""
+import sqlite3
+import time
+
+import pandas as pd
+from providers import get_provider
+from settings import cache_path
+
+FUNDAMENTALS_TTL = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker TEXT PRIMARY KEY,
+    sector TEXT,
+    trailing_pe REAL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def fetch_fundamentals(ticker):
+    """Pull sector and trailing P/E for one ticker from the market-data provider."""
+    info = get_provider().info(ticker) or {}
+    return {"ticker": ticker, "sector": info.get("sector"), "trailing_pe": info.get("trailingPE")}
+
+
+class FundamentalsStore:
+    def __init__(self, path=None):
+        self.path = path or cache_path("fundamentals.sqlite")
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, tickers):
+        """Return a DataFrame indexed by ticker with sector, trailing_pe and fetched_at columns."""
+        tickers = list(tickers)
+        rows = []
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows += conn.execute(
+                    f"SELECT ticker, sector, trailing_pe, fetched_at FROM fundamentals WHERE ticker IN ({marks})",
+                    chunk,
+                ).fetchall()
+        df = pd.DataFrame(rows, columns=["ticker", "sector", "trailing_pe", "fetched_at"])
+        return df.set_index("ticker").reindex(tickers)
+
+    def stale(self, tickers, max_age=FUNDAMENTALS_TTL):
+        """Tickers with no cached fundamentals or fundamentals older than `max_age` seconds."""
+        fetched_at = self.get_many(tickers)["fetched_at"]
+        expired = fetched_at.isna() | (fetched_at < time.time() - max_age)
+        return list(fetched_at.index[expired])
+
+    def put_many(self, records):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?)",
+                [(r["ticker"], r.get("sector"), r.get("trailing_pe"), now) for r in records],
+            )
@@ -0,0 +1,389 @@
+"""NumPy technical indicators: batch (tickers x bars), lazy graph and incremental (bar by bar).
+
+Batch functions accept a 1-D array of bars or a 2-D (tickers x bars) array and
+compute along the last axis. Results match pandas `rolling().mean()` and
+`ta.momentum.RSIIndicator` (Wilder smoothing) within floating-point tolerance.
+
+`IndicatorGraph` evaluates named indicators ("SMA50", "MACD", "ATR14", ...)
+on demand over one set of OHLCV arrays, memoizing every node, so shared
+intermediates such as EMAs, price changes and the true range are computed
+once no matter how many indicators use them.
+"""
+import re
+
+import numpy as np
+
+# Bars per block when evaluating exponential smoothing in closed form
+_EWM_BLOCK = 256
+
+
+def _as_float_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _window_sums(cumsum, window):
+    """Trailing `window` sums from a cumulative sum along the last axis."""
+    out = cumsum[..., window - 1:].copy()
+    out[..., 1:] -= cumsum[..., :-window]
+    return out
+
+
+def _sma_from_cumsums(cumsum, count, window, shape):
+    out = np.full(shape, np.nan)
+    if shape[-1] < window:
+        return out
+    sums = _window_sums(cumsum, window)
+    full = _window_sums(count, window) == window
+    out[..., window - 1:] = np.where(full, sums / window, np.nan)
+    return out
+
+
+def sma(values, window):
+    """Simple moving average; NaN until `window` valid bars are available."""
+    x = _as_float_array(values)
+    valid = np.isfinite(x)
+    cumsum = np.cumsum(np.where(valid, x, 0.0), axis=-1)
+    count = np.cumsum(valid, axis=-1)
+    return _sma_from_cumsums(cumsum, count, window, x.shape)
+
+
+def ewm(values, alpha):
+    """Exponentially weighted mean with pandas `adjust=False` semantics (seeded by the first bar).
+
+    The recursion is evaluated in closed form over blocks of bars, so the
+    Python loop runs once per block rather than once per bar.
+    """
+    x = _as_float_array(values)
+    out = np.empty_like(x)
+    n = x.shape[-1]
+    if n == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay == 0:
+        return x.copy()  # alpha = 1: each output is just its bar
+    # decay ** -k must stay finite over a block, so fast decays get shorter blocks
+    block_size = int(min(_EWM_BLOCK, max(1, 200 / -np.log10(decay))))
+    steps = np.arange(block_size, dtype=np.float64)
+    powers = decay ** steps
+    inverse = decay ** -steps
+    prev = x[..., :1]  # decay * x0 + alpha * x0 == x0, so the first output is the first bar
+    start = 0
+    while start < n:
+        stop = min(start + block_size, n)
+        k = stop - start
+        block = x[..., start:stop]
+        weighted = np.cumsum(block * inverse[:k], axis=-1) * powers[:k]
+        out[..., start:stop] = decay * powers[:k] * prev + alpha * weighted
+        prev = out[..., stop - 1:stop]
+        start = stop
+    return out
+
+
+def _gains_losses(x):
+    diff = np.diff(x, axis=-1, prepend=np.nan)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+    return gains, losses
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def rsi(values, window=14):
+    """Relative Strength Index with Wilder smoothing; NaN for the first `window - 1` bars."""
+    x = _as_float_array(values)
+    gains, losses = _gains_losses(x)
+    alpha = 1.0 / window
+    out = _rsi_from_averages(ewm(gains, alpha), ewm(losses, alpha))
+    out[..., :window - 1] = np.nan
+    return out
+
+
+def compute_indicators(close, sma_windows=(50, 200), rsi_window=14):
+    """Compute every SMA window and RSI over `close` in one fused pass.
+
+    The cumulative sums and the gain/loss split are built once and shared, so
+    adding another SMA window only costs one subtraction over the array.
+    Returns a dict such as {"SMA50": ..., "SMA200": ..., "RSI14": ...}.
+    """
+    graph = IndicatorGraph(close)
+    return graph.compute([f"SMA{w}" for w in sma_windows] + [f"RSI{rsi_window}"])
+
+
+# ---- Lazy indicator graph ----
+def _ffill(x):
+    """`x` with NaNs replaced by the last valid bar, and the mask of bars before the first valid one."""
+    valid = np.isfinite(x)
+    idx = np.where(valid, np.arange(x.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(x, idx, axis=-1)
+    return filled, ~np.logical_or.accumulate(valid, axis=-1)
+
+
+def ema(values, window):
+    """Exponential moving average (span `window`, pandas `adjust=False`), seeded at each row's first valid bar."""
+    filled, leading = _ffill(_as_float_array(values))
+    first = np.take_along_axis(filled, np.argmax(~leading, axis=-1)[..., None], axis=-1)
+    out = ewm(np.where(leading, first, filled), 2.0 / (window + 1))
+    out[leading] = np.nan
+    return out
+
+
+def _rolling_extreme(x, window, reduce):
+    """Trailing `window` max / min (`reduce` is np.maximum / np.minimum) in log2(window) vectorized passes."""
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    span, ext = 1, x
+    # ext[i] = extreme of x[i:i + span], doubling span while it fits in the window
+    while span * 2 <= window:
+        ext = reduce(ext[..., :-span], ext[..., span:])
+        span *= 2
+    m = n - window + 1
+    out[..., window - 1:] = reduce(ext[..., :m], ext[..., window - span:window - span + m])
+    return out
+
+
+class IndicatorGraph:
+    """Named indicators over one set of OHLCV arrays, each computed on first request and memoized.
+
+    Arrays are 1-D (bars) or 2-D (tickers x bars). Names are an indicator
+    kind plus an optional window: SMA50, EMA20, RSI14, MACD, MACD_SIGNAL,
+    MACD_HIST, STD20, BB_MID20, BB_UPPER20, BB_LOWER20, TR, ATR14, OBV,
+    HIGHEST14, LOWEST14, STOCH_K14, STOCH_D14. A graph belongs to one version
+    of the data; build a new one when bars change.
+    """
+
+    _NAME = re.compile(r"([A-Z_]*[A-Z])(\d*)")
+
+    def __init__(self, close, high=None, low=None, volume=None):
+        self.inputs = {
+            name: None if values is None else _as_float_array(values)
+            for name, values in (("close", close), ("high", high), ("low", low), ("volume", volume))
+        }
+        self.shape = self.inputs["close"].shape
+        self._memo = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Graph over an OHLCV DataFrame's Close / High / Low / Volume columns (the last three optional)."""
+        return cls(*(df[c].to_numpy() if c in df else None for c in ("Close", "High", "Low", "Volume")))
+
+    def __getitem__(self, name):
+        if name not in self._memo:
+            self._memo[name] = self._evaluate(name)
+        return self._memo[name]
+
+    def compute(self, names):
+        """{name: array} for every requested indicator."""
+        return {name: self[name] for name in names}
+
+    @property
+    def computed(self):
+        """Names of every node evaluated so far, intermediates included."""
+        return set(self._memo)
+
+    def _input(self, name, needed_by):
+        values = self.inputs[name]
+        if values is None:
+            raise ValueError(f"{needed_by} needs {name} prices")
+        return values
+
+    def _evaluate(self, name):
+        if name in _INTERMEDIATES:
+            return _INTERMEDIATES[name](self)
+        match = self._NAME.fullmatch(name)
+        kind, window = (match[1], int(match[2]) if match[2] else None) if match else (None, None)
+        if kind not in _NODES:
+            raise KeyError(f"Unknown indicator {name!r}")
+        node, default = _NODES[kind]
+        window = window or default
+        if window is None:
+            raise KeyError(f"{name!r} needs a window, e.g. {kind}20")
+        return node(self, window)
+
+
+def _stochastic_k(g, n):
+    low = g[f"LOWEST{n}"]
+    span = g[f"HIGHEST{n}"] - low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100.0 * (g["close"] - low) / span
+    return np.where(span == 0, 50.0, k)
+
+
+def _true_range(g):
+    high, low = g._input("high", "TR"), g._input("low", "TR")
+    prev = g["prev_close"]
+    # fmax ignores the NaN previous close of the first bar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+
+
+def _wilder(values, n):
+    out = ewm(values, 1.0 / n)
+    out[..., :n - 1] = np.nan
+    return out
+
+
+def _std(g, n):
+    # Population std from running sums of the mean-centred series (centring keeps the squares small)
+    mean = _sma_from_cumsums(g["centred_cumsum"], g["count"], n, g.shape)
+    mean_sq = _sma_from_cumsums(g["centred_sq_cumsum"], g["count"], n, g.shape)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+_INTERMEDIATES = {
+    "close": lambda g: g.inputs["close"],
+    "prev_close": lambda g: np.concatenate([np.full(g.shape[:-1] + (1,), np.nan), g["close"][..., :-1]], axis=-1),
+    "diff": lambda g: g["close"] - g["prev_close"],
+    "gains": lambda g: np.where(g["diff"] > 0, g["diff"], 0.0),
+    "losses": lambda g: np.where(g["diff"] < 0, -g["diff"], 0.0),
+    "count": lambda g: np.cumsum(np.isfinite(g["close"]), axis=-1),
+    "cumsum": lambda g: np.cumsum(np.nan_to_num(g["close"], nan=0.0), axis=-1),
+    "centred": lambda g: g["close"] - (np.nanmean(g["close"], axis=-1, keepdims=True)
+                                       if np.isfinite(g["close"]).any() else 0.0),
+    "centred_cumsum": lambda g: np.cumsum(np.nan_to_num(g["centred"], nan=0.0), axis=-1),
+    "centred_sq_cumsum": lambda g: np.cumsum(np.nan_to_num(g["centred"], nan=0.0) ** 2, axis=-1),
+}
+
+# kind -> (node(graph, window), default window)
+_NODES = {
+    "SMA": (lambda g, n: _sma_from_cumsums(g["cumsum"], g["count"], n, g.shape), None),
+    "EMA": (lambda g, n: ema(g["close"], n), None),
+    "RSI": (lambda g, n: _rsi_from_averages(_wilder(g["gains"], n), _wilder(g["losses"], n)), 14),
+    "MACD": (lambda g, n: g["EMA12"] - g["EMA26"], 1),
+    "MACD_SIGNAL": (lambda g, n: ema(g["MACD"], 9), 1),
+    "MACD_HIST": (lambda g, n: g["MACD"] - g["MACD_SIGNAL"], 1),
+    "STD": (_std, None),
+    "BB_MID": (lambda g, n: g[f"SMA{n}"], 20),
+    "BB_UPPER": (lambda g, n: g[f"SMA{n}"] + 2.0 * g[f"STD{n}"], 20),
+    "BB_LOWER": (lambda g, n: g[f"SMA{n}"] - 2.0 * g[f"STD{n}"], 20),
+    "TR": (lambda g, n: _true_range(g), 1),
+    "ATR": (lambda g, n: _wilder(np.nan_to_num(g["TR"], nan=0.0), n), 14),
+    "OBV": (lambda g, n: np.cumsum(np.sign(np.nan_to_num(g["diff"], nan=0.0))
+                                   * np.nan_to_num(g._input("volume", "OBV"), nan=0.0), axis=-1), 1),
+    "HIGHEST": (lambda g, n: _rolling_extreme(g._input("high", "HIGHEST"), n, np.maximum), 14),
+    "LOWEST": (lambda g, n: _rolling_extreme(g._input("low", "LOWEST"), n, np.minimum), 14),
+    "STOCH_K": (_stochastic_k, 14),
+    "STOCH_D": (lambda g, n: sma(g[f"STOCH_K{n}"], 3), 14),
+}
+
+
+# ---- Incremental (O(1) per bar) state ----
+class SMAState:
+    """Running simple moving average over the last `window` bars."""
+
+    def __init__(self, window):
+        self.window = window
+        self._buffer = np.full(window, np.nan)
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+
+    @classmethod
+    def seed(cls, values, window):
+        """Build the state left after feeding `values` one by one, without looping."""
+        state = cls(window)
+        tail = _as_float_array(values)[-window:]
+        state._buffer[:len(tail)] = tail
+        state._count = len(tail)
+        state._pos = len(tail) % window
+        state._sum = float(tail.sum())
+        return state
+
+    def update(self, value):
+        value = float(value)
+        old = self._buffer[self._pos]
+        if self._count == self.window:
+            self._sum -= old
+        else:
+            self._count += 1
+        self._buffer[self._pos] = value
+        self._sum += value
+        self._pos = (self._pos + 1) % self.window
+        return self.value
+
+    @property
+    def value(self):
+        return self._sum / self.window if self._count == self.window else np.nan
+
+
+class RSIState:
+    """Running Wilder RSI; equivalent to `rsi()` evaluated on the bars seen so far."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self._alpha = 1.0 / window
+        self._prev_close = None
+        self._avg_gain = None
+        self._avg_loss = None
+        self._count = 0
+
+    @classmethod
+    def seed(cls, closes, window=14):
+        """Build the state left after feeding `closes` one by one, without looping."""
+        state = cls(window)
+        x = _as_float_array(closes)
+        if len(x) == 0:
+            return state
+        gains, losses = _gains_losses(x)
+        state._avg_gain = float(ewm(gains, state._alpha)[-1])
+        state._avg_loss = float(ewm(losses, state._alpha)[-1])
+        state._prev_close = float(x[-1])
+        state._count = len(x)
+        return state
+
+    def update(self, close):
+        close = float(close)
+        if self._prev_close is None:
+            gain = loss = 0.0
+        else:
+            diff = close - self._prev_close
+            gain, loss = max(diff, 0.0), max(-diff, 0.0)
+        self._prev_close = close
+        self._count += 1
+        if self._avg_gain is None:
+            self._avg_gain, self._avg_loss = gain, loss
+        else:
+            self._avg_gain += self._alpha * (gain - self._avg_gain)
+            self._avg_loss += self._alpha * (loss - self._avg_loss)
+        return self.value
+
+    @property
+    def value(self):
+        if self._count < self.window:
+            return np.nan
+        if self._avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+
+class IndicatorState:
+    """SMA and RSI running state for one ticker, seeded from history and advanced bar by bar."""
+
+    def __init__(self, sma_windows=(50, 200), rsi_window=14):
+        self.smas = {f"SMA{w}": SMAState(w) for w in sma_windows}
+        self.rsi_key = f"RSI{rsi_window}"
+        self.rsi = RSIState(rsi_window)
+
+    @classmethod
+    def from_history(cls, close, sma_windows=(50, 200), rsi_window=14):
+        state = cls(sma_windows, rsi_window)
+        state.smas = {f"SMA{w}": SMAState.seed(close, w) for w in sma_windows}
+        state.rsi = RSIState.seed(close, rsi_window)
+        return state
+
+    def update(self, close):
+        """Advance every indicator by one bar and return their latest values."""
+        latest = {key: s.update(close) for key, s in self.smas.items()}
+        latest[self.rsi_key] = self.rsi.update(close)
+        return latest
+
+    @property
+    def values(self):
+        latest = {key: s.value for key, s in self.smas.items()}
+        latest[self.rsi_key] = self.rsi.value
+        return latest
@@ -0,0 +1,287 @@
+"""Intraday bars: one 1-minute stream resampled in memory into 1m / 5m / 15m / 1h OHLCV bars.
+
+Each ticker has one `IntradaySeries`. New 1-minute bars are pulled from the
+market-data provider incrementally (only minutes from the last one seen, so
+the in-progress minute is re-read) and pushed through a streaming resampler
+per interval: a 15-minute bar is built from the same minutes as the 1-minute
+view, never downloaded separately. When a coarse bar completes, its SMA / RSI
+state advances by one bar (indicators.IndicatorState).
+
+Completed bars live in fixed-size ring buffers covering the last
+INTRADAY_DAYS sessions, so a series has a constant footprint (about 180 KB
+for the four default intervals) and the feed keeps at most MAX_SERIES of them.
+
+Five sessions are fewer bars than SMA200 needs at 5m / 15m / 1h (and than
+SMA50 needs at 1h), so on a ticker's first fetch those intervals' indicator
+state is seeded from the provider's own coarse bars that closed before the
+first minute (`IntradaySeries.seed`).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from indicators import IndicatorState
+from providers import get_provider
+
+INTERVALS = {"1m": 1, "5m": 5, "15m": 15, "1h": 60}  # bar width in minutes
+INTRADAY_DAYS = 5
+SESSION_OPEN = 9 * 60 + 30  # coarse bars are aligned to the 09:30 open, as yfinance does
+SESSION_MINUTES = 390
+SEED_SLACK_DAYS = 7  # calendar days fetched on top of the sessions needed, for weekends and holidays
+REFRESH_INTERVAL = 60
+MAX_SERIES = 200
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+INDICATORS = ["SMA50", "SMA200", "RSI14"]
+COLUMNS = OHLCV + INDICATORS
+_NS_PER_MINUTE = 60 * 10**9
+
+
+def _merge(first, second):
+    # OHLCV of two consecutive stretches of bars; `first` may be None
+    if first is None:
+        return second
+    return [first[0], max(first[1], second[1]), min(first[2], second[2]), second[3], first[4] + second[4]]
+
+
+class BarRing:
+    """Fixed-capacity ring of bars (int64 ns timestamps + one float64 row each); the oldest bar is overwritten."""
+
+    def __init__(self, capacity, width=len(COLUMNS)):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, width), np.nan)
+        self.size = 0
+        self._next = 0
+
+    def append(self, ts, row):
+        self.ts[self._next] = ts
+        self.values[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def arrays(self):
+        """Copies of (timestamps, values), oldest bar first."""
+        if self.size < self.capacity:
+            return self.ts[:self.size].copy(), self.values[:self.size].copy()
+        order = np.r_[self._next:self.capacity, 0:self._next]
+        return self.ts[order], self.values[order]
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.values.nbytes
+
+
+class BarResampler:
+    """Streams 1-minute bars into `minutes`-wide bars, advancing SMA / RSI once per completed bar.
+
+    The latest minute may be pushed again with revised values (the bar that
+    is still trading); it is only folded into its coarse bar once a later
+    minute arrives.
+    """
+
+    def __init__(self, minutes, capacity, sma_windows=(50, 200), rsi_window=14):
+        self.minutes = minutes
+        self.ring = BarRing(capacity)
+        self.sma_windows = sma_windows
+        self.rsi_window = rsi_window
+        self.indicators = IndicatorState(sma_windows, rsi_window)
+        self._bucket = None  # start of the bar being built, ns since epoch
+        self._folded = None  # OHLCV of its finished minutes
+        self._minute = None  # (ts, OHLCV) of the latest minute
+
+    @property
+    def warmup(self):
+        """Completed bars needed before every indicator has a value."""
+        return max(*self.sma_windows, self.rsi_window + 1)
+
+    def seed(self, closes):
+        """Start the indicators as if `closes` (bars before the first pushed minute) had been streamed."""
+        self.indicators = IndicatorState.from_history(closes, self.sma_windows, self.rsi_window)
+
+    def push(self, ts, minute_of_day, bar):
+        """Add one 1-minute OHLCV bar starting at `ts` (ns since epoch), `minute_of_day` in exchange time."""
+        if self._minute is not None:
+            if ts < self._minute[0]:
+                return  # already folded in
+            if ts == self._minute[0]:
+                self._minute = (ts, bar)
+                return
+        bucket = ts - ((minute_of_day - SESSION_OPEN) % self.minutes) * _NS_PER_MINUTE
+        if bucket != self._bucket:
+            self._complete()
+            self._bucket, self._folded = bucket, None
+        else:
+            self._folded = _merge(self._folded, self._minute[1])
+        self._minute = (ts, bar)
+
+    def _complete(self):
+        if self._bucket is None:
+            return
+        bar = _merge(self._folded, self._minute[1])
+        latest = self.indicators.update(bar[3])
+        self.ring.append(self._bucket, bar + [latest[name] for name in INDICATORS])
+
+    def forming(self):
+        """(start, OHLCV + provisional indicators) of the bar still being built, or None."""
+        if self._bucket is None:
+            return None
+        bar = _merge(self._folded, self._minute[1])
+        # Provisional values as if the bar closed now, without advancing the real state
+        latest = copy.deepcopy(self.indicators).update(bar[3])
+        return self._bucket, bar + [latest[name] for name in INDICATORS]
+
+
+class IntradaySeries:
+    """Every intraday interval of one ticker, fed from a single 1-minute stream."""
+
+    def __init__(self, ticker, days=INTRADAY_DAYS, intervals=INTERVALS, tz="America/New_York"):
+        self.ticker = ticker
+        self.tz = tz
+        self.resamplers = {
+            name: BarResampler(minutes, days * -(-SESSION_MINUTES // minutes))
+            for name, minutes in intervals.items()
+        }
+        self.last_ts = None  # latest minute pushed, ns since epoch
+        self.lock = threading.RLock()
+
+    def extend(self, minutes):
+        """Push a frame of 1-minute bars (Open / High / Low / Close / Volume); returns how many were pushed."""
+        if minutes is None or minutes.empty:
+            return 0
+        minutes = minutes.dropna(subset=["Close"]).sort_index()
+        index = minutes.index
+        if index.tz is None:
+            index = index.tz_localize(self.tz)
+        else:
+            self.tz = str(index.tz)
+        local = index.tz_convert(self.tz)
+        ts = index.as_unit("ns").asi8
+        minute_of_day = (local.hour * 60 + local.minute).to_numpy()
+        bars = minutes[OHLCV].to_numpy(dtype=np.float64)
+        with self.lock:
+            keep = np.flatnonzero(ts >= self.last_ts) if self.last_ts is not None else np.arange(len(ts))
+            resamplers = list(self.resamplers.values())
+            for t, m, bar in zip(ts[keep].tolist(), minute_of_day[keep].tolist(), bars[keep].tolist()):
+                for resampler in resamplers:
+                    resampler.push(t, m, bar)
+            if len(keep):
+                self.last_ts = int(ts[keep[-1]])
+        return len(keep)
+
+    def seed(self, fetch, first):
+        """Seed the indicators of every interval that would not warm up within one session.
+
+        `fetch(start, interval)` returns that interval's bars from `start`;
+        only bars that closed before `first` (the first minute to be pushed,
+        ns since epoch) are used. Must run before the first `extend`. Seeding
+        is best effort: an interval whose fetch fails starts cold.
+        """
+        for interval, resampler in self.resamplers.items():
+            per_session = -(-SESSION_MINUTES // resampler.minutes)
+            if resampler.warmup <= per_session:
+                continue
+            sessions = -(-resampler.warmup // per_session) + 1
+            start = pd.Timestamp(first, unit="ns", tz="UTC") - pd.Timedelta(days=sessions * 7 // 5 + SEED_SLACK_DAYS)
+            try:
+                bars = fetch(start, interval)
+            except Exception as e:
+                metrics.error("intraday.seed", e)
+                continue
+            if bars is None or bars.empty:
+                continue
+            ends = bars.index.as_unit("ns").asi8 + resampler.minutes * _NS_PER_MINUTE
+            closes = bars["Close"].to_numpy(dtype=np.float64)[ends <= first]
+            resampler.seed(closes[~np.isnan(closes)])
+
+    def frame(self, interval):
+        """Bars for `interval` with SMA50 / SMA200 / RSI14 columns, ending with the bar still being built."""
+        resampler = self.resamplers[interval]
+        with self.lock:
+            ts, values = resampler.ring.arrays()
+            forming = resampler.forming()
+        if forming is not None:
+            ts = np.append(ts, forming[0])
+            values = np.vstack([values, forming[1]])
+        index = pd.DatetimeIndex(pd.to_datetime(ts, unit="ns", utc=True), name="Datetime").tz_convert(self.tz)
+        return pd.DataFrame(values, index=index, columns=COLUMNS)
+
+    @property
+    def nbytes(self):
+        return sum(r.ring.nbytes for r in self.resamplers.values())
+
+
+class IntradayFeed:
+    """Per-ticker series shared by every session, topped up from the provider at most every `refresh` seconds."""
+
+    def __init__(self, refresh=REFRESH_INTERVAL, max_series=MAX_SERIES, clock=time.monotonic):
+        self.refresh_interval = refresh
+        self.max_series = max_series
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._series = OrderedDict()  # ticker -> IntradaySeries, least recently used first
+        self._refreshed = {}  # ticker -> clock time of the last successful fetch
+
+    def series(self, ticker):
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is None:
+                series = self._series[ticker] = IntradaySeries(ticker)
+                while len(self._series) > self.max_series:
+                    evicted, _ = self._series.popitem(last=False)
+                    self._refreshed.pop(evicted, None)
+            self._series.move_to_end(ticker)
+            return series
+
+    def refresh(self, ticker):
+        """Fetch the minutes after the last one seen; on upstream errors keep serving the bars already held."""
+        series = self.series(ticker)
+        with series.lock:  # concurrent sessions wait for one fetch instead of repeating it
+            with self._lock:
+                last = self._refreshed.get(ticker, -np.inf)
+            due = self._clock() - last >= self.refresh_interval
+            metrics.cache_result("intraday", "minutes", not due)
+            if not due:
+                return series
+            provider = get_provider()
+            start = None if series.last_ts is None else pd.Timestamp(series.last_ts, unit="ns", tz="UTC")
+            try:
+                minutes = provider.intraday(ticker, start=start)
+            except Exception as e:
+                if series.last_ts is None:
+                    raise
+                metrics.error("intraday", e)
+                return series
+            if series.last_ts is None and minutes is not None and not minutes.empty:
+                first = minutes.index.min().as_unit("ns").value
+                series.seed(lambda since, interval: provider.intraday(ticker, start=since, interval=interval), first)
+            series.extend(minutes)
+            with self._lock:
+                self._refreshed[ticker] = self._clock()
+        return series
+
+    def bars(self, ticker, interval):
+        return self.refresh(ticker).frame(interval)
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_feed():
+    """The process-wide IntradayFeed."""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = IntradayFeed()
+    return _feed
+
+
+def intraday_bars(ticker, interval):
+    """OHLCV + indicator bars for `ticker` at `interval` ("1m", "5m", "15m" or "1h")."""
+    return get_feed().bars(ticker, interval)
@@ -0,0 +1,308 @@
+"""Columnar transaction ledger for the mock portfolio.
+
+Trades live in parallel NumPy arrays (ticker id, signed quantity, price,
+timestamp). Positions, average cost, realized / unrealized P&L and the
+equity curve are derived from those arrays with vectorized operations, and
+every trade is written through to SQLite so a portfolio survives a restart.
+
+Cost basis uses the average-cost method: buys add to the basis, sells remove
+basis at the current average cost and realize the difference.
+"""
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from settings import cache_path
+
+DEFAULT_CASH = 10000.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    portfolio TEXT PRIMARY KEY,
+    initial_cash REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    portfolio TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    qty REAL NOT NULL,
+    price REAL NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_portfolio ON trades (portfolio, id);
+"""
+
+
+class LedgerStore:
+    """SQLite persistence for ledgers, keyed by portfolio id.
+
+    A portfolio's account row is written with its first trade (or reset), not
+    when it is opened, so sessions that never trade leave nothing behind.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path("portfolios.sqlite")
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Reap accounts that never traded at the default cash: reopening one rebuilds the same state
+            conn.execute(
+                "DELETE FROM accounts WHERE initial_cash = ? AND portfolio NOT IN (SELECT portfolio FROM trades)",
+                (DEFAULT_CASH,),
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, portfolio):
+        """Return (initial_cash, trades DataFrame) for `portfolio`, or (None, None) if it is unknown."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT initial_cash FROM accounts WHERE portfolio = ?", (portfolio,)).fetchone()
+            if row is None:
+                return None, None
+            trades = pd.read_sql_query(
+                "SELECT ticker, qty, price, ts FROM trades WHERE portfolio = ? ORDER BY id",
+                conn, params=(portfolio,),
+            )
+        return row[0], trades
+
+    def reset(self, portfolio, initial_cash):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM trades WHERE portfolio = ?", (portfolio,))
+            conn.execute("INSERT OR REPLACE INTO accounts VALUES (?, ?)", (portfolio, initial_cash))
+
+    def append(self, portfolio, initial_cash, tickers, qty, price, ts):
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO accounts VALUES (?, ?)", (portfolio, initial_cash))
+            conn.executemany(
+                "INSERT INTO trades (portfolio, ticker, qty, price, ts) VALUES (?, ?, ?, ?, ?)",
+                zip([portfolio] * len(qty), tickers, np.asarray(qty).tolist(),
+                    np.asarray(price).tolist(), np.asarray(ts).tolist()),
+            )
+
+
+class Ledger:
+    def __init__(self, initial_cash=DEFAULT_CASH, capacity=256, store=None, portfolio=None):
+        self.initial_cash = float(initial_cash)
+        self.store = store
+        self.portfolio = portfolio
+        self.symbols = []  # ticker id -> ticker
+        self._ids = {}  # ticker -> ticker id
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self._ticker = np.empty(capacity, dtype=np.int32)
+        self._qty = np.empty(capacity, dtype=np.float64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self.n = 0
+
+    @classmethod
+    def open(cls, portfolio, store=None, initial_cash=DEFAULT_CASH):
+        """Load `portfolio` from SQLite (empty if new); trades are written through, the first one creating it."""
+        store = store or LedgerStore()
+        saved_cash, trades = store.load(portfolio)
+        if saved_cash is None:
+            return cls(initial_cash, store=store, portfolio=portfolio)
+        ledger = cls(saved_cash, capacity=max(256, len(trades)), store=store, portfolio=portfolio)
+        if len(trades):
+            ledger._append(trades["ticker"].tolist(), trades["qty"].to_numpy(),
+                           trades["price"].to_numpy(), trades["ts"].to_numpy())
+        return ledger
+
+    # ---- Columns ----
+    @property
+    def ticker_ids(self):
+        return self._ticker[:self.n]
+
+    @property
+    def quantities(self):
+        return self._qty[:self.n]
+
+    @property
+    def prices(self):
+        return self._price[:self.n]
+
+    @property
+    def timestamps(self):
+        return self._ts[:self.n]
+
+    def _id(self, ticker):
+        if ticker not in self._ids:
+            self._ids[ticker] = len(self.symbols)
+            self.symbols.append(ticker)
+        return self._ids[ticker]
+
+    # ---- Recording ----
+    def _append(self, tickers, qty, price, ts):
+        k = len(qty)
+        if self.n + k > len(self._qty):
+            capacity = max(2 * len(self._qty), self.n + k)
+            for name in ("_ticker", "_qty", "_price", "_ts"):
+                old = getattr(self, name)
+                new = np.empty(capacity, dtype=old.dtype)
+                new[:self.n] = old[:self.n]
+                setattr(self, name, new)
+        end = self.n + k
+        self._ticker[self.n:end] = [self._id(t) for t in tickers]
+        self._qty[self.n:end] = qty
+        self._price[self.n:end] = price
+        self._ts[self.n:end] = ts
+        self.n = end
+
+    def record(self, ticker, qty, price, ts=None):
+        """Record one trade: positive `qty` buys, negative `qty` sells. Selling more than is held raises ValueError."""
+        if qty < 0 and -qty > self.position(ticker) + 1e-9:
+            raise ValueError(f"Cannot sell {-qty:g} {ticker}: only {self.position(ticker):g} held.")
+        self.record_many([ticker], [qty], [price], [time.time() if ts is None else ts])
+
+    def record_many(self, tickers, qty, price, ts):
+        """Append a batch of trades in one vectorized copy (and one SQLite transaction)."""
+        qty = np.asarray(qty, dtype=np.float64)
+        price = np.asarray(price, dtype=np.float64)
+        ts = np.asarray(ts, dtype=np.float64)
+        self._append(list(tickers), qty, price, ts)
+        if self.store is not None:
+            self.store.append(self.portfolio, self.initial_cash, list(tickers), qty, price, ts)
+
+    def reset(self, initial_cash=DEFAULT_CASH):
+        self.initial_cash = float(initial_cash)
+        self.symbols, self._ids = [], {}
+        self._alloc(256)
+        if self.store is not None:
+            self.store.reset(self.portfolio, self.initial_cash)
+
+    # ---- Derived state ----
+    @property
+    def cash(self):
+        return self.initial_cash - float(np.dot(self.quantities, self.prices))
+
+    def position(self, ticker):
+        tid = self._ids.get(ticker)
+        if tid is None:
+            return 0.0
+        return float(self.quantities[self.ticker_ids == tid].sum())
+
+    def positions(self):
+        """Open positions as a Series of quantities indexed by ticker."""
+        qty = np.bincount(self.ticker_ids, weights=self.quantities, minlength=len(self.symbols))
+        held = ~np.isclose(qty, 0)
+        return pd.Series(qty[held], index=np.array(self.symbols, dtype=object)[held], dtype="float64")
+
+    def _cost_basis_scan(self):
+        """Per-trade average-cost scan, vectorized over all tickers.
+
+        Sells leave the average cost unchanged and a buy blends it with its
+        price: avg_k = w_k * avg_{k-1} + (1 - w_k) * price_k, with
+        w_k = position_before / position_after. The recurrence restarts (w = 0)
+        at each ticker's first trade and after every full close, and is solved
+        by composing the affine steps with a doubling scan. The weights lie in
+        [0, 1] and nothing is divided by their products, so the result stays
+        exact on arbitrarily long ledgers.
+        """
+        n = self.n
+        order = np.lexsort((np.arange(n), self.ticker_ids))
+        ids, q, p = self.ticker_ids[order], self.quantities[order], self.prices[order]
+
+        first = np.r_[True, ids[1:] != ids[:-1]]
+        starts = np.flatnonzero(first)
+        lengths = np.diff(np.r_[starts, n])
+        cs = np.cumsum(q)
+        pos_after = cs - np.repeat(cs[first] - q[first], lengths)
+        pos_after[np.isclose(pos_after, 0)] = 0.0
+        pos_before = pos_after - q
+        seg_start = first | np.r_[False, pos_after[:-1] == 0]
+        buy = q > 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = np.where(buy & (pos_before > 0), pos_before / pos_after, 0.0)
+        a = np.where(buy, w, 1.0)
+        b = np.where(buy, (1.0 - w) * p, 0.0)
+        a[seg_start] = 0.0
+        # Compose avg -> a * avg + b over growing spans; a is 0 at segment starts, so nothing leaks across them
+        shift = 1
+        while shift < n:
+            a_prev, b_prev = a[:-shift], b[:-shift]
+            a, b = a.copy(), b.copy()
+            b[shift:] += a[shift:] * b_prev
+            a[shift:] *= a_prev
+            shift *= 2
+        avg_after = b
+
+        basis_after = np.where(pos_after > 0, avg_after * pos_after, 0.0)
+        avg_before = np.where(seg_start | (pos_before <= 0), np.nan, np.r_[np.nan, avg_after[:-1]])
+        realized = np.where(buy, 0.0, (p - avg_before) * -q)
+        last = np.r_[starts[1:], n] - 1
+        return ids, realized, last, pos_after, basis_after
+
+    def cost_basis(self):
+        """DataFrame indexed by ticker: quantity, avg_cost, cost_basis and realized_pnl (closed tickers included)."""
+        if self.n == 0:
+            return pd.DataFrame(columns=["quantity", "avg_cost", "cost_basis", "realized_pnl"], dtype="float64")
+        ids, realized, last, pos_after, basis_after = self._cost_basis_scan()
+        quantity = pos_after[last]
+        basis = basis_after[last]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_cost = np.where(quantity > 0, basis / quantity, np.nan)
+        realized_pnl = np.bincount(ids, weights=realized, minlength=len(self.symbols))[ids[last]]
+        return pd.DataFrame(
+            {"quantity": quantity, "avg_cost": avg_cost, "cost_basis": basis, "realized_pnl": realized_pnl},
+            index=pd.Index([self.symbols[i] for i in ids[last]], name="ticker"),
+        )
+
+    def realized_pnl(self):
+        return float(self.cost_basis()["realized_pnl"].sum())
+
+    def summary(self, latest_prices):
+        """Open holdings with avg cost, latest price, market value and unrealized P&L.
+
+        `latest_prices` is a mapping or Series of ticker -> price (missing -> NaN).
+        """
+        basis = self.cost_basis()
+        held = basis[basis["quantity"] > 0]
+        prices = pd.Series(latest_prices, dtype="float64").reindex(held.index)
+        out = pd.DataFrame({
+            "Ticker": held.index,
+            "Quantity": held["quantity"].to_numpy(),
+            "Avg Cost": held["avg_cost"].to_numpy(),
+            "Latest Price": prices.to_numpy(),
+        })
+        out["Market Value"] = out["Quantity"] * out["Latest Price"]
+        out["Unrealized P&L"] = out["Market Value"] - held["cost_basis"].to_numpy()
+        return out
+
+    def trades(self):
+        return pd.DataFrame({
+            "Time": pd.to_datetime(self.timestamps, unit="s", utc=True),
+            "Ticker": np.array(self.symbols, dtype=object)[self.ticker_ids] if self.n else [],
+            "Side": np.where(self.quantities > 0, "Buy", "Sell"),
+            "Quantity": np.abs(self.quantities),
+            "Price": self.prices,
+        })
+
+    def equity_curve(self, closes):
+        """Cash plus marked-to-market holdings for every row of `closes` (dates x tickers).
+
+        A trade counts from the first close at or after its timestamp.
+        """
+        dates = closes.index
+        trade_times = pd.to_datetime(self.timestamps, unit="s", utc=True)
+        if dates.tz is None:
+            trade_times = trade_times.tz_localize(None)
+        else:
+            trade_times = trade_times.tz_convert(dates.tz)
+        row = np.clip(dates.searchsorted(trade_times, side="left"), 0, len(dates) - 1)
+
+        columns = {t: i for i, t in enumerate(closes.columns)}
+        col = np.array([columns.get(t, -1) for t in self.symbols], dtype=np.int64)[self.ticker_ids]
+        priced = col >= 0
+
+        delta = np.zeros((len(dates), len(closes.columns)))
+        np.add.at(delta, (row[priced], col[priced]), self.quantities[priced])
+        cash_delta = np.zeros(len(dates))
+        np.add.at(cash_delta, row, -self.quantities * self.prices)
+
+        holdings = np.cumsum(delta, axis=0) * np.nan_to_num(closes.ffill().to_numpy(dtype=np.float64))
+        equity = self.initial_cash + np.cumsum(cash_delta) + holdings.sum(axis=1)
+        return pd.Series(equity, index=dates, name="Equity")
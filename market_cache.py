@@ -0,0 +1,239 @@
+"""Process-wide market data cache shared by every Streamlit session.
+
+Entries expire after a per-data-type TTL. Concurrent requests for the same
+key are coalesced: the first caller fetches upstream while the others wait
+for its result, so 50 sessions opening AAPL at once cost one request.
+Expired entries are kept for up to MAX_STALE seconds and served
+stale-while-revalidate: the caller gets the old value at once while one
+background load refreshes it, and if that load fails (upstream down, circuit
+open) the last good value stays in place. `is_stale(key)` tells the UI when
+it is showing such a value. Cached values are shared between sessions and
+must be treated as read-only.
+"""
+import threading
+import time
+
+import pandas as pd
+
+import metrics
+from bar_cache import default_cache
+from providers import get_provider
+from quotes import fetch_latest_prices
+
+INFO_TTL = 60 * 60
+HISTORY_TTL = 5 * 60
+QUOTE_TTL = 30
+MAX_STALE = 24 * 60 * 60  # how long past expiry a value may still be served while upstream is down
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """Thread-safe TTL cache that runs at most one loader per key at a time."""
+
+    def __init__(self, clock=time.monotonic, max_entries=10000, name="market", max_stale=MAX_STALE):
+        self.name = name
+        self._clock = clock
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, expires_at, fetched_at wall-clock time)
+        self._flights = {}  # key -> _Flight for loads in progress
+
+    def _kind(self, key):
+        # Keys are tuples led by the data type, e.g. ("info", "AAPL")
+        return key[0] if isinstance(key, tuple) else self.name
+
+    def _lookup(self, key, now):
+        """("fresh" | "stale" | None, value): stale entries are expired but within max_stale."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] + self.max_stale <= now:
+            return None, None
+        return ("fresh" if entry[1] > now else "stale"), entry[0]
+
+    def get(self, key, loader, ttl):
+        """Return the cached value for `key`, calling `loader()` once if it is missing or expired.
+
+        An expired value is returned immediately while `loader()` refreshes it in the background.
+        """
+        with self._lock:
+            state, value = self._lookup(key, self._clock())
+            flight = self._flights.get(key)
+            leader = state != "fresh" and flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        # Joining another caller's in-flight load costs no upstream request, so it counts as a hit
+        metrics.cache_result(self.name, self._kind(key), "stale" if state == "stale" else not leader)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if leader:
+                threading.Thread(target=self._load, args=(key, loader, ttl, flight), daemon=True).start()
+            return value
+        if not leader:
+            return self._wait(flight)
+        self._load(key, loader, ttl, flight)
+        return self._wait(flight)
+
+    def _load(self, key, loader, ttl, flight):
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            metrics.error(f"{self.name}.{self._kind(key)}", e)
+        with self._lock:
+            if flight.error is None:
+                self._store(key, flight.value, self._clock() + ttl)
+            del self._flights[key]
+        flight.done.set()
+
+    def get_many(self, keys, bulk_loader, ttl):
+        """Return {key: value} for `keys`, loading every missing key with a single `bulk_loader(keys)` call.
+
+        `bulk_loader` returns a dict; keys already being loaded by another
+        caller are waited on instead of requested again. Expired keys are
+        returned as-is and refreshed by one background `bulk_loader` call.
+        """
+        results, waiting, claimed, revalidate = {}, {}, {}, {}
+        with self._lock:
+            now = self._clock()
+            for key in dict.fromkeys(keys):
+                state, value = self._lookup(key, now)
+                if state is not None:
+                    results[key] = value
+                if state == "fresh":
+                    continue
+                if key in self._flights:
+                    if state is None:
+                        waiting[key] = self._flights[key]
+                elif state == "stale":
+                    revalidate[key] = self._flights[key] = _Flight()
+                else:
+                    claimed[key] = self._flights[key] = _Flight()
+
+        for key in dict.fromkeys(keys):
+            metrics.cache_result(self.name, self._kind(key), "stale" if key in revalidate else key not in claimed)
+
+        if revalidate:
+            threading.Thread(target=self._load_many, args=(revalidate, bulk_loader, ttl), daemon=True).start()
+        if claimed:
+            self._load_many(claimed, bulk_loader, ttl)
+            waiting.update(claimed)
+
+        for key, flight in waiting.items():
+            try:
+                results[key] = self._wait(flight)
+            except Exception:
+                continue
+        return results
+
+    def _load_many(self, claimed, bulk_loader, ttl):
+        try:
+            loaded = bulk_loader(list(claimed))
+            error = None
+        except Exception as e:
+            loaded, error = {}, e
+            metrics.error(f"{self.name}.{self._kind(next(iter(claimed)))}", e)
+        with self._lock:
+            expires = self._clock() + ttl
+            for key, flight in claimed.items():
+                if error is None and key in loaded:
+                    flight.value = loaded[key]
+                    self._store(key, flight.value, expires)
+                else:
+                    flight.error = error or KeyError(key)
+                del self._flights[key]
+        for flight in claimed.values():
+            flight.done.set()
+
+    def is_stale(self, key):
+        """True if `key` holds an expired value (one that is served because a refresh has not succeeded)."""
+        with self._lock:
+            return self._lookup(key, self._clock())[0] == "stale"
+
+    def fetched_at(self, key):
+        """Wall-clock time the cached value for `key` was loaded, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else entry[2]
+
+    def _store(self, key, value, expires_at):
+        # Caller holds the lock
+        if len(self._entries) >= self.max_entries:
+            now = self._clock()
+            self._entries = {k: e for k, e in self._entries.items() if e[1] + self.max_stale > now}
+            if len(self._entries) >= self.max_entries:
+                # Still full of usable entries: drop the ones closest to expiry
+                for k, _ in sorted(self._entries.items(), key=lambda item: item[1][1])[:self.max_entries // 10 or 1]:
+                    del self._entries[k]
+        self._entries[key] = (value, expires_at, time.time())
+
+    def _wait(self, flight):
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_cache = SingleFlightCache()
+
+
+def shared_cache():
+    return _cache
+
+
+def get_info(ticker):
+    """Provider `info` dict for `ticker`, shared across sessions for INFO_TTL seconds."""
+    return _cache.get(("info", ticker), lambda: get_provider().info(ticker), INFO_TTL)
+
+
+def get_history(ticker, period):
+    """Daily OHLCV bars via the on-disk bar cache, shared across sessions for HISTORY_TTL seconds."""
+    return _cache.get(("history", ticker, period), lambda: default_cache().history(ticker, period), HISTORY_TTL)
+
+
+def get_closes(tickers, period):
+    """Daily closes (dates x tickers) for many tickers: only uncached tickers are fetched, then one bulk read."""
+    def load():
+        cache = default_cache()
+        for ticker in tickers:
+            if not cache.covers(ticker, period):
+                try:
+                    cache.history(ticker, period, refresh=False)
+                except Exception as e:
+                    metrics.error("history", e)
+                    continue
+        return cache.closes(tickers, period)
+
+    tickers = sorted(set(tickers))
+    return _cache.get(("closes", tuple(tickers), period), load, HISTORY_TTL)
+
+
+def get_latest_prices(tickers):
+    """Latest closes as a Series indexed by ticker; only uncached tickers go into the bulk download."""
+    def load(keys):
+        prices = fetch_latest_prices([key[1] for key in keys])
+        # Unpriced tickers are left out so they are retried next time instead of cached as NaN
+        return {("quote", t): float(p) for t, p in prices.dropna().items()}
+
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    found = _cache.get_many([("quote", t) for t in tickers], load, QUOTE_TTL)
+    return pd.Series({t: found.get(("quote", t), float("nan")) for t in tickers}, dtype="float64")
+
+
+def stale_since(keys):
+    """Oldest fetch time among `keys` that are currently served stale, or None if all are fresh."""
+    times = [_cache.fetched_at(key) for key in keys if _cache.is_stale(key)]
+    return min(times) if times else None
@@ -0,0 +1,245 @@
+"""Process-wide timing spans and counters, exported as structured logs and Prometheus text.
+
+`span("history")` times a stage into a latency histogram (plus a small
+reservoir of recent samples for p50 / p99 in the debug panel) and counts
+the exceptions it lets through. Each finished span is logged as one JSON
+line on the "tradesense.metrics" logger.
+
+Set TRADESENSE_METRICS_PORT to serve /metrics over HTTP, or
+TRADESENSE_METRICS_FILE to have the text exposition rewritten every
+METRICS_INTERVAL seconds (e.g. for node_exporter's textfile collector).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+METRICS_PORT = os.environ.get("TRADESENSE_METRICS_PORT")
+METRICS_FILE = os.environ.get("TRADESENSE_METRICS_FILE")
+METRICS_INTERVAL = 15
+LOG_LEVEL = os.environ.get("TRADESENSE_LOG_LEVEL")
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESERVOIR_SIZE = 1024
+
+STAGE_METRIC = "tradesense_stage_seconds"
+COUNTER_HELP = {
+    "tradesense_cache_requests_total": "Cache lookups by cache, kind and result (hit / miss / stale).",
+    "tradesense_errors_total": "Exceptions raised by a stage or upstream source.",
+    "tradesense_upstream_calls_total": "Guarded upstream calls by source and result (ok / error / rate_limited / circuit_open).",
+}
+
+log = logging.getLogger("tradesense.metrics")
+if not LOG_LEVEL:
+    # Unconfigured, handled errors must not fall through to logging's last-resort stderr handler
+    log.addHandler(logging.NullHandler())
+
+
+def _escape(value):
+    # Prometheus label values escape backslash, double quote and line feed
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+class Metrics:
+    """Thread-safe counters and per-stage latency histograms."""
+
+    def __init__(self, buckets=BUCKETS, reservoir=RESERVOIR_SIZE):
+        self.buckets = buckets
+        self.reservoir = reservoir
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, sorted label pairs) -> value
+        self._histograms = {}  # stage -> [bucket counts, sum, count]
+        self._recent = {}  # stage -> deque of recent durations
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = [[0] * len(self.buckets), 0.0, 0]
+                self._recent[stage] = deque(maxlen=self.reservoir)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+            self._recent[stage].append(seconds)
+
+    @contextmanager
+    def span(self, stage, **fields):
+        """Time the enclosed block as `stage`; exceptions are counted and re-raised."""
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except Exception:
+            ok = False
+            self.inc("tradesense_errors_total", source=stage)
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(stage, seconds)
+            if log.isEnabledFor(logging.INFO):
+                log.info(json.dumps({"event": "span", "stage": stage, "ms": round(seconds * 1000, 3),
+                                     "ok": ok, **fields}, default=str))
+
+    def error(self, source, exc=None):
+        """Count an upstream failure that was handled (swallowed) by the caller."""
+        self.inc("tradesense_errors_total", source=source)
+        if log.isEnabledFor(logging.WARNING):
+            log.warning(json.dumps({"event": "error", "source": source, "error": repr(exc)}))
+
+    # ---- Views ----
+    def stage_summary(self):
+        """DataFrame per stage: count, p50 / p99 / last latency (ms, over recent samples) and total seconds."""
+        with self._lock:
+            rows = [
+                (stage, hist[2], np.array(self._recent[stage]), hist[1])
+                for stage, hist in self._histograms.items()
+            ]
+        return pd.DataFrame(
+            [{
+                "Stage": stage,
+                "Count": count,
+                "p50 (ms)": np.percentile(recent, 50) * 1000,
+                "p99 (ms)": np.percentile(recent, 99) * 1000,
+                "Last (ms)": recent[-1] * 1000,
+                "Total (s)": total,
+            } for stage, count, recent, total in sorted(rows)],
+            columns=["Stage", "Count", "p50 (ms)", "p99 (ms)", "Last (ms)", "Total (s)"],
+        )
+
+    def counters(self):
+        with self._lock:
+            items = sorted(self._counters.items())
+        return pd.DataFrame(
+            [{"Metric": name, "Labels": _labels(labels), "Value": value} for (name, labels), value in items],
+            columns=["Metric", "Labels", "Value"],
+        )
+
+    def prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((stage, list(h[0]), h[1], h[2]) for stage, h in self._histograms.items())
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{{{_labels(labels)}}} {value}")
+        if histograms:
+            lines.append(f"# HELP {STAGE_METRIC} Time spent in each analysis / portfolio stage.")
+            lines.append(f"# TYPE {STAGE_METRIC} histogram")
+        for stage, counts, total, count in histograms:
+            stage = _escape(stage)
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="{bound}"}} {n}')
+            lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{STAGE_METRIC}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{STAGE_METRIC}_count{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._recent.clear()
+
+
+_metrics = Metrics()
+
+
+def registry():
+    return _metrics
+
+
+def span(stage, **fields):
+    return _metrics.span(stage, **fields)
+
+
+def inc(name, value=1, **labels):
+    _metrics.inc(name, value, **labels)
+
+
+def cache_result(cache, kind, hit):
+    """Count a cache lookup; `hit` is a bool, or "stale" for an expired value served while refreshing."""
+    result = hit if isinstance(hit, str) else "hit" if hit else "miss"
+    _metrics.inc("tradesense_cache_requests_total", cache=cache, kind=kind, result=result)
+
+
+def error(source, exc=None):
+    _metrics.error(source, exc)
+
+
+# ---- Export ----
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _metrics.prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_prometheus(path):
+    """Atomically replace `path` with the current exposition."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(_metrics.prometheus())
+    os.replace(tmp, path)
+
+
+def _write_loop(path, interval):
+    while True:
+        try:
+            write_prometheus(path)
+        except OSError as e:
+            log.warning(json.dumps({"event": "export_failed", "path": path, "error": repr(e)}))
+        time.sleep(interval)
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Start the configured exporters once per process (safe to call on every Streamlit rerun)."""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    if LOG_LEVEL:
+        logging.basicConfig(format="%(message)s")
+        log.setLevel(LOG_LEVEL.upper())
+    if port:
+        server = ThreadingHTTPServer(("", int(port)), _Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    if path:
+        threading.Thread(target=_write_loop, args=(path, interval), name="metrics-file", daemon=True).start()
@@ -0,0 +1,109 @@
+"""NewsAPI.org client: one pooled HTTP session, strict timeouts and a TTL cache per (ticker, page size)."""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from market_cache import SingleFlightCache
+from providers import get_provider
+from resilience import UpstreamError, get_guard
+
+NEWSAPI_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/everything")
+NEWS_TTL = 10 * 60
+TIMEOUT = (3.05, 5)  # (connect, read) seconds
+POOL_SIZE = 16
+
+
+class NewsAPIError(UpstreamError):
+    """NewsAPI is failing or throttling (5xx, 429, garbled replies): retried, and counted by the breaker."""
+
+
+class NewsAPIRequestError(Exception):
+    """NewsAPI rejected the request itself (invalid or exhausted key, bad parameters): retrying cannot help."""
+
+
+class NewsClient:
+    def __init__(self, api_key, base_url=NEWSAPI_URL, timeout=TIMEOUT, ttl=NEWS_TTL, pool_size=POOL_SIZE):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.ttl = ttl
+        self.pool_size = pool_size
+        # requests is imported with the first client rather than on app startup
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._cache = SingleFlightCache(name="news")
+        self.guard = get_guard("news")
+
+    def _fetch(self, ticker, page_size):
+        return self.guard.call(self._request, ticker, page_size)
+
+    def _request(self, ticker, page_size):
+        response = self.session.get(
+            self.base_url,
+            params={
+                "q": ticker,
+                "language": "en",
+                "sortBy": "publishedAt",
+                "pageSize": page_size,
+                "apiKey": self.api_key,
+            },
+            timeout=self.timeout,
+        )
+        status = response.status_code
+        # 4xx other than 429 is about this request or key, not the upstream's health
+        error = NewsAPIRequestError if 400 <= status < 500 and status != 429 else NewsAPIError
+        try:
+            data = response.json()
+        except ValueError:
+            # Gateways and proxies answer errors with HTML, not NewsAPI's JSON
+            raise error(f"NewsAPI returned HTTP {status}") from None
+        if data.get("status") != "ok":
+            raise error(data.get("message") or f"NewsAPI returned HTTP {status}")
+        return data["articles"]
+
+    def headlines(self, ticker, page_size=5):
+        """Latest articles for `ticker`; cached for `ttl` seconds. Raises on upstream errors."""
+        return self._cache.get(("news", ticker, page_size), lambda: self._fetch(ticker, page_size), self.ttl)
+
+    def headlines_many(self, tickers, page_size=5):
+        """Fetch headlines for a whole watchlist concurrently; returns {ticker: articles} ([] on failure)."""
+        tickers = list(dict.fromkeys(tickers))
+
+        def one(ticker):
+            try:
+                return self.headlines(ticker, page_size)
+            except Exception:
+                return []
+
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(tickers) or 1)) as pool:
+            return dict(zip(tickers, pool.map(one, tickers)))
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """Shared NewsClient per API key, so every session reuses the same connection pool and cache."""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = NewsClient(api_key)
+        return _clients[api_key]
+
+
+# ----- News Fetching Function -----
+def get_news(ticker, api_key, page_size=5):
+    try:
+        return get_provider().news(ticker, api_key, page_size)
+    except Exception as e:
+        metrics.error("news", e)
+        return []
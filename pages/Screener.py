@@ -0,0 +1,58 @@
+import streamlit as st
+
+from assets import load_logo
+from screener import run_screener
+
+st.set_page_config(page_title="TradeSense Screener (Educational Only)", page_icon=load_logo())
+
+st.markdown(
+    "<div style='background-color: #FFF3CD; padding: 10px; border-radius: 8px; border: 1px solid #FFEEBA; color: #8A6D3B;'>"
+    "<b>Educational only:</b> This screener does NOT provide financial advice. Rankings are for learning and demo purposes only.</div><br>",
+    unsafe_allow_html=True,
+)
+
+st.title("NASDAQ Screener :mag:")
+st.write(
+    "Applies the same SMA50, SMA200, P/E-vs-sector and RSI rules as the single-stock page "
+    "to every NASDAQ-listed stock and ranks the results."
+)
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def screen(limit, cached_only):
+    return run_screener(limit=limit or None, refresh=not cached_only)
+
+
+col1, col2 = st.columns([2, 2])
+with col1:
+    limit = st.number_input("Tickers to screen (0 = all)", min_value=0, max_value=10000, value=0, step=100)
+with col2:
+    cached_only = st.checkbox("Use cached data only", value=True,
+                              help="Only fetch tickers missing from the local cache. The first run still downloads everything.")
+
+if st.button("Run Screener"):
+    with st.spinner("Scoring the universe..."):
+        try:
+            st.session_state.screener_table, st.session_state.screener_skipped = screen(int(limit), cached_only)
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
+
+table = st.session_state.get("screener_table")
+skipped = st.session_state.get("screener_skipped") or {}
+if any(skipped.values()):
+    st.warning(f"Upstream errors: {skipped['history']} tickers could not be refreshed and "
+               f"{skipped['fundamentals']} are missing fundamentals.")
+if table is not None:
+    if table.empty:
+        st.info("No price data could be loaded for the selected tickers.")
+    else:
+        counts = table["Recommendation"].value_counts()
+        st.write(", ".join(f"**{rec}:** {n}" for rec, n in counts.items()))
+        # st.dataframe columns are sortable by clicking their headers
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        st.download_button("Download CSV", table.to_csv(index=False), file_name="tradesense_screener.csv")
+
+st.caption(
+    "This screener is for educational purposes only and is not financial advice. "
+    "Always do your own research and consult a financial advisor before investing."
+)
@@ -0,0 +1,121 @@
+"""Background quote poller for live portfolio valuation.
+
+One daemon thread refreshes the union of tickers held in any session on a
+fixed interval and publishes the prices as an immutable snapshot. Rendering a
+portfolio is then a dict lookup plus a vectorized multiply, never a network call.
+"""
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import numpy as np
+
+import metrics
+from quotes import fetch_latest_prices
+
+POLL_INTERVAL = float(os.environ.get("TRADESENSE_POLL_INTERVAL", "15"))
+# Sessions that have not re-registered their holdings for this long stop being polled
+SESSION_TTL = 60 * 60
+
+
+class QuotePoller:
+    def __init__(self, interval=POLL_INTERVAL, fetch=fetch_latest_prices, session_ttl=SESSION_TTL):
+        self.interval = interval
+        self.fetch = fetch
+        self.session_ttl = session_ttl
+        self._lock = threading.Lock()
+        self._sessions = {}  # session id -> (frozenset of tickers, last seen)
+        self._prices = MappingProxyType({})
+        self._updated_at = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- Sessions ----
+    def register(self, session_id, tickers):
+        """Record the tickers a session holds; new tickers trigger an immediate poll."""
+        tickers = frozenset(t for t in tickers if t)
+        with self._lock:
+            if tickers:
+                self._sessions[session_id] = (tickers, time.monotonic())
+            else:
+                self._sessions.pop(session_id, None)
+            unpriced = tickers - self._prices.keys()
+        self.start()
+        if unpriced:
+            self._wake.set()
+
+    def tracked_tickers(self):
+        with self._lock:
+            cutoff = time.monotonic() - self.session_ttl
+            self._sessions = {sid: s for sid, s in self._sessions.items() if s[1] >= cutoff}
+            return sorted(set().union(*(s[0] for s in self._sessions.values())))
+
+    # ---- Snapshot ----
+    def snapshot(self):
+        """Read-only {ticker: price} mapping from the latest poll."""
+        return self._prices
+
+    @property
+    def updated_at(self):
+        return self._updated_at
+
+    def is_stale(self, polls=4):
+        """True when the snapshot has not been refreshed for `polls` intervals (upstream degraded)."""
+        return self._updated_at is not None and time.time() - self._updated_at > polls * self.interval
+
+    def prices_for(self, tickers):
+        """Prices for `tickers` as a float64 array (NaN where not yet polled)."""
+        prices = self._prices
+        return np.array([prices.get(t, np.nan) for t in tickers], dtype=np.float64)
+
+    def publish(self, prices):
+        """Merge `{ticker: price}` into the snapshot (NaN prices are ignored)."""
+        fresh = {t: float(p) for t, p in prices.items() if p == p}
+        if not fresh:
+            return
+        with self._lock:
+            merged = dict(self._prices)
+            merged.update(fresh)
+            self._prices = MappingProxyType(merged)
+            self._updated_at = time.time()
+
+    # ---- Thread ----
+    def poll_once(self):
+        tickers = self.tracked_tickers()
+        if tickers:
+            self.publish(self.fetch(tickers).to_dict())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                metrics.error("poller", e)  # keep serving the last snapshot; the next tick retries
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="quote-poller", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller():
+    """The process-wide QuotePoller shared by every session."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = QuotePoller()
+    return _poller
@@ -0,0 +1,326 @@
+"""Memory-mapped columnar price store for the whole universe.
+
+One .npy file per field (open, high, low, close, volume) holds a (tickers x
+dates) matrix opened with `np.load(mmap_mode="r")`. A ticker is a row, the
+date axis (naive exchange-local dates) is shared, and meta.json maps tickers
+to rows. Screeners, backtests and correlation work slice these arrays
+without deserializing anything, and every process that opens the store
+shares the same pages through the OS page cache.
+
+Files are allocated with spare rows and columns, so the daily update
+(`append`) normally writes in place. When the store outgrows that capacity,
+or a frame brings dates inside the existing range, the files are rewritten
+as a new generation and swapped in by replacing meta.json. There is one
+writer at a time (the update job); readers call `refresh()` to pick up its
+changes. Build or update the store with `python price_store.py`.
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+import metrics
+from bar_cache import default_cache, period_start
+from settings import cache_path
+from universe import load_nasdaq_universe
+
+FIELDS = ("open", "high", "low", "close", "volume")
+COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+DATE_CHUNK = 256  # spare capacity is allocated in steps of this many dates...
+TICKER_CHUNK = 512  # ...and this many tickers
+STORE_PERIOD = "10y"
+APPEND_BATCH = 200
+
+
+def _round_up(n, step):
+    return max(step, -(-n // step) * step)
+
+
+def _file(path, name, generation):
+    return os.path.join(path, f"{name}.{generation}.npy")
+
+
+def _as_dates(index):
+    """Naive datetime64[D] dates for a bar index (tz-aware indexes keep their local calendar date)."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().to_numpy().astype("datetime64[D]")
+
+
+def _as_date(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return np.datetime64(ts.normalize().date(), "D")
+
+
+@dataclass(frozen=True)
+class StoreView:
+    """Picklable reference to a slice of one field; `load()` maps it in the calling process.
+
+    Pass this to worker processes instead of an array: each worker maps the
+    same file, so the prices are shared through the page cache rather than
+    pickled. Contiguous rows load as a zero-copy view.
+    """
+
+    path: str
+    generation: int
+    field: str
+    rows: object  # slice, or a tuple of row numbers
+    cols: slice
+
+    def load(self):
+        values = np.load(_file(self.path, self.field, self.generation), mmap_mode="r")
+        rows = self.rows if isinstance(self.rows, slice) else list(self.rows)
+        return values[rows, self.cols]
+
+
+class PriceStore:
+    """(tickers x dates) OHLCV matrices on disk; `dtype` applies when the files are (re)allocated."""
+
+    def __init__(self, path=None, dtype="float64"):
+        self.path = path or cache_path("prices")
+        self.dtype = np.dtype(dtype)
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self._load_meta()
+
+    # ---- Metadata ----
+    @property
+    def _meta_file(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _load_meta(self):
+        try:
+            with open(self._meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            self._meta_mtime = os.stat(self._meta_file).st_mtime_ns
+        except FileNotFoundError:
+            meta = {"generation": 0, "tickers": [], "n_dates": 0, "dtype": self.dtype.str}
+        self.generation = meta["generation"]
+        self.tickers = meta["tickers"]
+        self.rows = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.n_dates = meta["n_dates"]
+        self.dtype = np.dtype(meta["dtype"])
+        self._arrays = {}
+
+    def _write_meta(self):
+        meta = {"generation": self.generation, "tickers": self.tickers, "n_dates": self.n_dates,
+                "dtype": self.dtype.str}
+        tmp = f"{self._meta_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_file)
+        self._meta_mtime = os.stat(self._meta_file).st_mtime_ns
+
+    def refresh(self):
+        """Re-read meta.json if a writer changed it; returns True when the store moved on."""
+        try:
+            mtime = os.stat(self._meta_file).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._meta_mtime:
+            return False
+        with self._lock:
+            self._load_meta()
+        return True
+
+    # ---- Reading ----
+    def _array(self, name, mode="r"):
+        key = (name, mode)
+        if key not in self._arrays:
+            self._arrays[key] = np.load(_file(self.path, name, self.generation), mmap_mode=mode)
+        return self._arrays[key]
+
+    def __contains__(self, ticker):
+        return ticker in self.rows
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def dates(self):
+        if not self.n_dates:
+            return pd.DatetimeIndex([], name="Date")
+        return pd.DatetimeIndex(self._array("dates")[:self.n_dates], name="Date")
+
+    def field(self, name):
+        """Read-only (tickers x dates) view of one field; no data is read until it is used."""
+        if not self.tickers:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self._array(name)[:len(self.tickers), :self.n_dates]
+
+    def _rows(self, tickers):
+        if tickers is None:
+            return slice(0, len(self.tickers))
+        rows = [self.rows[t] for t in tickers]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return slice(rows[0], rows[0] + len(rows))
+        return tuple(rows)
+
+    def _cols(self, start=None, end=None):
+        if not self.n_dates:
+            return slice(0, 0)
+        dates = self._array("dates")[:self.n_dates]
+        lo = 0 if start is None else int(np.searchsorted(dates, _as_date(start)))
+        hi = self.n_dates if end is None else int(np.searchsorted(dates, _as_date(end), side="right"))
+        return slice(lo, hi)
+
+    def window(self, field, tickers=None, start=None, end=None):
+        """(values, dates, tickers) for a (tickers x dates) slice of `field`.
+
+        `start` / `end` are inclusive dates. The values are a view of the
+        mapped file when `tickers` is None or names consecutive rows, else a copy.
+        """
+        rows, cols = self._rows(tickers), self._cols(start, end)
+        values = self.field(field)
+        values = values[rows, cols] if isinstance(rows, slice) else values[list(rows), cols]
+        return values, self.dates[cols], list(self.tickers if tickers is None else tickers)
+
+    def frame(self, field, tickers=None, start=None, end=None):
+        """The same slice as a (dates x tickers) DataFrame over the transposed values (no copy for a view)."""
+        values, dates, tickers = self.window(field, tickers, start, end)
+        return pd.DataFrame(values.T, index=dates, columns=pd.Index(tickers, name="Ticker"), copy=False)
+
+    def view(self, field, tickers=None, start=None, end=None):
+        """StoreView of a slice, for handing to worker processes."""
+        return StoreView(self.path, self.generation, field, self._rows(tickers), self._cols(start, end))
+
+    @property
+    def nbytes(self):
+        """Bytes of the used part of every field."""
+        return len(FIELDS) * len(self.tickers) * self.n_dates * self.dtype.itemsize
+
+    # ---- Writing ----
+    def append(self, frames):
+        """Write daily bars from `{ticker: OHLCV DataFrame}`, adding tickers and dates as needed.
+
+        Bars on dates already in the store overwrite them (e.g. a partial last
+        bar); later dates extend the shared axis. Returns the number of dates added.
+        """
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        if not frames:
+            return 0
+        with self._lock:
+            dates = {t: _as_dates(df.index) for t, df in frames.items()}
+            old_axis = self._array("dates")[:self.n_dates] if self.n_dates else np.array([], dtype="datetime64[D]")
+            axis = np.union1d(old_axis, np.concatenate(list(dates.values())))
+            new_tickers = [t for t in dict.fromkeys(frames) if t not in self.rows]
+            tickers = self.tickers + new_tickers
+            added = len(axis) - len(old_axis)
+
+            in_place = (
+                self.n_dates > 0
+                and (added == 0 or axis[self.n_dates - 1] == old_axis[-1])  # only later dates are new
+                and len(axis) <= self._array("dates").shape[0]
+                and len(tickers) <= self._array("close").shape[0]
+            )
+            if in_place:
+                arrays = {name: self._array(name, "r+") for name in FIELDS + ("dates",)}
+                arrays["dates"][self.n_dates:len(axis)] = axis[self.n_dates:]
+            else:
+                arrays = self._reallocate(axis, len(tickers))
+
+            rows = {t: i for i, t in enumerate(tickers)}
+            for ticker, df in frames.items():
+                cols = np.searchsorted(axis, dates[ticker])
+                for name in FIELDS:
+                    column = COLUMNS[name]
+                    if column in df:
+                        arrays[name][rows[ticker], cols] = df[column].to_numpy(dtype=self.dtype)
+            for values in arrays.values():
+                values.flush()
+            names = list(arrays)
+            # Dropping the last references unmaps the files, so "new" ones can be renamed on every platform
+            del arrays, values
+            self._arrays = {}
+
+            old_generation = self.generation
+            if not in_place:
+                self.generation += 1
+                for name in names:
+                    os.replace(_file(self.path, name, "new"), _file(self.path, name, self.generation))
+            self.tickers, self.rows, self.n_dates = tickers, rows, len(axis)
+            self._write_meta()
+            if not in_place:
+                self._remove_generation(old_generation)
+        return added
+
+    def _reallocate(self, axis, n_tickers):
+        """Allocate "new" files sized for `axis` x `n_tickers` plus spare capacity, copying the current data."""
+        shape = (_round_up(n_tickers, TICKER_CHUNK), _round_up(len(axis), DATE_CHUNK))
+        arrays = {"dates": open_memmap(_file(self.path, "dates", "new"), mode="w+",
+                                       dtype="datetime64[D]", shape=(shape[1],))}
+        arrays["dates"][:len(axis)] = axis
+        cols = None
+        if self.n_dates:
+            cols = np.searchsorted(axis, self._array("dates")[:self.n_dates])
+        for name in FIELDS:
+            values = arrays[name] = open_memmap(_file(self.path, name, "new"), mode="w+",
+                                                dtype=self.dtype, shape=shape)
+            values.fill(np.nan)
+            if cols is not None and self.tickers:
+                # One field at a time, in row blocks, so the copy never holds a whole matrix in memory
+                old = self._array(name)
+                for lo in range(0, len(self.tickers), TICKER_CHUNK):
+                    hi = min(lo + TICKER_CHUNK, len(self.tickers))
+                    values[lo:hi, cols] = old[lo:hi, :self.n_dates]
+        return arrays
+
+    def _remove_generation(self, generation):
+        for file in glob.glob(os.path.join(self.path, f"*.{generation}.npy")):
+            try:
+                os.remove(file)
+            except OSError:
+                pass  # still mapped by a reader on a platform that forbids it; removed next time
+
+
+# ---- Daily update from the bar cache ----
+def update_store(tickers, period=STORE_PERIOD, store=None, refresh=True):
+    """Bring `tickers` in the store up to date from the on-disk bar cache; returns the store."""
+    store = store or PriceStore()
+    cache = default_cache()
+    tickers = list(dict.fromkeys(tickers))
+    for i in range(0, len(tickers), APPEND_BATCH):
+        frames = {}
+        for ticker in tickers[i:i + APPEND_BATCH]:
+            try:
+                frames[ticker] = cache.history(ticker, period, refresh=refresh)
+            except Exception as e:
+                metrics.error("price_store", e)
+        store.append(frames)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or update the memory-mapped price store.")
+    parser.add_argument("--tickers-file", help="file with one ticker per line (default: all NASDAQ listings)")
+    parser.add_argument("--limit", type=int, help="only store the first N tickers")
+    parser.add_argument("--period", default=STORE_PERIOD, help="history window (default: %(default)s)")
+    parser.add_argument("--cached", action="store_true", help="only fetch bars missing from the bar cache")
+    args = parser.parse_args(argv)
+
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as f:
+            tickers = [line.strip().upper() for line in f if line.strip()]
+    else:
+        tickers = load_nasdaq_universe()["Symbol"].tolist()
+    if args.limit:
+        tickers = tickers[:args.limit]
+
+    store = update_store(tickers, period=args.period, refresh=not args.cached)
+    dates = store.dates
+    span = f"{dates[0]:%Y-%m-%d} to {dates[-1]:%Y-%m-%d}" if len(dates) else "no dates"
+    print(f"{len(store)} tickers x {len(dates)} dates ({span}), {store.nbytes / 1e6:.1f} MB in {store.path}")
+
+
+if __name__ == "__main__":
+    main()
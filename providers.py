@@ -0,0 +1,477 @@
+"""Market-data providers: every upstream call TradeSense makes goes through one of these.
+
+- `YFinanceProvider`: live data from yfinance (bars, info, quotes) and NewsAPI,
+  rate limited and retried through resilience.py.
+- `RecordingProvider`: wraps another provider and saves each response to disk.
+- `ReplayProvider`: serves a recording back without touching the network,
+  optionally falling back to another provider for anything not recorded.
+- `SyntheticProvider`: deterministic fake data with the same shapes, seeded
+  per ticker, for benchmarks, CI and load tests.
+
+The process-wide provider comes from TRADESENSE_PROVIDER (yfinance, record,
+replay or synthetic); recordings live in TRADESENSE_RECORDINGS. Worker
+processes pick the provider up from the same environment.
+"""
+import json
+import os
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from indicators import ewm
+from resilience import UpstreamError, get_guard
+from settings import cache_path
+
+PROVIDER = os.environ.get("TRADESENSE_PROVIDER", "yfinance")
+RECORDINGS_DIR = os.environ.get("TRADESENSE_RECORDINGS")  # default: CACHE_DIR/recordings
+INTRADAY_PERIOD = "5d"  # yfinance only serves 1-minute bars for the last 7 days
+
+
+class MarketDataProvider:
+    """Interface for market data. Histories are daily OHLCV frames with a tz-aware DatetimeIndex."""
+
+    name = "base"
+
+    def history(self, ticker, period=None, start=None):
+        """Daily bars for `ticker` over a yfinance `period` string, or from `start` (YYYY-MM-DD) onward."""
+        raise NotImplementedError
+
+    def info(self, ticker):
+        """Company metadata dict using yfinance `info` keys (sector, trailingPE, longName, ...)."""
+        raise NotImplementedError
+
+    def intraday(self, ticker, start=None, interval="1m"):
+        """Intraday bars (1-minute by default) over INTRADAY_PERIOD, or from `start` (a tz-aware Timestamp) onward.
+
+        Coarser `interval`s ("5m", "15m", "1h") start at the 09:30 open, as yfinance's do.
+        """
+        raise NotImplementedError
+
+    def latest_prices(self, tickers):
+        """Last close per ticker as a Series indexed by ticker, NaN where unavailable. Raises if the upstream fails."""
+        raise NotImplementedError
+
+    def news(self, ticker, api_key, page_size=5):
+        """Latest NewsAPI-style articles (dicts with title, url and source.name). Raises on errors."""
+        raise NotImplementedError
+
+
+def _window(df, period=None, start=None):
+    """Slice a full recorded / generated history the way yfinance would for `period` or `start`."""
+    from bar_cache import period_start  # bar_cache imports this module
+
+    if start is not None:
+        begin = pd.Timestamp(start)
+        begin = begin.tz_localize(df.index.tz) if begin.tzinfo is None else begin
+    else:
+        begin = period_start(period or "1mo")
+    return df[df.index >= begin]
+
+
+# ---- Live ----
+def _yf():
+    # yfinance is slow to import, so it is loaded on the first live fetch rather than at startup
+    import yfinance
+
+    return yfinance
+
+
+def _yf_call(fn, *args, **kwargs):
+    """Run a yfinance call, raising its rate-limit error as UpstreamError so the guard retries and counts it.
+
+    An empty history frame is passed through: it is how yfinance answers for
+    delisted symbols, warrants and brand-new listings, not a sign the upstream
+    is down, so it must not trip the breaker.
+    """
+    try:
+        return fn(*args, **kwargs)
+    except _yf().exceptions.YFRateLimitError as e:
+        raise UpstreamError(str(e)) from e
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Every yfinance request runs under the shared "market" guard (rate limit, retries, circuit breaker)."""
+
+    name = "yfinance"
+
+    def __init__(self, guard=None):
+        self.guard = guard or get_guard("market")
+
+    def history(self, ticker, period=None, start=None):
+        stock = _yf().Ticker(ticker)
+        if start is not None:
+            return self.guard.call(_yf_call, stock.history, start=start)
+        return self.guard.call(_yf_call, stock.history, period=period)
+
+    def intraday(self, ticker, start=None, interval="1m"):
+        stock = _yf().Ticker(ticker)
+        if start is not None:
+            return self.guard.call(_yf_call, stock.history, start=start, interval=interval)
+        return self.guard.call(_yf_call, stock.history, period=INTRADAY_PERIOD, interval=interval)
+
+    def info(self, ticker):
+        return self.guard.call(_yf_call, lambda: _yf().Ticker(ticker).info or {})
+
+    def latest_prices(self, tickers):
+        # All tickers in one bulk `yf.download` call
+        tickers = sorted({t for t in tickers if t})
+        if not tickers:
+            return pd.Series(dtype="float64")
+        return self.guard.call(self._download_latest, tickers)
+
+    @staticmethod
+    def _download_latest(tickers):
+        data = _yf().download(
+            tickers,
+            period="5d",
+            interval="1d",
+            auto_adjust=True,
+            progress=False,
+            threads=True,
+        )
+        if data is None or data.empty:
+            # yfinance reports throttling and outages as an empty frame, not an exception
+            raise UpstreamError(f"no quotes returned for {len(tickers)} tickers")
+
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        # Forward-fill so a ticker that did not trade in the last bar keeps its previous close
+        latest = close.ffill().iloc[-1]
+        return latest.reindex(tickers).astype("float64")
+
+    def news(self, ticker, api_key, page_size=5):
+        from news import get_client  # news imports this module
+
+        return get_client(api_key).headlines(ticker, page_size)
+
+
+# ---- Record / replay ----
+def _intraday_key(ticker, interval):
+    # Recording file stem: 1-minute bars keep the plain ticker, coarser ones get the interval appended
+    return ticker if interval == "1m" else f"{ticker}.{interval}"
+
+
+class RecordingProvider(MarketDataProvider):
+    """Passes calls to `inner` and writes every response under `path` for later replay.
+
+    Histories are merged per ticker, so a later delta fetch extends the
+    recording instead of replacing it.
+    """
+
+    name = "record"
+
+    def __init__(self, inner=None, path=RECORDINGS_DIR):
+        self.inner = inner or YFinanceProvider()
+        self.path = path or cache_path("recordings")
+        self._lock = threading.Lock()
+        for kind in ("history", "intraday", "info", "news"):
+            os.makedirs(os.path.join(self.path, kind), exist_ok=True)
+
+    def _file(self, kind, ticker, ext):
+        return os.path.join(self.path, kind, f"{ticker}.{ext}")
+
+    def _merge_bars(self, kind, ticker, df):
+        if df is None or df.empty:
+            return
+        file = self._file(kind, ticker, "pkl")
+        with self._lock:
+            if os.path.exists(file):
+                saved = pd.read_pickle(file)
+                df_all = df.combine_first(saved)
+            else:
+                df_all = df
+            df_all.to_pickle(file)
+
+    def history(self, ticker, period=None, start=None):
+        df = self.inner.history(ticker, period=period, start=start)
+        self._merge_bars("history", ticker, df)
+        return df
+
+    def intraday(self, ticker, start=None, interval="1m"):
+        df = self.inner.intraday(ticker, start=start, interval=interval)
+        self._merge_bars("intraday", _intraday_key(ticker, interval), df)
+        return df
+
+    def info(self, ticker):
+        info = self.inner.info(ticker)
+        with self._lock, open(self._file("info", ticker, "json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, default=str)
+        return info
+
+    def latest_prices(self, tickers):
+        prices = self.inner.latest_prices(tickers)
+        file = os.path.join(self.path, "quotes.json")
+        with self._lock:
+            saved = {}
+            if os.path.exists(file):
+                with open(file, encoding="utf-8") as f:
+                    saved = json.load(f)
+            saved.update({t: float(p) for t, p in prices.dropna().items()})
+            with open(file, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+        return prices
+
+    def news(self, ticker, api_key, page_size=5):
+        articles = self.inner.news(ticker, api_key, page_size)
+        with self._lock, open(self._file("news", ticker, "json"), "w", encoding="utf-8") as f:
+            json.dump(articles, f)
+        return articles
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves a RecordingProvider's files. Unrecorded calls go to `fallback`, or raise LookupError."""
+
+    name = "replay"
+
+    def __init__(self, path=RECORDINGS_DIR, fallback=None):
+        self.path = path or cache_path("recordings")
+        self.fallback = fallback
+        self._bars = {}  # (kind, ticker) -> recorded frame, or None
+        self._lock = threading.Lock()
+
+    def _file(self, kind, ticker, ext):
+        return os.path.join(self.path, kind, f"{ticker}.{ext}")
+
+    def _missing(self, what, ticker):
+        if self.fallback is None:
+            raise LookupError(f"No recorded {what} for {ticker} in {self.path}")
+        return self.fallback
+
+    def _recorded_bars(self, kind, ticker):
+        with self._lock:
+            if (kind, ticker) not in self._bars:
+                file = self._file(kind, ticker, "pkl")
+                self._bars[kind, ticker] = pd.read_pickle(file) if os.path.exists(file) else None
+            return self._bars[kind, ticker]
+
+    def history(self, ticker, period=None, start=None):
+        df = self._recorded_bars("history", ticker)
+        if df is None:
+            return self._missing("history", ticker).history(ticker, period=period, start=start)
+        return _window(df, period, start).copy()
+
+    def intraday(self, ticker, start=None, interval="1m"):
+        df = self._recorded_bars("intraday", _intraday_key(ticker, interval))
+        if df is None:
+            return self._missing(f"{interval} intraday bars", ticker).intraday(ticker, start=start, interval=interval)
+        return (df if start is None else df[df.index >= start]).copy()
+
+    def info(self, ticker):
+        file = self._file("info", ticker, "json")
+        if not os.path.exists(file):
+            return self._missing("info", ticker).info(ticker)
+        with open(file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def latest_prices(self, tickers):
+        tickers = sorted({t for t in tickers if t})
+        file = os.path.join(self.path, "quotes.json")
+        saved = {}
+        if os.path.exists(file):
+            with open(file, encoding="utf-8") as f:
+                saved = json.load(f)
+        prices = pd.Series({t: saved.get(t, float("nan")) for t in tickers}, dtype="float64")
+        for t in prices.index[prices.isna()]:
+            # Fall back to the last recorded close
+            df = self._recorded_bars("history", t)
+            if df is not None and not df.empty:
+                prices[t] = float(df["Close"].iloc[-1])
+        missing = list(prices.index[prices.isna()])
+        if missing and self.fallback is not None:
+            prices.update(self.fallback.latest_prices(missing))
+        return prices
+
+    def news(self, ticker, api_key, page_size=5):
+        file = self._file("news", ticker, "json")
+        if not os.path.exists(file):
+            return self._missing("news", ticker).news(ticker, api_key, page_size)
+        with open(file, encoding="utf-8") as f:
+            return json.load(f)[:page_size]
+
+
+# ---- Synthetic ----
+SYNTHETIC_START = "2000-01-03"
+_REVERSION = 0.002  # AR(1) pull of the synthetic log price back to its trend, per bar
+SYNTHETIC_SECTORS = [
+    "Technology", "Healthcare", "Financial Services", "Consumer Cyclical", "Communication Services",
+    "Industrials", "Consumer Defensive", "Energy", "Utilities", "Real Estate", "Basic Materials",
+]
+_HEADLINES = [
+    "{t} shares surge after earnings beat estimates",
+    "{t} misses revenue forecast as demand slumps",
+    "{t} announces new product line",
+    "Analysts raise {t} price target on strong growth",
+    "{t} faces lawsuit over data practices",
+    "{t} expands into new markets",
+    "{t} stock falls on guidance warning",
+    "{t} to present at industry conference",
+]
+
+
+def _seed(ticker):
+    return zlib.crc32(ticker.encode())
+
+
+@lru_cache(maxsize=4)
+def _synthetic_dates(end):
+    # Shared by every ticker: building a tz-aware business-day range is the slow part
+    return pd.bdate_range(SYNTHETIC_START, end, name="Date").tz_localize("America/New_York")
+
+
+@lru_cache(maxsize=1024)
+def _synthetic_bars(ticker, end):
+    """Deterministic synthetic bars from SYNTHETIC_START to `end`; a date's bar never changes."""
+    rng = np.random.default_rng(_seed(ticker))
+    index = _synthetic_dates(end)
+    n = len(index)
+    drift, vol = rng.uniform(-0.0001, 0.0003), rng.uniform(0.01, 0.025)
+    # Log price = trend + AR(1) deviation (x_t = (1 - a) x_{t-1} + shock_t), so prices stay plausible over decades
+    shocks = rng.normal(0.0, vol, n)
+    shocks[0] = 0.0
+    deviation = ewm(shocks / _REVERSION, _REVERSION)
+    close = rng.uniform(10, 400) * np.exp(drift * np.arange(n) + deviation)
+    spread = np.abs(rng.normal(0, vol / 2, n))
+    open_ = close * (1 + rng.normal(0, vol / 3, n))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": rng.integers(100_000, 50_000_000, n).astype("float64"),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+
+@lru_cache(maxsize=1024)
+def _synthetic_session(ticker, day, open_, close, volume):
+    """Deterministic 1-minute bars for one regular session: a Brownian bridge from the day's open to its close."""
+    rng = np.random.default_rng([_seed(ticker), pd.Timestamp(day).toordinal()])
+    steps = np.cumsum(rng.normal(0.0, 0.01 / np.sqrt(SESSION_MINUTES), SESSION_MINUTES))
+    t = np.arange(1, SESSION_MINUTES + 1) / SESSION_MINUTES
+    path = open_ * np.exp(np.log(close / open_) * t + steps - t * steps[-1])
+    opens = np.concatenate([[open_], path[:-1]])
+    wick = np.abs(rng.normal(0.0, 0.0005, SESSION_MINUTES))
+    index = pd.date_range(pd.Timestamp(day).tz_localize("America/New_York") + SESSION_OPEN,
+                          periods=SESSION_MINUTES, freq="min", name="Datetime")
+    return pd.DataFrame({
+        "Open": opens,
+        "High": np.maximum(opens, path) * (1 + wick),
+        "Low": np.minimum(opens, path) * (1 - wick),
+        "Close": path,
+        "Volume": np.round(volume / SESSION_MINUTES * rng.lognormal(0.0, 0.5, SESSION_MINUTES)),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def _resample_session(minutes, interval):
+    """`interval` bars ("5m", "15m", "1h") from 1-minute bars, aligned to the 09:30 open."""
+    width = pd.Timedelta(interval.replace("m", "min"))
+    bars = minutes.resample(width, origin="start_day", offset=SESSION_OPEN % width).agg({
+        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+        "Dividends": "sum", "Stock Splits": "sum",
+    })
+    return bars.dropna(subset=["Close"])
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Shape-correct fake data, identical across runs and processes for the same ticker and day."""
+
+    name = "synthetic"
+
+    def _bars(self, ticker):
+        return _synthetic_bars(ticker, pd.Timestamp.now(tz="America/New_York").strftime("%Y-%m-%d"))
+
+    def history(self, ticker, period=None, start=None):
+        return _window(self._bars(ticker), period, start).copy()
+
+    def intraday(self, ticker, start=None, interval="1m"):
+        now = pd.Timestamp.now(tz="America/New_York")
+        days = self._bars(ticker)
+        if start is None:
+            days = days.iloc[-int(INTRADAY_PERIOD[:-1]):]
+        else:
+            days = days[days.index >= pd.Timestamp(start).tz_convert(days.index.tz).normalize()]
+        df = pd.concat([
+            _synthetic_session(ticker, day.strftime("%Y-%m-%d"), bar.Open, bar.Close, bar.Volume)
+            for day, bar in zip(days.index, days.itertuples())
+        ])
+        # Today's session only up to the current minute
+        df = df[df.index <= now]
+        if interval != "1m":
+            df = _resample_session(df, interval)
+        return (df if start is None else df[df.index >= start]).copy()
+
+    def info(self, ticker):
+        rng = np.random.default_rng(_seed(ticker) + 1)
+        return {
+            "symbol": ticker,
+            "longName": f"{ticker} Holdings Inc.",
+            "sector": SYNTHETIC_SECTORS[_seed(ticker) % len(SYNTHETIC_SECTORS)],
+            "trailingPE": float(round(rng.uniform(5, 60), 2)),
+            "marketCap": int(rng.uniform(1e8, 2e12)),
+            "dividendYield": float(round(rng.uniform(0, 0.04), 4)),
+            "longBusinessSummary": f"{ticker} is a synthetic company used for offline testing.",
+            "city": "Springfield",
+            "state": "IL",
+            "website": f"https://example.com/{ticker.lower()}",
+            "companyOfficers": [{"name": "Jane Doe"}],
+        }
+
+    def latest_prices(self, tickers):
+        tickers = sorted({t for t in tickers if t})
+        return pd.Series({t: float(self._bars(t)["Close"].iloc[-1]) for t in tickers}, dtype="float64")
+
+    def news(self, ticker, api_key, page_size=5):
+        start = _seed(ticker) % len(_HEADLINES)
+        return [
+            {
+                "title": _HEADLINES[(start + i) % len(_HEADLINES)].format(t=ticker),
+                "url": f"https://example.com/news/{ticker.lower()}/{i}",
+                "source": {"name": "Synthetic Wire"},
+            }
+            for i in range(page_size)
+        ]
+
+
+# ---- Process-wide provider ----
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def make_provider(name=PROVIDER):
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "record":
+        return RecordingProvider()
+    if name == "replay":
+        return ReplayProvider()
+    if name == "synthetic":
+        return SyntheticProvider()
+    raise ValueError(f"Unknown market-data provider {name!r}")
+
+
+def get_provider():
+    """The provider every data path uses, chosen by TRADESENSE_PROVIDER on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = make_provider()
+    return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider (e.g. a SyntheticProvider in a benchmark); returns the previous one."""
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
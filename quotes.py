@@ -0,0 +1,12 @@
+"""Latest-quote lookups for the mock portfolio."""
+from providers import get_provider
+
+
+def fetch_latest_prices(tickers):
+    """Return the last close for every ticker as a Series indexed by ticker.
+
+    All tickers are requested from the market-data provider in one bulk call;
+    tickers that could not be priced come back as NaN. Raises when the
+    provider fails outright; callers fall back to their last good prices.
+    """
+    return get_provider().latest_prices(tickers)
@@ -0,0 +1,200 @@
+"""Protection for upstream calls: token-bucket rate limiting, jittered retries and a circuit breaker.
+
+Each upstream (market data, news) gets one process-wide `Guard`. A call
+first checks the breaker (failing fast while the upstream is down), then
+waits for a rate-limit token, then runs with exponential backoff and full
+jitter between attempts. Callers pair this with the stale-while-revalidate
+caches in market_cache, so an outage serves the last good value instead of
+an error. Limits are per process: screener / backtest workers each get
+their own bucket.
+"""
+import os
+import random
+import threading
+import time
+
+import metrics
+
+
+class UpstreamError(Exception):
+    """An upstream answered, but with nothing usable (e.g. an empty bulk quote download)."""
+
+
+class RateLimitedError(UpstreamError):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+# Failures worth retrying: network / HTTP errors (requests' and curl_cffi's exceptions
+# derive from OSError) and upstreams answering with nothing usable. Anything else is a bug.
+RETRY_ON = (OSError, UpstreamError)
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Returns 0 if a token was taken, else the seconds until one is available
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Take a token, waiting up to `timeout` seconds (forever if None). Returns False on timeout."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self._reserve()
+            if wait == 0:
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_timeout` one trial call may pass."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_in(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def release(self):
+        """Give back a half-open trial that ended without reaching the upstream."""
+        with self._lock:
+            self._trial = False
+
+
+def backoff_delays(attempts, base=0.5, cap=4.0, rng=random):
+    """Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2**i)] before retry i + 1."""
+    return [rng.uniform(0, min(cap, base * 2 ** i)) for i in range(attempts - 1)]
+
+
+class Guard:
+    """Rate limiter + retries + circuit breaker for one upstream."""
+
+    def __init__(self, name, rate, burst, attempts=3, base_delay=0.5, max_delay=4.0, max_wait=5.0,
+                 failure_threshold=5, reset_timeout=30.0, retry_on=RETRY_ON, sleep=time.sleep):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.retry_on = retry_on
+        self._sleep = sleep
+
+    def call(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` under this guard; raises the last error once retries are used up."""
+        if not self.breaker.allow():
+            metrics.inc("tradesense_upstream_calls_total", source=self.name, result="circuit_open")
+            raise CircuitOpenError(
+                f"{self.name} upstream is temporarily unavailable; retrying in {self.breaker.retry_in():.0f}s"
+            )
+        delays = backoff_delays(self.attempts, self.base_delay, self.max_delay)
+        for attempt in range(self.attempts):
+            if not self.bucket.acquire(timeout=self.max_wait):
+                metrics.inc("tradesense_upstream_calls_total", source=self.name, result="rate_limited")
+                self.breaker.release()
+                raise RateLimitedError(f"{self.name} rate limit: no request slot within {self.max_wait:g}s")
+            try:
+                result = fn(*args, **kwargs)
+            except self.retry_on as e:
+                metrics.inc("tradesense_upstream_calls_total", source=self.name, result="error")
+                if attempt == len(delays):
+                    self.breaker.record_failure()
+                    raise
+                metrics.error(f"{self.name}.retry", e)
+                self._sleep(delays[attempt])
+            except BaseException:
+                # Not an upstream failure (e.g. a bug in the caller): no verdict on the upstream's health
+                self.breaker.release()
+                raise
+            else:
+                metrics.inc("tradesense_upstream_calls_total", source=self.name, result="ok")
+                self.breaker.record_success()
+                return result
+
+
+# ---- Process-wide guards ----
+GUARD_SETTINGS = {
+    # yfinance has no published limit; stay well under what triggers Yahoo's throttling
+    "market": {"rate": float(os.environ.get("TRADESENSE_MARKET_RATE", 5)), "burst": 10},
+    # NewsAPI's developer tier is tight, and responses are cached for 10 minutes anyway
+    "news": {"rate": float(os.environ.get("TRADESENSE_NEWS_RATE", 1)), "burst": 5},
+}
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(name):
+    with _guards_lock:
+        if name not in _guards:
+            _guards[name] = Guard(name, **GUARD_SETTINGS.get(name, {"rate": 5.0, "burst": 10}))
+        return _guards[name]
@@ -0,0 +1,227 @@
+"""Portfolio risk analytics over daily closes.
+
+Everything works on a (dates x holdings) returns matrix with NumPy:
+covariance / correlation, portfolio volatility, historical and parametric
+Value at Risk, and drawdown. Rolling versions are built incrementally, from
+prefix sums for the portfolio series and from running sums for the full
+covariance matrix (the holdings' rolling average correlation), so a window
+slides in O(1) (or O(N^2)) per bar instead of being recomputed from scratch.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+CONFIDENCE = 0.95
+ROLLING_WINDOW = 63  # about three months of trading days
+
+
+# ---- Returns ----
+def returns_matrix(closes):
+    """Simple daily returns (dates x tickers); days before a ticker's first close count as 0."""
+    prices = closes.ffill().to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices[1:] / prices[:-1] - 1.0
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def portfolio_weights(quantities, prices):
+    """Market-value weights; holdings without a price get no weight."""
+    values = np.nan_to_num(np.asarray(quantities, dtype=np.float64) * np.asarray(prices, dtype=np.float64))
+    total = values.sum()
+    return values / total if total else values
+
+
+# ---- Point-in-time measures ----
+def covariance(returns):
+    """Sample covariance of the columns of `returns` (one matrix product)."""
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / max(len(returns) - 1, 1)
+
+
+def correlation(cov):
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    return np.where(np.isfinite(corr), corr, 0.0)
+
+
+def historical_var(port_returns, confidence=CONFIDENCE):
+    """One-day loss (as a positive fraction) not exceeded on `confidence` of past days."""
+    if len(port_returns) == 0:
+        return np.nan
+    return max(-float(np.quantile(port_returns, 1.0 - confidence)), 0.0)
+
+
+def parametric_var(mean, std, confidence=CONFIDENCE):
+    """One-day Gaussian (variance-covariance) VaR from the portfolio mean and standard deviation."""
+    z = NormalDist().inv_cdf(confidence)
+    return max(z * std - mean, 0.0)
+
+
+def drawdown(port_returns):
+    """Drawdown from the running peak of the compounded portfolio, per bar (0 at new highs)."""
+    equity = np.cumprod(1.0 + port_returns)
+    return equity / np.maximum.accumulate(equity) - 1.0
+
+
+def risk_report(closes, quantities, prices, confidence=CONFIDENCE):
+    """Risk summary for holdings `quantities` (aligned with `closes.columns`) valued at `prices`.
+
+    Returns a dict with weights, covariance and correlation DataFrames, daily
+    portfolio returns, annualized volatility, historical and parametric VaR
+    (fractions and dollars) and the drawdown series.
+    """
+    tickers = list(closes.columns)
+    returns = returns_matrix(closes)
+    weights = portfolio_weights(quantities, prices)
+    value = float(np.nansum(np.asarray(quantities, dtype=np.float64) * np.asarray(prices, dtype=np.float64)))
+    cov = covariance(returns)
+    port = returns @ weights
+    daily_std = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    mean = float(port.mean()) if len(port) else 0.0
+    hist = historical_var(port, confidence)
+    param = parametric_var(mean, daily_std, confidence)
+    dd = drawdown(port)
+    dates = closes.index[1:]
+    return {
+        "value": value,
+        "weights": pd.Series(weights, index=tickers),
+        "covariance": pd.DataFrame(cov, index=tickers, columns=tickers),
+        "correlation": pd.DataFrame(correlation(cov), index=tickers, columns=tickers),
+        "returns": pd.Series(port, index=dates),
+        "volatility": daily_std * np.sqrt(TRADING_DAYS),
+        "historical_var": hist,
+        "parametric_var": param,
+        "historical_var_usd": hist * value,
+        "parametric_var_usd": param * value,
+        "drawdown": pd.Series(dd, index=dates),
+        "max_drawdown": float(dd.min()) if len(dd) else 0.0,
+    }
+
+
+# ---- Rolling measures ----
+def rolling_moments(x, window):
+    """Rolling mean and sample std of a 1-D series from prefix sums (NaN until the window fills)."""
+    x = np.asarray(x, dtype=np.float64)
+    mean = np.full(len(x), np.nan)
+    std = np.full(len(x), np.nan)
+    if window < 2 or len(x) < window:
+        return mean, std
+    c1 = np.cumsum(np.r_[0.0, x])
+    c2 = np.cumsum(np.r_[0.0, x * x])
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+    mean[window - 1:] = s1 / window
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    std[window - 1:] = np.sqrt(np.maximum(var, 0.0))
+    return mean, std
+
+
+def rolling_risk(port_returns, window=ROLLING_WINDOW, confidence=CONFIDENCE):
+    """DataFrame of rolling annualized volatility, parametric VaR and historical VaR for a return Series."""
+    mean, std = rolling_moments(port_returns.to_numpy(), window)
+    z = NormalDist().inv_cdf(confidence)
+    # pandas' rolling quantile keeps a sorted window and updates it bar by bar
+    hist = -port_returns.rolling(window).quantile(1.0 - confidence)
+    return pd.DataFrame({
+        "Volatility": std * np.sqrt(TRADING_DAYS),
+        "Parametric VaR": np.maximum(z * std - mean, 0.0),
+        "Historical VaR": hist.clip(lower=0.0).to_numpy(),
+    }, index=port_returns.index)
+
+
+class RollingCovariance:
+    """Covariance of the last `window` return rows, updated in O(N^2) per new row.
+
+    Keeps running sums of the rows and of their outer products; the oldest
+    row is subtracted as a new one arrives. The sums are rebuilt from the
+    ring buffer once per window to stop floating-point drift accumulating.
+    """
+
+    def __init__(self, n_assets, window=ROLLING_WINDOW):
+        self.window = window
+        self._rows = np.zeros((window, n_assets))
+        self._sum = np.zeros(n_assets)
+        self._cross = np.zeros((n_assets, n_assets))
+        self.count = 0
+        self._pos = 0
+
+    @classmethod
+    def from_returns(cls, returns, window=ROLLING_WINDOW):
+        """Seed from the tail of a (dates x assets) returns matrix."""
+        returns = np.asarray(returns, dtype=np.float64)
+        state = cls(returns.shape[1], window)
+        tail = returns[-window:]
+        state._rows[:len(tail)] = tail
+        state.count = len(tail)
+        state._pos = len(tail) % window
+        state._rebuild()
+        return state
+
+    def _rebuild(self):
+        rows = self._rows[:self.count]
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+
+    def push(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        if self.count == self.window:
+            old = self._rows[self._pos]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self._rows[self._pos] = row
+        self._sum += row
+        self._cross += np.outer(row, row)
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            self._rebuild()
+
+    def mean(self):
+        return self._sum / self.count if self.count else self._sum.copy()
+
+    def covariance(self):
+        if self.count < 2:
+            return np.full_like(self._cross, np.nan)
+        return (self._cross - np.outer(self._sum, self._sum) / self.count) / (self.count - 1)
+
+    def variance(self):
+        """Diagonal of covariance() without forming the matrix."""
+        if self.count < 2:
+            return np.full_like(self._sum, np.nan)
+        return (np.diag(self._cross) - self._sum * self._sum / self.count) / (self.count - 1)
+
+    def quadratic(self, x):
+        """x' C x for the window covariance C (e.g. portfolio variance for weights x), in one pass."""
+        if self.count < 2:
+            return np.nan
+        return (x @ self._cross @ x - (x @ self._sum) ** 2 / self.count) / (self.count - 1)
+
+    def correlation(self):
+        return correlation(self.covariance())
+
+
+def rolling_average_correlation(returns, window=ROLLING_WINDOW):
+    """Mean pairwise correlation of the columns of `returns` over a sliding window (NaN until it fills).
+
+    A diversification gauge: it rises toward 1 when the holdings start moving
+    together. The window's covariance is slid one row at a time with
+    RollingCovariance instead of being recomputed per bar.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n_bars, n_assets = returns.shape
+    out = np.full(n_bars, np.nan)
+    if n_assets < 2:
+        return out
+    state = RollingCovariance(n_assets, window)
+    for i, row in enumerate(returns):
+        state.push(row)
+        if state.count == window:
+            # Sum of all correlations as one quadratic form (constant assets count as 0), minus the diagonal
+            std = np.sqrt(np.maximum(state.variance(), 0.0))
+            inv = np.divide(1.0, std, out=np.zeros(n_assets), where=std > 1e-12)
+            out[i] = (state.quadratic(inv) - np.count_nonzero(inv)) / (n_assets * (n_assets - 1))
+    return out
@@ -0,0 +1,32 @@
+"""Constants behind the TradeSense educational recommendation."""
+from sector_stats import sector_medians
+
+# Static sector P/E fallbacks, used until the sector_stats job has enough data for a sector
+SECTOR_PE_MAP = {
+    "Technology": 28,
+    "Healthcare": 20,
+    "Financial Services": 14,
+    "Consumer Cyclical": 25,
+    "Industrials": 20,
+    "Energy": 12,
+    "Consumer Defensive": 19,
+    "Communication Services": 18,
+    "Utilities": 16,
+    "Real Estate": 18,
+    "Basic Materials": 15,
+    "N/A": 20
+}
+DEFAULT_SECTOR_PE = 20
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+EXPLORE = "Explore Further"
+CAUTIOUS = "Be Cautious"
+OBSERVE = "Observe"
+
+
+def sector_pe_for(sector):
+    """Universe median trailing P/E for `sector` (see sector_stats), else the static fallback."""
+    pe = sector_medians().get(sector)
+    return pe if pe is not None else SECTOR_PE_MAP.get(sector, DEFAULT_SECTOR_PE)
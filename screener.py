@@ -0,0 +1,244 @@
+"""Universe screener: the TradeSense recommendation rule applied to many tickers at once.
+
+Price history and fundamentals are loaded in chunks across a process pool
+(through the on-disk bar and fundamentals caches), or sliced straight out of
+the memory-mapped price store with `--store`, then the SMA50 / SMA200 / P/E /
+RSI rule is scored in one vectorized pass over a (tickers x bars) matrix.
+
+Run headless with `python screener.py --output ranked.csv`, or open the
+Screener page of the Streamlit app.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from bar_cache import default_cache, period_start
+from fundamentals import FundamentalsStore, fetch_fundamentals
+from indicators import compute_indicators
+from price_store import PriceStore
+from rules import CAUTIOUS, EXPLORE, OBSERVE, RSI_OVERBOUGHT, RSI_OVERSOLD, sector_pe_for
+from universe import load_nasdaq_universe
+
+SCREEN_PERIOD = "1y"  # enough daily bars to warm up SMA200
+CHUNK_SIZE = 50
+RSI_WINDOW = 14
+
+# Sort order of the ranked table: most constructive recommendation first
+RECOMMENDATION_RANK = {EXPLORE: 2, OBSERVE: 1, CAUTIOUS: 0}
+
+
+# ---- Data loading ----
+def load_chunk(tickers, period, refresh):
+    """Process-pool worker: fill the caches for one chunk of tickers.
+
+    Returns `(closes, skipped)`: the chunk's closes (dates x tickers) and how
+    many tickers' history / fundamentals could not be fetched. Each failure is
+    also counted in metrics; they are not raised, so one bad ticker never sinks
+    the chunk.
+    """
+    cache = default_cache()
+    skipped = {"history": 0, "fundamentals": 0}
+    for ticker in tickers:
+        if refresh or not cache.covers(ticker, period):
+            try:
+                cache.history(ticker, period, refresh=refresh)
+            except Exception as e:
+                metrics.error("screener.history", e)
+                skipped["history"] += 1
+    closes = cache.closes(tickers, period)
+
+    store = FundamentalsStore()
+    if refresh:
+        missing = store.stale(list(closes.columns))
+    else:
+        fetched_at = store.get_many(list(closes.columns))["fetched_at"]
+        missing = list(fetched_at.index[fetched_at.isna()])
+    records = []
+    for ticker in missing:
+        try:
+            records.append(fetch_fundamentals(ticker))
+        except Exception as e:
+            metrics.error("screener.fundamentals", e)
+            skipped["fundamentals"] += 1
+    if records:
+        store.put_many(records)
+    return closes, skipped
+
+
+def load_universe_data(tickers, period=SCREEN_PERIOD, workers=None, refresh=True, store=None):
+    """Load a date-aligned close matrix and fundamentals for `tickers`.
+
+    Returns `(closes, fundamentals, skipped)`: a DataFrame of closes (dates x
+    tickers, forward-filled across missing days), a DataFrame indexed by
+    ticker, and the summed per-stage failure counts of `load_chunk`.
+    With `refresh=False` only data missing from the local caches is fetched.
+    With a PriceStore, tickers it holds are read from it as they are (no
+    fetching, fundamentals from the local cache); the rest load as usual.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    stored = pd.DataFrame(dtype="float64")
+    if store is not None:
+        in_store = [t for t in tickers if t in store]
+        tickers = [t for t in tickers if t not in store]
+        if in_store:
+            stored = store.frame("close", in_store, start=period_start(period)).dropna(axis=1, how="all")
+    chunks = [tickers[i:i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        parts = [load_chunk(chunk, period, refresh) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(load_chunk, chunks, [period] * len(chunks), [refresh] * len(chunks)))
+
+    skipped = {"history": 0, "fundamentals": 0}
+    for _, counts in parts:
+        for stage, n in counts.items():
+            skipped[stage] += n
+    parts = [closes for closes, _ in parts if not closes.empty]
+    if not stored.empty:
+        parts.insert(0, stored)
+    if not parts:
+        return pd.DataFrame(dtype="float64"), FundamentalsStore().get_many([]), skipped
+    close_df = pd.concat(parts, axis=1).sort_index().ffill()
+    fundamentals = FundamentalsStore().get_many(list(close_df.columns))
+    return close_df, fundamentals, skipped
+
+
+# ---- Vectorized scoring ----
+def score_matrix(close, pe, sector_pe):
+    """Apply the recommendation rule to every row of a (tickers x bars) close matrix.
+
+    `pe` and `sector_pe` are per-ticker arrays (NaN where P/E is unavailable).
+    Returns a dict of per-ticker arrays: price, indicators, signal count and
+    recommendation.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    pe = np.asarray(pe, dtype=np.float64)
+    sector_pe = np.asarray(sector_pe, dtype=np.float64)
+    ind = compute_indicators(close, sma_windows=(50, 200), rsi_window=RSI_WINDOW)
+
+    price = close[:, -1]
+    sma50 = ind["SMA50"][:, -1]
+    sma200 = ind["SMA200"][:, -1]
+    rsi = ind[f"RSI{RSI_WINDOW}"][:, -1]
+    # Rows padded with leading NaNs (short histories) need RSI_WINDOW real bars too
+    rsi = np.where(np.isfinite(close).sum(axis=1) >= RSI_WINDOW, rsi, np.nan)
+
+    has_pe = np.isfinite(pe)
+    above_50 = price > sma50
+    below_50 = price < sma50
+    above_200 = price > sma200
+    pe_below = has_pe & (pe < sector_pe)
+    pe_above = has_pe & (pe > sector_pe)
+
+    recommendation = np.select(
+        [above_50 & pe_below, below_50 & pe_above], [EXPLORE, CAUTIOUS], default=OBSERVE
+    )
+    rsi_signal = np.select(
+        [rsi >= RSI_OVERBOUGHT, rsi <= RSI_OVERSOLD], ["Overbought", "Oversold"], default=""
+    )
+    return {
+        "price": price,
+        "sma50": sma50,
+        "sma200": sma200,
+        "rsi": rsi,
+        "signals": above_50.astype(int) + above_200.astype(int) + pe_below.astype(int),
+        "rsi_signal": rsi_signal,
+        "recommendation": recommendation,
+    }
+
+
+def rank_universe(closes, fundamentals, names=None):
+    """Score a close matrix (dates x tickers) and return the ranked screener table."""
+    tickers = list(closes.columns)
+    fundamentals = fundamentals.reindex(tickers)
+    sectors = fundamentals["sector"].fillna("N/A")
+    pe = pd.to_numeric(fundamentals["trailing_pe"], errors="coerce").to_numpy(dtype=np.float64)
+    sector_pe = sectors.map(sector_pe_for).to_numpy(dtype=np.float64)
+
+    scores = score_matrix(closes.to_numpy(dtype=np.float64).T, pe, sector_pe)
+    table = pd.DataFrame({
+        "Ticker": tickers,
+        "Sector": sectors.to_numpy(),
+        "Price": scores["price"],
+        "SMA50": scores["sma50"],
+        "SMA200": scores["sma200"],
+        "RSI14": scores["rsi"],
+        "P/E": pe,
+        "Sector P/E": sector_pe,
+        "% vs SMA50": (scores["price"] / scores["sma50"] - 1) * 100,
+        "Signals": scores["signals"],
+        "RSI Signal": scores["rsi_signal"],
+        "Recommendation": scores["recommendation"],
+    })
+    if names is not None:
+        table.insert(1, "Name", table["Ticker"].map(names))
+    table["_rank"] = table["Recommendation"].map(RECOMMENDATION_RANK)
+    table = table.sort_values(
+        ["_rank", "Signals", "% vs SMA50"], ascending=False, na_position="last"
+    )
+    return table.drop(columns="_rank").reset_index(drop=True)
+
+
+def run_screener(tickers=None, limit=None, period=SCREEN_PERIOD, workers=None, refresh=True, store=None):
+    """Load data for `tickers` (default: the whole NASDAQ universe) and return `(ranked table, skipped)`.
+
+    `skipped` counts the tickers whose history / fundamentals fetch failed (see `load_chunk`).
+    """
+    names = None
+    if tickers is None:
+        universe = load_nasdaq_universe()
+        tickers = universe["Symbol"].tolist()
+        names = dict(zip(universe["Symbol"], universe["Name"]))
+    if limit:
+        tickers = tickers[:limit]
+    closes, fundamentals, skipped = load_universe_data(tickers, period=period, workers=workers, refresh=refresh,
+                                                       store=store)
+    if closes.empty:
+        return pd.DataFrame(), skipped
+    return rank_universe(closes, fundamentals, names=names), skipped
+
+
+# ---- Headless entry point ----
+def report_skipped(skipped):
+    """Print the fetch failures of a load to stderr, if there were any."""
+    if any(skipped.values()):
+        print(f"Skipped after upstream errors: {skipped['history']} histories, "
+              f"{skipped['fundamentals']} fundamentals (see tradesense_errors_total).", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank NASDAQ tickers with the TradeSense recommendation rule.")
+    parser.add_argument("--tickers-file", help="file with one ticker per line (default: all NASDAQ listings)")
+    parser.add_argument("--limit", type=int, help="only screen the first N tickers")
+    parser.add_argument("--period", default=SCREEN_PERIOD, help="history window to load (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="loader processes (default: CPU count)")
+    parser.add_argument("--cached", action="store_true", help="only fetch data missing from the local caches")
+    parser.add_argument("--store", action="store_true", help="read closes from the memory-mapped price store")
+    parser.add_argument("--output", help="write the ranked table to a .csv or .json file")
+    args = parser.parse_args(argv)
+
+    tickers = None
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as f:
+            tickers = [line.strip().upper() for line in f if line.strip()]
+
+    table, skipped = run_screener(tickers, limit=args.limit, period=args.period,
+                                  workers=args.workers, refresh=not args.cached,
+                                  store=PriceStore() if args.store else None)
+    report_skipped(skipped)
+    if args.output and args.output.endswith(".json"):
+        table.to_json(args.output, orient="records", indent=2)
+    elif args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.head(25).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Per-sector trailing P/E statistics computed from the tracked universe.
+
+A periodic job (`python sector_stats.py`, e.g. from cron) refreshes the
+fundamentals of every universe ticker whose cached sector / P/E is older
+than FUNDAMENTALS_TTL, then recomputes median, quartiles and count per
+sector into a small SQLite table keyed by sector. The recommendation rule
+reads the medians through `sector_medians()`, an in-memory dict reloaded
+from that table at most every RELOAD_INTERVAL seconds.
+"""
+import argparse
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from fundamentals import FUNDAMENTALS_TTL, FundamentalsStore, fetch_fundamentals
+from settings import cache_path
+from universe import load_nasdaq_universe
+
+MIN_COUNT = 5  # sectors with fewer usable P/Es keep the static fallback
+MAX_PE = 1000  # P/Es above this are one-off earnings artifacts, not valuations
+RELOAD_INTERVAL = 5 * 60
+FETCH_WORKERS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sector_pe (
+    sector TEXT PRIMARY KEY,
+    median REAL NOT NULL,
+    q25 REAL NOT NULL,
+    q75 REAL NOT NULL,
+    count INTEGER NOT NULL,
+    computed_at REAL NOT NULL
+);
+"""
+
+COLUMNS = ["median", "q25", "q75", "count"]
+
+
+def compute_sector_stats(fundamentals):
+    """Median, quartiles and count of trailing P/E per sector.
+
+    `fundamentals` has sector and trailing_pe columns. Loss-makers (P/E <= 0)
+    and extreme P/Es are left out, since they are not comparable valuations.
+    """
+    pe = pd.to_numeric(fundamentals["trailing_pe"], errors="coerce")
+    usable = fundamentals["sector"].notna() & np.isfinite(pe) & (pe > 0) & (pe < MAX_PE)
+    if not usable.any():
+        return pd.DataFrame(columns=COLUMNS, index=pd.Index([], name="sector"), dtype="float64")
+    grouped = pe[usable].groupby(fundamentals["sector"][usable])
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q25", "median", "q75"]
+    stats["count"] = grouped.size()
+    stats.index.name = "sector"
+    return stats[COLUMNS]
+
+
+class SectorStatsStore:
+    def __init__(self, path=None):
+        self.path = path or cache_path("fundamentals.sqlite")
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self):
+        """All sector rows as a DataFrame indexed by sector."""
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT sector, {', '.join(COLUMNS)}, computed_at FROM sector_pe").fetchall()
+        return pd.DataFrame(rows, columns=["sector"] + COLUMNS + ["computed_at"]).set_index("sector")
+
+    def replace(self, stats):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sector_pe")
+            conn.executemany(
+                "INSERT INTO sector_pe VALUES (?, ?, ?, ?, ?, ?)",
+                [(sector, float(r["median"]), float(r["q25"]), float(r["q75"]), int(r["count"]), now)
+                 for sector, r in stats.iterrows()],
+            )
+
+
+def refresh_sector_stats(tickers, max_age=FUNDAMENTALS_TTL, workers=FETCH_WORKERS, store=None, stats_store=None):
+    """Re-pull fundamentals older than `max_age` for `tickers`, then recompute and store sector stats.
+
+    Returns `(stats, refreshed)`, where `refreshed` is how many tickers were fetched.
+    The stored stats are left untouched when no ticker has a usable P/E.
+    """
+    store = store or FundamentalsStore()
+    stats_store = stats_store or SectorStatsStore()
+    tickers = list(dict.fromkeys(tickers))
+    stale = store.stale(tickers, max_age)
+
+    def fetch(ticker):
+        try:
+            return fetch_fundamentals(ticker)
+        except Exception as e:
+            metrics.error("fundamentals", e)
+            return None
+
+    refreshed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Write back in batches so an interrupted job keeps what it already fetched
+        for i in range(0, len(stale), 200):
+            records = [r for r in pool.map(fetch, stale[i:i + 200]) if r is not None]
+            if records:
+                store.put_many(records)
+                refreshed += len(records)
+
+    stats = compute_sector_stats(store.get_many(tickers))
+    if not stats.empty:
+        # With no usable P/E at all (e.g. upstream down on a first run), keep the stats already stored
+        stats_store.replace(stats)
+    return stats, refreshed
+
+
+# ---- O(1) lookups for the recommendation rule ----
+_medians = {}
+_loaded_at = None
+_medians_lock = threading.Lock()
+
+
+def sector_medians(store=None):
+    """{sector: median trailing P/E} for sectors with at least MIN_COUNT tickers, reloaded every RELOAD_INTERVAL."""
+    global _medians, _loaded_at
+    now = time.monotonic()
+    if _loaded_at is not None and now - _loaded_at < RELOAD_INTERVAL:
+        return _medians
+    with _medians_lock:
+        if _loaded_at is None or now - _loaded_at >= RELOAD_INTERVAL:
+            try:
+                stats = (store or SectorStatsStore()).load()
+                stats = stats[stats["count"] >= MIN_COUNT]
+                _medians = {sector: round(float(m), 1) for sector, m in stats["median"].items()}
+            except sqlite3.Error as e:
+                metrics.error("sector_stats", e)
+            _loaded_at = now
+    return _medians
+
+
+def reload():
+    """Drop the in-memory medians so the next lookup re-reads the store."""
+    global _loaded_at
+    with _medians_lock:
+        _loaded_at = None
+
+
+# ---- Periodic job ----
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh per-sector P/E statistics for the tracked universe.")
+    parser.add_argument("--tickers-file", help="file with one ticker per line (default: all NASDAQ listings)")
+    parser.add_argument("--limit", type=int, help="only use the first N tickers")
+    parser.add_argument("--max-age", type=float, default=FUNDAMENTALS_TTL,
+                        help="re-pull fundamentals older than this many seconds (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="concurrent fetches (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.tickers_file:
+        with open(args.tickers_file, encoding="utf-8") as f:
+            tickers = [line.strip().upper() for line in f if line.strip()]
+    else:
+        tickers = load_nasdaq_universe()["Symbol"].tolist()
+    if args.limit:
+        tickers = tickers[:args.limit]
+
+    stats, refreshed = refresh_sector_stats(tickers, max_age=args.max_age, workers=args.workers)
+    print(f"Refreshed {refreshed} of {len(tickers)} tickers.")
+    print(stats.round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Keyword sentiment for news headlines.
+
+Both lexicons are compiled once into word-boundary regexes, so "up" no longer
+fires on "update" and "profit" not on "nonprofit". Headlines are scored by
+counts, (positive - negative) / (positive + negative), instead of by the
+first keyword found. A keyword right after a negation ("not", "no",
+"fails to", with at most one word between) counts for the other side.
+
+Mixed headlines cancel out: "record losses" has one hit each way and scores
+Neutral.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+POSITIVE_KEYWORDS = [
+    "surge", "soar", "beats", "record", "growth", "profit", "acquire", "win", "rises", "gains",
+    "up", "tops", "outperform", "strong", "raises", "expands", "positive", "improves", "upgrade"
+]
+NEGATIVE_KEYWORDS = [
+    "slump", "drops", "lawsuit", "misses", "loss", "decline", "falls", "down",
+    "warning", "recall", "layoff", "cuts", "negative", "disappoint", "miss", "downgrade"
+]
+NEGATIONS = ["not", "no", "never", "without", "fails to", "failed to"]
+
+POSITIVE = "🟢 Positive"
+NEGATIVE = "🔴 Negative"
+NEUTRAL = "🟡 Neutral"
+
+
+def _alternation(words):
+    # Longest first so alternation prefers "misses" over "miss"
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+
+def _compile(words, negated=False):
+    # Simple inflections are allowed; `negated` only matches keywords just after a negation
+    prefix = rf"\b(?:{_alternation(NEGATIONS)})\s+(?:\w+\s+)?" if negated else r"\b"
+    return re.compile(rf"{prefix}(?:{_alternation(words)})(?:s|es|d|ed|ing)?\b", re.IGNORECASE)
+
+
+POSITIVE_RE = _compile(POSITIVE_KEYWORDS)
+NEGATIVE_RE = _compile(NEGATIVE_KEYWORDS)
+NEGATED_POSITIVE_RE = _compile(POSITIVE_KEYWORDS, negated=True)
+NEGATED_NEGATIVE_RE = _compile(NEGATIVE_KEYWORDS, negated=True)
+
+
+def _label(score):
+    if score > 0:
+        return POSITIVE
+    if score < 0:
+        return NEGATIVE
+    return NEUTRAL
+
+
+def score_headline(text):
+    """Return (positive hits, negative hits, score in [-1, 1]) for one headline."""
+    flip_pos = len(NEGATED_POSITIVE_RE.findall(text))
+    flip_neg = len(NEGATED_NEGATIVE_RE.findall(text))
+    pos = len(POSITIVE_RE.findall(text)) - flip_pos + flip_neg
+    neg = len(NEGATIVE_RE.findall(text)) - flip_neg + flip_pos
+    total = pos + neg
+    return pos, neg, (pos - neg) / total if total else 0.0
+
+
+# ---- Simple Sentiment Function ----
+def get_sentiment(text):
+    return _label(score_headline(text)[2])
+
+
+def score_headlines(headlines):
+    """Score a list or Series of headlines in one call.
+
+    Returns a DataFrame (aligned with a Series input's index) with
+    positive, negative, score and label columns.
+    """
+    titles = headlines if isinstance(headlines, pd.Series) else pd.Series(list(headlines), dtype="object")
+    titles = titles.fillna("").astype(str)
+    flip_pos = titles.str.count(NEGATED_POSITIVE_RE).to_numpy(dtype=np.int64)
+    flip_neg = titles.str.count(NEGATED_NEGATIVE_RE).to_numpy(dtype=np.int64)
+    pos = titles.str.count(POSITIVE_RE).to_numpy(dtype=np.int64) - flip_pos + flip_neg
+    neg = titles.str.count(NEGATIVE_RE).to_numpy(dtype=np.int64) - flip_neg + flip_pos
+    score = (pos - neg) / np.maximum(pos + neg, 1)
+    label = np.select([score > 0, score < 0], [POSITIVE, NEGATIVE], default=NEUTRAL)
+    return pd.DataFrame(
+        {"positive": pos, "negative": neg, "score": score, "label": label}, index=titles.index
+    )
@@ -0,0 +1,11 @@
+"""Shared paths and tunables for TradeSense."""
+import os
+
+# Local cache directory for market data, ledgers and indexes
+CACHE_DIR = os.environ.get("TRADESENSE_CACHE_DIR", ".tradesense_cache")
+
+
+def cache_path(name):
+    """Return the path of `name` inside CACHE_DIR, creating the directory if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
@@ -0,0 +1,161 @@
+"""Local NASDAQ symbol index: validation, prefix autocomplete and company-name lookup.
+
+Symbols and name words are kept in sorted arrays, so a prefix query is two
+binary searches. Typos fall back to difflib similarity. The index is built
+from the cached NASDAQ listing (see universe.py), or from the snapshot shipped
+in data/ when the listing has never been downloaded. Only listed symbols are
+accepted, so unknown tickers are rejected without any call to the
+market-data provider.
+"""
+import difflib
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from universe import UNIVERSE_TTL, load_cached_universe, load_nasdaq_universe, load_snapshot
+
+SNAPSHOT_RETRY = 10 * 60  # retry the listing download this often while serving the snapshot
+FUZZY_CUTOFF = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Common filler words that would otherwise match half the listing
+_STOPWORDS = {"inc", "corp", "corporation", "co", "company", "the", "and", "of", "ltd", "plc", "holdings",
+              "group", "class", "common", "stock", "shares", "ordinary", "a", "b", "c"}
+
+
+def _clean_name(name):
+    # "Apple Inc. - Common Stock" -> "Apple Inc."
+    return name.split(" - ")[0].strip()
+
+
+class SymbolIndex:
+    """Symbols and company names of one listing. `snapshot` is True when built from the bundled snapshot."""
+
+    def __init__(self, symbols, names, snapshot=False):
+        self.snapshot = snapshot
+        self.names = {s.upper(): _clean_name(n) for s, n in zip(symbols, names)}
+        self.symbols = sorted(self.names)
+        words = sorted(
+            (word, symbol)
+            for symbol, name in self.names.items()
+            for word in set(_WORD.findall(name.lower())) - _STOPWORDS
+        )
+        self._words = [w for w, _ in words]
+        self._word_symbols = [s for _, s in words]
+        self._vocabulary = sorted(set(self._words))
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self.names
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def accepts(self, symbol):
+        """True if `symbol` is a listed ticker."""
+        return symbol.strip().upper() in self.names
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+
+    def search(self, query, limit=10):
+        """Ranked (symbol, name) matches for a symbol prefix or company name, e.g. "app" or "apple"."""
+        query = query.strip()
+        if not query:
+            return []
+        found = []
+        # 1. Symbols starting with the query (an exact symbol sorts first)
+        lo, hi = self._prefix_range(self.symbols, query.upper())
+        found += self.symbols[lo:min(hi, lo + limit)]
+        # 2. Companies whose name words start with every query word
+        terms = [t for t in _WORD.findall(query.lower()) if t not in _STOPWORDS] or _WORD.findall(query.lower())
+        if terms:
+            found += self._name_matches(terms)
+        # 3. Typos: closest symbols and name words
+        if not found:
+            found += difflib.get_close_matches(query.upper(), self.symbols, n=limit, cutoff=FUZZY_CUTOFF)
+            for word in difflib.get_close_matches(query.lower(), self._vocabulary, n=3, cutoff=FUZZY_CUTOFF):
+                found += self._name_matches([word])
+        unique = list(dict.fromkeys(found))[:limit]
+        return [(symbol, self.names[symbol]) for symbol in unique]
+
+    def name(self, symbol):
+        return self.names.get(symbol.upper(), "")
+
+    def _name_matches(self, terms):
+        matches = None
+        for term in terms:
+            lo, hi = self._prefix_range(self._words, term)
+            symbols = set(self._word_symbols[lo:hi])
+            matches = symbols if matches is None else matches & symbols
+            if not matches:
+                return []
+        # Shorter names first: "apple" should find Apple Inc. before Apple Hospitality REIT
+        return sorted(matches, key=lambda s: (len(self.names[s]), s))
+
+    def resolve(self, query):
+        """The symbol `query` most likely means: itself if listed, else the best name / symbol match; None if nothing matches."""
+        query = query.strip()
+        if not query:
+            return None
+        if self.accepts(query):
+            return query.upper()
+        matches = self.search(query, limit=1)
+        return matches[0][0] if matches else None
+
+
+_index = None
+_built_at = 0.0
+_refreshing = False
+_index_lock = threading.Lock()
+
+
+def _local_index():
+    # Disk only: the last downloaded listing, else the bundled snapshot
+    universe = load_cached_universe()
+    if universe is not None:
+        return SymbolIndex(universe["Symbol"], universe["Name"])
+    snapshot = load_snapshot()
+    return SymbolIndex(snapshot["Symbol"], snapshot["Name"], snapshot=True)
+
+
+def _build_index():
+    try:
+        universe = load_nasdaq_universe()
+        return SymbolIndex(universe["Symbol"], universe["Name"])
+    except Exception:
+        snapshot = load_snapshot()
+        return SymbolIndex(snapshot["Symbol"], snapshot["Name"], snapshot=True)
+
+
+def _refresh():
+    global _index, _built_at, _refreshing
+    try:
+        index = _build_index()
+    finally:
+        with _index_lock:
+            _refreshing = False
+    with _index_lock:
+        _index = index
+        _built_at = time.monotonic()
+
+
+def get_index():
+    """Process-wide SymbolIndex; never waits for the network.
+
+    The first call serves the index from disk, and a background thread
+    refreshes the listing daily (or every SNAPSHOT_RETRY seconds while on the
+    snapshot), swapping the new index in when it is ready.
+    """
+    global _index, _refreshing
+    with _index_lock:
+        if _index is None:
+            _index = _local_index()
+            due = True
+        else:
+            due = time.monotonic() - _built_at > (SNAPSHOT_RETRY if _index.snapshot else UNIVERSE_TTL)
+        if due and not _refreshing:
+            _refreshing = True
+            threading.Thread(target=_refresh, name="symbol-index-refresh", daemon=True).start()
+        return _index
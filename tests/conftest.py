@@ -0,0 +1,15 @@
+"""Test setup: offline synthetic market data and a throwaway cache directory.
+
+The environment is set before any TradeSense module is imported, so no test
+touches the network or the real cache.
+"""
+import os
+import sys
+import tempfile
+
+os.environ["TRADESENSE_PROVIDER"] = "synthetic"
+os.environ["TRADESENSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="tradesense-test-")
+os.environ.setdefault("NEWS_API_KEY", "offline")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from backtest import BacktestParams, run_backtest, signal_matrix, simulate
+from indicators import rsi, sma
+
+
+def test_simulate_fills_on_the_next_bar():
+    close = np.array([[10.0, 11.0, 12.0, 11.0, 13.0]])
+    signal = np.array([[False, True, True, False, False]])
+    returns, trades = simulate(close, signal, cost_bps=0.0)
+    # Signal at bar 1 -> bought at bar 2's close (12) -> held over 12 -> 11 -> 13, sold at bar 4's close
+    np.testing.assert_allclose(returns, [0.0, 0.0, 11 / 12 - 1, 13 / 11 - 1])
+    assert np.prod(1 + returns) - 1 == pytest.approx(13 / 12 - 1)
+    assert trades == 1  # the exit falls on the last bar, after the simulated span
+
+
+def test_simulate_charges_costs_on_every_change():
+    close = np.full((1, 7), 100.0)
+    signal = np.array([[True, False, True, False, True, False, False]])
+    returns, trades = simulate(close, signal, cost_bps=10.0)
+    assert trades == 5
+    np.testing.assert_allclose(returns, [0.0, -0.001, -0.001, -0.001, -0.001, -0.001])
+
+
+def test_simulate_equal_weights_priced_sleeves():
+    close = np.array([[10.0, 10.0, 11.0], [20.0, 20.0, np.nan]])
+    signal = np.ones((2, 3), dtype=bool)
+    returns, _ = simulate(close, signal, cost_bps=0.0)
+    # Bar 2: only the first ticker has a price, so it is the whole portfolio
+    np.testing.assert_allclose(returns, [0.0, 0.1])
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(3)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (5, 750)), axis=-1))
+
+
+def reference_gate(close, params):
+    # Bar by bar: enter only when RSI < rsi_max, then hold while the trend holds
+    trend = close > sma(close, params.sma_window)
+    ok = rsi(close, params.rsi_window) < params.rsi_max
+    held = np.zeros_like(trend)
+    for t in range(close.shape[-1]):
+        prev = held[:, t - 1] if t else np.zeros(close.shape[0], dtype=bool)
+        held[:, t] = trend[:, t] & (prev | ok[:, t])
+    return held
+
+
+def test_rsi_max_only_gates_entries(closes):
+    params = BacktestParams(sma_window=20, rsi_max=60.0, use_pe=False)
+    signal = signal_matrix(closes, None, None, params)
+    np.testing.assert_array_equal(signal, reference_gate(closes, params))
+
+    values = rsi(closes, params.rsi_window)
+    entries = signal[:, 1:] & ~signal[:, :-1]
+    assert (values[:, 1:][entries] < params.rsi_max).all()
+    assert (values[signal] >= params.rsi_max).any()  # open positions ride through high RSI
+
+
+def test_rsi_max_never_adds_trades(closes):
+    ungated = BacktestParams(sma_window=20, use_pe=False)
+    gated = BacktestParams(sma_window=20, rsi_max=60.0, use_pe=False)
+    stats, _ = run_backtest(closes, None, None, ungated)
+    gated_stats, _ = run_backtest(closes, None, None, gated)
+    assert gated_stats["trades"] <= stats["trades"]
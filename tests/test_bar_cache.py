@@ -0,0 +1,47 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import COLUMNS, BarCache, period_start
+
+
+def bars(period):
+    dates = pd.bdate_range(period_start(period).tz_localize(None), pd.Timestamp.now().normalize(),
+                           tz="America/New_York")
+    close = np.linspace(100, 200, len(dates))
+    return pd.DataFrame({c: close for c in COLUMNS}, index=dates)
+
+
+def test_empty_full_fetch_keeps_cached_bars(tmp_path):
+    upstream = {"df": bars("2y")}
+    cache = BarCache(str(tmp_path / "bars.sqlite"),
+                     fetch=lambda ticker, period=None, start=None: upstream["df"])
+    cached = len(cache.history("AAPL", "2y"))
+    assert cached > 500
+
+    upstream["df"] = pd.DataFrame(columns=COLUMNS)  # throttled upstream answers with nothing
+    assert len(cache.history("AAPL", "5y")) == cached
+    assert len(cache.history("AAPL", "2y", refresh=False)) == cached
+
+
+def test_slow_fetch_does_not_block_other_tickers(tmp_path):
+    release = threading.Event()
+
+    def fetch(ticker, period=None, start=None):
+        if ticker == "SLOW":
+            release.wait(10)
+        return bars("1y")
+
+    cache = BarCache(str(tmp_path / "bars.sqlite"), fetch=fetch)
+    slow = threading.Thread(target=cache.history, args=("SLOW", "1y"))
+    slow.start()
+    try:
+        fast = threading.Thread(target=cache.history, args=("FAST", "1y"))
+        fast.start()
+        fast.join(5)
+        assert not fast.is_alive()
+    finally:
+        release.set()
+        slow.join()
+    assert len(cache.history("SLOW", "1y", refresh=False)) > 200
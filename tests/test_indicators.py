@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import ema, ewm, rsi, sma
+
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(0)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (4, 1000)), axis=-1))
+
+
+def reference_rsi(close, window):
+    # ta.momentum.RSIIndicator: Wilder smoothing of gains and losses
+    diff = pd.Series(close).diff()
+    up = diff.where(diff > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    down = (-diff.where(diff < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    return np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+
+
+@pytest.mark.parametrize("window", [1, 2, 14, 50, 200])
+def test_sma_matches_pandas(closes, window):
+    expected = pd.DataFrame(closes.T).rolling(window).mean().to_numpy().T
+    np.testing.assert_allclose(sma(closes, window), expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("window", [1, 2, 12, 26, 200])
+def test_ema_matches_pandas(closes, window):
+    expected = pd.DataFrame(closes.T).ewm(span=window, adjust=False).mean().to_numpy().T
+    np.testing.assert_allclose(ema(closes, window), expected, rtol=1e-9)
+
+
+def test_ema_with_leading_nans(closes):
+    row = closes[0].copy()
+    row[:30] = np.nan
+    expected = pd.Series(row).ewm(span=20, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ema(row, 20), expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("alpha", [1.0, 0.99, 0.5, 0.1, 0.001])
+def test_ewm_matches_pandas(closes, alpha):
+    expected = pd.DataFrame(closes.T).ewm(alpha=alpha, adjust=False).mean().to_numpy().T
+    np.testing.assert_allclose(ewm(closes, alpha), expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("window", [1, 2, 14, 30])
+def test_rsi_matches_wilder(closes, window):
+    got = rsi(closes, window)
+    for row, out in zip(closes, got):
+        np.testing.assert_allclose(out, reference_rsi(row, window), rtol=1e-9, atol=1e-9)
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from intraday import OHLCV, IntradayFeed, IntradaySeries
+from providers import SyntheticProvider, _synthetic_session
+from test_indicators import reference_rsi
+
+DAYS = ["2024-03-04", "2024-03-05", "2024-03-06"]
+
+
+@pytest.fixture(scope="module")
+def minutes():
+    return pd.concat([_synthetic_session("AAPL", day, 100.0, 101.0 + i, 390_000.0) for i, day in enumerate(DAYS)])
+
+
+def resampled(minutes, rule):
+    # pandas reference: bars aligned to the 09:30 open, as yfinance serves them
+    offset = "30min" if rule == "60min" else "0min"
+    bars = minutes.resample(rule, origin="start_day", offset=offset).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    )
+    return bars.dropna(subset=["Close"])
+
+
+@pytest.mark.parametrize("interval, rule", [("1m", "1min"), ("5m", "5min"), ("15m", "15min"), ("1h", "60min")])
+def test_bars_match_pandas_resample(minutes, interval, rule):
+    series = IntradaySeries("AAPL")
+    series.extend(minutes)
+    got = series.frame(interval)
+    expected = resampled(minutes, rule)
+    np.testing.assert_array_equal(got.index.as_unit("ns").asi8, expected.index.as_unit("ns").asi8)
+    np.testing.assert_allclose(got[OHLCV].to_numpy(), expected[OHLCV].to_numpy(), rtol=1e-12)
+
+
+def test_bars_are_the_same_however_the_minutes_arrive(minutes):
+    whole = IntradaySeries("AAPL")
+    whole.extend(minutes)
+    streamed = IntradaySeries("AAPL")
+    for start in range(0, len(minutes), 37):
+        # Each refresh re-reads the latest minute, as a delta fetch from `last_ts` does
+        streamed.extend(minutes.iloc[max(start - 1, 0):start + 37])
+    pd.testing.assert_frame_equal(streamed.frame("15m"), whole.frame("15m"))
+
+
+@pytest.mark.parametrize("interval, rule", [("1m", "1min"), ("5m", "5min")])
+def test_indicators_match_pandas_rolling(minutes, interval, rule):
+    series = IntradaySeries("AAPL")
+    series.extend(minutes)
+    got = series.frame(interval)
+    close = resampled(minutes, rule)["Close"]
+    np.testing.assert_allclose(got["SMA50"], close.rolling(50).mean(), rtol=1e-9)
+    np.testing.assert_allclose(got["SMA200"], close.rolling(200).mean(), rtol=1e-9)
+    np.testing.assert_allclose(got["RSI14"], reference_rsi(close.to_numpy(), 14), rtol=1e-9, atol=1e-9)
+
+
+def test_seeded_indicators_are_warm_and_match_the_long_history():
+    # Five sessions of hourly bars are far fewer than SMA200 needs; the seed supplies the rest
+    provider = SyntheticProvider()
+    minutes = provider.intraday("MSFT")
+    first = minutes.index.min()
+    hourly = provider.intraday("MSFT", start=first - pd.Timedelta(days=90), interval="1h")
+
+    series = IntradaySeries("MSFT")
+    series.seed(lambda start, interval: provider.intraday("MSFT", start=start, interval=interval), first.value)
+    series.extend(minutes)
+    got = series.frame("1h")
+    assert got[["SMA50", "SMA200", "RSI14"]].notna().all().all()
+
+    close = hourly["Close"]
+    expected = pd.DataFrame({
+        "SMA50": close.rolling(50).mean(),
+        "SMA200": close.rolling(200).mean(),
+        "RSI14": reference_rsi(close.to_numpy(), 14),
+    }, index=close.index).reindex(got.index)
+    np.testing.assert_allclose(got["SMA50"], expected["SMA50"], rtol=1e-9)
+    np.testing.assert_allclose(got["SMA200"], expected["SMA200"], rtol=1e-9)
+    # Wilder smoothing never forgets its start, so the seeded RSI only converges to the long one
+    np.testing.assert_allclose(got["RSI14"], expected["RSI14"], atol=1e-3)
+
+
+def test_failed_seed_starts_cold(minutes):
+    def fetch(start, interval):
+        raise ConnectionError("down")
+
+    series = IntradaySeries("AAPL")
+    series.seed(fetch, minutes.index[0].value)
+    series.extend(minutes)
+    assert series.frame("1h")["SMA50"].isna().all()
+
+
+def test_feed_serves_warm_hourly_indicators():
+    feed = IntradayFeed(refresh=0)
+    bars = feed.bars("NVDA", "1h")
+    assert bars["SMA200"].notna().all()
+    assert feed.bars("NVDA", "1h")["SMA200"].notna().all()
+
+
+def test_concurrent_refreshes_share_the_refresh_times():
+    feed = IntradayFeed(refresh=3600)
+    threads = [threading.Thread(target=feed.refresh, args=(t,)) for t in ["A", "B", "C", "D"] * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(feed._refreshed) == ["A", "B", "C", "D"]
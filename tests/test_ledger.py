@@ -0,0 +1,130 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ledger import Ledger, LedgerStore
+
+
+def reference_cost_basis(trades):
+    """Plain per-trade average-cost loop: ticker -> (quantity, avg_cost, cost_basis, realized_pnl)."""
+    state = {}
+    for ticker, qty, price in trades:
+        pos, basis, realized = state.get(ticker, (0.0, 0.0, 0.0))
+        if qty > 0:
+            pos, basis = pos + qty, basis + qty * price
+        else:
+            avg = basis / pos
+            realized += (price - avg) * -qty
+            pos += qty
+            basis = 0.0 if np.isclose(pos, 0) else avg * pos
+            pos = 0.0 if np.isclose(pos, 0) else pos
+        state[ticker] = (pos, basis, realized)
+    return {t: (pos, basis / pos if pos > 0 else np.nan, basis, realized)
+            for t, (pos, basis, realized) in state.items()}
+
+
+def assert_matches_reference(ledger, trades):
+    basis = ledger.cost_basis()
+    expected = reference_cost_basis(trades)
+    assert sorted(basis.index) == sorted(expected)
+    for ticker, (qty, avg, cost, realized) in expected.items():
+        row = basis.loc[ticker]
+        assert row["quantity"] == pytest.approx(qty, abs=1e-9)
+        assert row["cost_basis"] == pytest.approx(cost, rel=1e-9, abs=1e-6)
+        assert row["realized_pnl"] == pytest.approx(realized, rel=1e-9, abs=1e-6)
+        if np.isnan(avg):
+            assert np.isnan(row["avg_cost"])
+        else:
+            assert row["avg_cost"] == pytest.approx(avg, rel=1e-9)
+
+
+def record(ledger, trades):
+    tickers, qty, price = zip(*trades)
+    ledger.record_many(tickers, qty, price, np.arange(len(trades), dtype=np.float64))
+
+
+def test_partial_sells_never_closing():
+    # Long runs of partial sells used to underflow the cost-basis recurrence to NaN
+    trades = [("AAPL", 10.0, 100.0)]
+    rng = np.random.default_rng(0)
+    for price in rng.uniform(50, 150, 1500):
+        trades += [("AAPL", -5.0, price), ("AAPL", 5.0, price * 1.01)]
+    ledger = Ledger()
+    with np.errstate(all="raise"):
+        record(ledger, trades)
+        assert_matches_reference(ledger, trades)
+
+
+def test_random_ledger_matches_reference():
+    rng = np.random.default_rng(1)
+    tickers = ["AAPL", "MSFT", "NVDA", "TSLA"]
+    held = dict.fromkeys(tickers, 0.0)
+    trades = []
+    for _ in range(20000):
+        ticker = tickers[rng.integers(len(tickers))]
+        if held[ticker] > 0 and rng.random() < 0.45:
+            # Sometimes close the whole position, so baskets restart
+            qty = -held[ticker] if rng.random() < 0.2 else -float(rng.integers(1, held[ticker] + 1))
+        else:
+            qty = float(rng.integers(1, 50))
+        held[ticker] += qty
+        trades.append((ticker, qty, float(rng.uniform(10, 500))))
+    ledger = Ledger()
+    record(ledger, trades)
+    assert_matches_reference(ledger, trades)
+
+
+def test_closed_position_restarts_basis():
+    trades = [("AAPL", 10.0, 100.0), ("AAPL", -10.0, 120.0), ("AAPL", 5.0, 50.0)]
+    ledger = Ledger()
+    record(ledger, trades)
+    row = ledger.cost_basis().loc["AAPL"]
+    assert row["avg_cost"] == 50.0
+    assert row["realized_pnl"] == 200.0
+
+
+def test_equity_curve_buy_partial_sell_rebuy():
+    closes = pd.DataFrame({"AAPL": [95.0, 100.0, 110.0, 105.0, 120.0]},
+                          index=pd.date_range("2024-01-01", periods=5))
+    ledger = Ledger(10000.0)
+    ledger.record("AAPL", 10, 100.0, ts=pd.Timestamp("2024-01-02").timestamp())
+    ledger.record("AAPL", -4, 110.0, ts=pd.Timestamp("2024-01-03").timestamp())
+    # Mid-session rebuy: counts from the next close
+    ledger.record("AAPL", 6, 105.0, ts=pd.Timestamp("2024-01-03 15:00").timestamp())
+    equity = ledger.equity_curve(closes)
+    # cash / shares: 10000 / 0, 9000 / 10, 9440 / 6, 8810 / 12, 8810 / 12
+    expected = [10000.0, 9000 + 10 * 100.0, 9440 + 6 * 110.0, 8810 + 12 * 105.0, 8810 + 12 * 120.0]
+    np.testing.assert_allclose(equity.to_numpy(), expected)
+    assert list(equity.index) == list(closes.index)
+
+
+def accounts(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT portfolio FROM accounts ORDER BY portfolio")]
+
+
+def test_untraded_portfolios_leave_no_account_rows(tmp_path):
+    path = str(tmp_path / "portfolios.sqlite")
+    store = LedgerStore(path)
+    for portfolio in ("a", "b", "c"):
+        Ledger.open(portfolio, store)
+    assert accounts(path) == []
+
+    ledger = Ledger.open("b", store)
+    ledger.record("AAPL", 5, 100.0, ts=0.0)
+    assert accounts(path) == ["b"]
+    reopened = Ledger.open("b", LedgerStore(path))
+    assert reopened.position("AAPL") == 5.0
+    assert reopened.cash == 9500.0
+
+
+def test_store_reaps_abandoned_default_accounts(tmp_path):
+    path = str(tmp_path / "portfolios.sqlite")
+    store = LedgerStore(path)
+    store.reset("abandoned", 10000.0)
+    store.reset("custom", 2500.0)
+    Ledger.open("active", store).record("MSFT", 1, 300.0, ts=0.0)
+    LedgerStore(path)
+    assert accounts(path) == ["active", "custom"]
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from metrics import Metrics
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc("tradesense_errors_total", source='say "hi"\\now\nthen')
+    metrics.observe('stage "x"', 0.01)
+    text = metrics.prometheus()
+    assert 'tradesense_errors_total{source="say \\"hi\\"\\\\now\\nthen"} 1' in text
+    assert 'tradesense_stage_seconds_count{stage="stage \\"x\\""} 1' in text
+    # Every sample stays on its own line
+    assert all(line.startswith(("#", "tradesense_")) for line in text.splitlines())
+
+
+def run(code, env):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                          check=True)
+
+
+def test_handled_errors_are_silent_unless_logging_is_configured():
+    env = {k: v for k, v in os.environ.items() if k != "TRADESENSE_LOG_LEVEL"}
+    assert run("import metrics; metrics.error('news', ConnectionError('reset'))", env).stderr == ""
+
+
+def test_handled_errors_reach_a_configured_logger():
+    code = ("import logging, metrics; logging.basicConfig(format='%(message)s'); "
+            "metrics.error('news', ConnectionError('reset'))")
+    out = run(code, dict(os.environ, TRADESENSE_LOG_LEVEL="warning"))
+    assert '"source": "news"' in out.stderr
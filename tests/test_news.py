@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from news import NewsAPIError, NewsAPIRequestError, NewsClient
+from resilience import CircuitBreaker, Guard
+
+ARTICLES = [
+    {
+        "source": {"id": None, "name": "Example Wire"},
+        "title": "Apple beats estimates",
+        "description": "Quarterly revenue rose.",
+        "url": "https://example.com/apple",
+        "publishedAt": "2026-10-16T12:00:00Z",
+    }
+]
+
+
+class FakeNewsAPI(BaseHTTPRequestHandler):
+    """Answers /v2/everything from `server.reply`: (HTTP status, body, delay in seconds)."""
+
+    def do_GET(self):
+        self.server.requests.append(parse_qs(urlparse(self.path).query))
+        status, body, delay = self.server.reply
+        time.sleep(delay)
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if not isinstance(body, str) else "text/html")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def newsapi():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNewsAPI)
+    server.daemon_threads = True
+    server.requests = []
+    server.reply = (200, {"status": "ok", "totalResults": len(ARTICLES), "articles": ARTICLES}, 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(newsapi):
+    host, port = newsapi.server_address
+    client = NewsClient("test-key", base_url=f"http://{host}:{port}/v2/everything", timeout=(1, 0.3))
+    # One attempt and no shared breaker, so failures stay within each test
+    client.guard = Guard("news-test", rate=1000, burst=1000, attempts=1)
+    yield client
+    client.close()
+
+
+def test_ok_payload(client, newsapi):
+    assert client.headlines("AAPL", page_size=3) == ARTICLES
+    (params,) = newsapi.requests
+    assert params["q"] == ["AAPL"]
+    assert params["pageSize"] == ["3"]
+    assert params["apiKey"] == ["test-key"]
+
+
+def test_error_status(client, newsapi):
+    newsapi.reply = (200, {"status": "error", "code": "unexpectedError", "message": "Something went wrong."}, 0)
+    with pytest.raises(NewsAPIError, match="Something went wrong"):
+        client.headlines("AAPL")
+
+
+@pytest.mark.parametrize("status, code", [(400, "parameterInvalid"), (401, "apiKeyInvalid")])
+def test_rejected_request_is_not_retried_or_counted(client, newsapi, status, code):
+    newsapi.reply = (status, {"status": "error", "code": code, "message": "Your API key is invalid."}, 0)
+    client.guard = Guard("news-test", rate=1000, burst=1000, attempts=3, failure_threshold=1, sleep=lambda s: None)
+    for _ in range(2):
+        with pytest.raises(NewsAPIRequestError, match="API key is invalid"):
+            client._fetch("AAPL", 5)
+    assert len(newsapi.requests) == 2
+    assert client.guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_throttling_is_retried_and_counted(client, newsapi):
+    newsapi.reply = (429, {"status": "error", "code": "rateLimited", "message": "Too many requests."}, 0)
+    client.guard = Guard("news-test", rate=1000, burst=1000, attempts=3, failure_threshold=1, sleep=lambda s: None)
+    with pytest.raises(NewsAPIError, match="Too many requests"):
+        client._fetch("AAPL", 5)
+    assert len(newsapi.requests) == 3
+    assert client.guard.breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.parametrize("status, body", [
+    (429, {"status": "error", "code": "rateLimited"}),
+    (502, "<html>Bad gateway</html>"),
+])
+def test_non_200(client, newsapi, status, body):
+    newsapi.reply = (status, body, 0)
+    with pytest.raises(NewsAPIError, match=f"HTTP {status}"):
+        client.headlines("AAPL")
+
+
+def test_timeout(client, newsapi):
+    newsapi.reply = (200, {"status": "ok", "articles": ARTICLES}, 1.0)
+    with pytest.raises(requests.Timeout):
+        client.headlines("AAPL")
+
+
+def test_cache_hit_makes_no_second_request(client, newsapi):
+    first = client.headlines("AAPL")
+    assert client.headlines("AAPL") == first
+    assert len(newsapi.requests) == 1
+    client.headlines("MSFT")
+    assert len(newsapi.requests) == 2
+
+
+def test_headlines_many_degrades_to_empty(client, newsapi):
+    newsapi.reply = (500, {"status": "error", "message": "boom"}, 0)
+    assert client.headlines_many(["AAPL", "MSFT"]) == {"AAPL": [], "MSFT": []}
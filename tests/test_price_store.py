@@ -0,0 +1,113 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PriceStore, StoreView
+
+DATES = pd.bdate_range("2020-01-01", periods=300)
+
+
+def bars(seed, dates):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    index = pd.DatetimeIndex(dates).tz_localize("America/New_York")
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, len(dates)).astype("float64"),
+    }, index=index)
+
+
+@pytest.fixture
+def frames():
+    frames = {f"T{i:03d}": bars(i, DATES) for i in range(20)}
+    frames["LATE"] = bars(99, DATES[100:])  # listed later: NaN before its first bar
+    return frames
+
+
+@pytest.fixture
+def store(tmp_path, frames):
+    store = PriceStore(str(tmp_path))
+    assert store.append(frames) == len(DATES)
+    return store
+
+
+def files(store, generation):
+    return sorted(n for n in os.listdir(store.path) if f".{generation}." in n)
+
+
+def test_round_trip(tmp_path, store, frames):
+    reopened = PriceStore(str(tmp_path))
+    assert reopened.tickers == list(frames)
+    assert list(reopened.dates) == list(DATES)
+    for ticker in ("T003", "LATE"):
+        got = reopened.frame("close", [ticker])[ticker]
+        pd.testing.assert_series_equal(got.dropna(), frames[ticker]["Close"].tz_localize(None),
+                                       check_names=False, check_index_type=False, check_freq=False)
+    assert reopened.frame("close", ["LATE"])["LATE"].iloc[:100].isna().all()
+
+
+def test_dtype_persists(tmp_path, frames):
+    PriceStore(str(tmp_path), dtype="float32").append(frames)
+    reopened = PriceStore(str(tmp_path))
+    assert reopened.dtype == np.float32 and reopened.field("close").dtype == np.float32
+
+
+def test_window_is_a_view_for_consecutive_rows(store):
+    values, dates, tickers = store.window("close", ["T001", "T002", "T003"], start="2020-03-02")
+    assert np.shares_memory(values, store.field("close"))
+    assert dates[0] == pd.Timestamp("2020-03-02") and tickers == ["T001", "T002", "T003"]
+    shuffled, _, _ = store.window("close", ["T005", "T001"])
+    assert not np.shares_memory(shuffled, store.field("close"))
+
+
+def test_daily_append_writes_in_place(tmp_path, store):
+    generation = store.generation
+    reader = PriceStore(str(tmp_path))
+    day = pd.bdate_range(DATES[-1] + pd.offsets.BDay(), periods=1)
+    assert store.append({"T000": bars(7, day), "NEW": bars(8, day)}) == 1
+    assert store.generation == generation
+
+    assert reader.refresh()
+    assert len(reader.dates) == len(DATES) + 1 and "NEW" in reader
+    assert reader.field("close")[0, -1] == bars(7, day)["Close"].iloc[0]
+    assert np.isnan(reader.field("close")[1, -1])
+    assert not reader.refresh()
+
+    # A revised last bar overwrites it without adding a date
+    assert store.append({"T000": bars(9, day)}) == 0
+    assert store.generation == generation
+    assert store.field("close")[0, -1] == bars(9, day)["Close"].iloc[0]
+
+
+def test_backfill_and_growth_rewrite_the_files(tmp_path, store, frames):
+    generation = store.generation
+    reader = PriceStore(str(tmp_path))
+    older = pd.bdate_range(end=DATES[0] - pd.offsets.BDay(), periods=5)
+    assert store.append({"T010": bars(3, older)}) == 5
+    assert store.generation == generation + 1
+    assert files(store, generation) == []  # the old generation is removed after the swap
+    np.testing.assert_array_equal(store.field("close")[store.rows["T003"], 5:], frames["T003"]["Close"])
+    assert np.isnan(store.field("close")[store.rows["T003"], :5]).all()
+    assert reader.refresh() and reader.generation == generation + 1
+    np.testing.assert_array_equal(reader.field("close"), store.field("close"))
+
+    # Outgrowing the spare date capacity also reallocates, keeping every row
+    capacity = np.load(os.path.join(store.path, f"close.{store.generation}.npy"), mmap_mode="r").shape[1]
+    more = pd.bdate_range(store.dates[-1] + pd.offsets.BDay(), periods=capacity)
+    store.append({"T001": bars(11, more)})
+    assert store.generation == generation + 2
+    assert len(store.dates) == len(DATES) + 5 + capacity
+    np.testing.assert_array_equal(store.field("close")[store.rows["T003"], 5:5 + len(DATES)],
+                                  frames["T003"]["Close"])
+    assert sorted(os.listdir(store.path)) == sorted(files(store, store.generation) + ["meta.json"])
+
+
+def test_store_view_pickles_and_loads_the_same_slice(store):
+    for tickers in (["T003", "T004"], ["T005", "T001"]):
+        view = store.view("close", tickers, start="2020-06-01")
+        view = pickle.loads(pickle.dumps(view))
+        assert isinstance(view, StoreView)
+        np.testing.assert_array_equal(view.load(), store.window("close", tickers, start="2020-06-01")[0])
@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+import providers
+from resilience import CircuitBreaker, CircuitOpenError, Guard, RateLimitedError, UpstreamError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(guard, clock):
+    def down():
+        raise ConnectionError("upstream down")
+
+    for _ in range(guard.breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            guard.call(down)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    clock.now += guard.breaker.reset_timeout
+
+
+def make_guard(clock, **kwargs):
+    guard = Guard("test", rate=1000, burst=1000, attempts=1, sleep=lambda s: None, **kwargs)
+    guard.breaker._clock = clock
+    return guard
+
+
+def test_rate_limited_trial_is_released():
+    clock = Clock()
+    guard = make_guard(clock, max_wait=0)
+    open_breaker(guard, clock)
+    guard.bucket.acquire = lambda timeout=None: False
+    with pytest.raises(RateLimitedError):
+        guard.call(lambda: "ok")
+    del guard.bucket.acquire
+    assert guard.call(lambda: "ok") == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_programming_errors_are_not_upstream_failures():
+    clock = Clock()
+    guard = make_guard(clock)
+    calls = []
+
+    def buggy():
+        calls.append(1)
+        raise KeyError("close")
+
+    guard.attempts = 3
+    for _ in range(10):
+        with pytest.raises(KeyError):
+            guard.call(buggy)
+    assert len(calls) == 10  # never retried
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_programming_error_releases_trial():
+    clock = Clock()
+    guard = make_guard(clock)
+    open_breaker(guard, clock)
+    with pytest.raises(TypeError):
+        guard.call(lambda: None + 1)
+    assert guard.call(lambda: "ok") == "ok"
+
+
+def test_failed_trial_reopens():
+    clock = Clock()
+    guard = make_guard(clock)
+    open_breaker(guard, clock)
+    with pytest.raises(UpstreamError):
+        guard.call(lambda: (_ for _ in ()).throw(UpstreamError("still down")))
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: "ok")
+
+
+def fake_yfinance(monkeypatch, history):
+    class Ticker:
+        def __init__(self, ticker):
+            pass
+
+    Ticker.history = lambda self, **kwargs: history()
+
+    class YFRateLimitError(Exception):
+        pass
+
+    yf = type("yf", (), {"Ticker": Ticker, "exceptions": type("exceptions", (), {"YFRateLimitError": YFRateLimitError})})
+    monkeypatch.setattr(providers, "_yf", lambda: yf)
+    return yf
+
+
+def test_empty_history_is_no_data_not_a_failure(monkeypatch):
+    # Delisted symbols, warrants and new listings come back empty; they must not open the breaker
+    calls = []
+    fake_yfinance(monkeypatch, lambda: calls.append(1) or pd.DataFrame())
+    guard = make_guard(Clock())
+    guard.attempts = 3
+    provider = providers.YFinanceProvider(guard=guard)
+    for _ in range(2 * guard.breaker.failure_threshold):
+        assert provider.history("XYZW", period="1y").empty
+    assert len(calls) == 2 * guard.breaker.failure_threshold  # never retried
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_yfinance_rate_limit_counts_against_breaker(monkeypatch):
+    yf = None
+
+    def throttled():
+        raise yf.exceptions.YFRateLimitError("Too Many Requests")
+
+    yf = fake_yfinance(monkeypatch, throttled)
+    provider = providers.YFinanceProvider(guard=make_guard(Clock()))
+    for _ in range(provider.guard.breaker.failure_threshold):
+        with pytest.raises(UpstreamError):
+            provider.history("AAPL", period="1y")
+    assert provider.guard.breaker.state == CircuitBreaker.OPEN
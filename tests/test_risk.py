@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from risk import RollingCovariance, rolling_average_correlation
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    common = rng.normal(0, 0.01, (300, 1))
+    returns = 0.5 * common + rng.normal(0, 0.01, (300, 6))
+    returns[:, 3] = 0.0  # a holding that never moves
+    return returns
+
+
+def test_rolling_covariance_matches_numpy(returns):
+    state = RollingCovariance(returns.shape[1], window=20)
+    for i, row in enumerate(returns):
+        state.push(row)
+        if i >= 19:
+            window = returns[i - 19:i + 1]
+            np.testing.assert_allclose(state.covariance(), np.cov(window.T), atol=1e-12)
+            np.testing.assert_allclose(state.variance(), window.var(axis=0, ddof=1), atol=1e-12)
+
+
+def test_rolling_average_correlation_matches_numpy(returns):
+    window = 30
+    got = rolling_average_correlation(returns, window)
+    assert np.isnan(got[:window - 1]).all()
+    off_diagonal = ~np.eye(returns.shape[1], dtype=bool)
+    for i in range(window - 1, len(returns)):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.corrcoef(returns[i - window + 1:i + 1].T)
+        expected = np.nan_to_num(corr)[off_diagonal].mean()
+        assert got[i] == pytest.approx(expected, abs=1e-9)
@@ -0,0 +1,44 @@
+import pytest
+
+import screener
+from bar_cache import default_cache
+
+
+@pytest.fixture
+def flaky_upstream(monkeypatch):
+    # BAD has no history at all, NOPE has bars but its fundamentals fetch fails
+    cache = default_cache()
+    history = cache.history
+
+    def fake_history(ticker, period, refresh=True):
+        if ticker == "BAD":
+            raise ConnectionError("reset by peer")
+        return history(ticker, period, refresh=refresh)
+
+    fetch = screener.fetch_fundamentals
+
+    def fake_fundamentals(ticker):
+        if ticker in ("BAD", "NOPE"):
+            raise ConnectionError("reset by peer")
+        return fetch(ticker)
+
+    monkeypatch.setattr(cache, "history", fake_history)
+    monkeypatch.setattr(screener, "fetch_fundamentals", fake_fundamentals)
+    errors = []
+    monkeypatch.setattr(screener.metrics, "error", lambda source, exc=None: errors.append(source))
+    return errors
+
+
+def test_load_chunk_counts_and_reports_skipped_tickers(flaky_upstream):
+    closes, skipped = screener.load_chunk(["AAPL", "BAD", "NOPE"], "1y", refresh=True)
+    assert list(closes.columns) == ["AAPL", "NOPE"]
+    assert skipped == {"history": 1, "fundamentals": 1}
+    assert sorted(flaky_upstream) == ["screener.fundamentals", "screener.history"]
+
+
+def test_run_screener_surfaces_skipped_counts(flaky_upstream, capsys):
+    table, skipped = screener.run_screener(["MSFT", "NOPE", "BAD"], workers=1)
+    assert sorted(table["Ticker"]) == ["MSFT", "NOPE"]
+    assert skipped == {"history": 1, "fundamentals": 1}
+    screener.report_skipped(skipped)
+    assert "1 histories, 1 fundamentals" in capsys.readouterr().err
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import sector_stats
+from fundamentals import FundamentalsStore
+from sector_stats import COLUMNS, SectorStatsStore, compute_sector_stats, refresh_sector_stats
+
+
+def test_no_usable_pe_gives_empty_stats():
+    fundamentals = pd.DataFrame({"sector": ["Technology", None, "Energy"], "trailing_pe": [-3.0, 20.0, np.nan]})
+    stats = compute_sector_stats(fundamentals)
+    assert stats.empty
+    assert list(stats.columns) == COLUMNS
+
+
+def test_refresh_with_upstream_down_keeps_stored_stats(tmp_path, monkeypatch):
+    path = str(tmp_path / "fundamentals.sqlite")
+    store, stats_store = FundamentalsStore(path), SectorStatsStore(path)
+    store.put_many([{"ticker": f"T{i}", "sector": "Technology", "trailing_pe": 10.0 + i} for i in range(6)])
+    stats, _ = refresh_sector_stats([f"T{i}" for i in range(6)], store=store, stats_store=stats_store)
+    assert stats.loc["Technology", "median"] == 12.5
+
+    def down(ticker):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(sector_stats, "fetch_fundamentals", down)
+    stats, refreshed = refresh_sector_stats(["NEW1", "NEW2"], store=store, stats_store=stats_store)
+    assert refreshed == 0 and stats.empty
+    assert stats_store.load().loc["Technology", "median"] == 12.5
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from sentiment import NEGATIVE, NEUTRAL, POSITIVE, get_sentiment, score_headline, score_headlines
+
+CASES = [
+    # Whole words only
+    ("Acme swings to a profit", POSITIVE),
+    ("Acme nonprofit arm names new director", NEUTRAL),
+    ("Acme ships firmware update", NEUTRAL),
+    # Inflections of a keyword
+    ("Acme shares surged after the call", POSITIVE),
+    ("Acme soaring on demand", POSITIVE),
+    ("Analyst downgrades Acme", NEGATIVE),
+    ("Acme upgraded to buy", POSITIVE),
+    ("Acme recalled 10,000 units", NEGATIVE),
+    # Negation flips the keyword after it
+    ("Acme does not expect growth this year", NEGATIVE),
+    ("Acme reports no losses from the outage", POSITIVE),
+    ("Acme fails to win the contract", NEGATIVE),
+    # Mixed headlines cancel out
+    ("Acme posts record losses", NEUTRAL),
+    ("Acme beats estimates but cuts guidance", NEUTRAL),
+    ("Acme beats estimates, raises outlook despite lawsuit", POSITIVE),
+]
+
+
+@pytest.mark.parametrize("headline, label", CASES)
+def test_get_sentiment(headline, label):
+    assert get_sentiment(headline) == label
+
+
+def test_negated_keyword_counts_once_for_the_other_side():
+    assert score_headline("Acme does not expect growth") == (0, 1, -1.0)
+    assert score_headline("Acme posts record losses") == (1, 1, 0.0)
+
+
+def test_score_headlines_matches_single_headline_scoring():
+    headlines = pd.Series([h for h, _ in CASES] + [None], index=range(10, 10 + len(CASES) + 1))
+    scored = score_headlines(headlines)
+    assert list(scored.index) == list(headlines.index)
+    assert list(scored["label"]) == [label for _, label in CASES] + [NEUTRAL]
+    for headline, row in zip(headlines[:-1], scored.itertuples()):
+        assert (row.positive, row.negative, row.score) == score_headline(headline)
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import symbols
+from symbols import SymbolIndex
+from universe import load_snapshot
+
+
+@pytest.fixture
+def snapshot_index(monkeypatch):
+    # No download and no cached listing: the index comes from the bundled snapshot
+    def offline(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(symbols, "load_nasdaq_universe", offline)
+    return symbols._build_index()
+
+
+def test_snapshot_is_a_listing():
+    listing = load_snapshot()
+    assert {"AAPL", "MSFT", "NVDA", "TSLA", "INTC"} <= set(listing["Symbol"])
+    assert listing["Symbol"].is_unique
+
+
+def test_offline_index_uses_snapshot(snapshot_index):
+    assert snapshot_index.snapshot
+    assert "AAPL" in snapshot_index
+
+
+@pytest.mark.parametrize("query, symbol", [
+    ("apple", "AAPL"), ("tesla", "TSLA"), ("intel", "INTC"), ("aapl", "AAPL"), ("MSFT", "MSFT"),
+])
+def test_names_resolve_before_symbols(snapshot_index, query, symbol):
+    assert snapshot_index.resolve(query) == symbol
+
+
+@pytest.mark.parametrize("query", ["apple", "tesla", "intel", "QQQQX", "ZZZZ"])
+def test_unlisted_symbols_are_rejected(snapshot_index, query):
+    assert not snapshot_index.accepts(query)
+
+
+def test_unknown_query_resolves_to_nothing():
+    index = SymbolIndex(["AAPL", "MSFT"], ["Apple Inc. - Common Stock", "Microsoft Corporation - Common Stock"])
+    assert index.resolve("zzzz") is None
+
+
+def test_get_index_never_waits_for_the_download(monkeypatch):
+    release = threading.Event()
+    listing = pd.DataFrame({"Symbol": ["AAPL", "ZZZQ"], "Name": ["Apple Inc. - Common Stock", "Zed Corp - Common Stock"]})
+
+    def slow_download():
+        release.wait(10)
+        return listing
+
+    monkeypatch.setattr(symbols, "load_nasdaq_universe", slow_download)
+    monkeypatch.setattr(symbols, "load_cached_universe", lambda: None)
+    monkeypatch.setattr(symbols, "_index", None)
+    monkeypatch.setattr(symbols, "_refreshing", False)
+
+    started = time.monotonic()
+    index = symbols.get_index()
+    assert time.monotonic() - started < 1
+    assert index.snapshot and "ZZZQ" not in index
+    assert symbols.get_index() is index  # one refresh in flight, still served from the snapshot
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while symbols.get_index() is index and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "ZZZQ" in symbols.get_index()
@@ -0,0 +1,84 @@
+"""NASDAQ-listed symbol universe, downloaded from Nasdaq Trader and cached on disk.
+
+A snapshot of the listing ships in data/ as the offline fallback for symbol
+validation; refresh it with `python universe.py`.
+"""
+import argparse
+import io
+import os
+import time
+
+import pandas as pd
+
+from settings import cache_path
+
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+UNIVERSE_TTL = 24 * 60 * 60  # the listing file is regenerated once a day
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nasdaqlisted.txt")
+
+
+def _parse_listing(text):
+    df = pd.read_csv(io.StringIO(text), sep="|", dtype=str)
+    # The last line is a "File Creation Time" footer, not a symbol
+    df = df[~df["Symbol"].str.startswith("File Creation Time", na=True)]
+    df = df[(df["Test Issue"] == "N") & (df.get("ETF", "N") == "N")]
+    out = pd.DataFrame({"Symbol": df["Symbol"].str.strip(), "Name": df["Security Name"].str.strip()})
+    return out.drop_duplicates("Symbol").sort_values("Symbol").reset_index(drop=True)
+
+
+def _download(timeout):
+    import requests  # only needed for the daily download
+
+    response = requests.get(NASDAQ_LISTED_URL, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def load_nasdaq_universe(refresh=False, timeout=10):
+    """Return a DataFrame of NASDAQ common-stock symbols and names (test issues and ETFs excluded).
+
+    The raw listing is cached under CACHE_DIR and re-downloaded once it is a
+    day old; a stale copy is used when the download fails.
+    """
+    path = cache_path("nasdaqlisted.txt")
+    fresh = os.path.exists(path) and time.time() - os.path.getmtime(path) < UNIVERSE_TTL
+    if refresh or not fresh:
+        try:
+            text = _download(timeout)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            if not os.path.exists(path):
+                raise
+    with open(path, encoding="utf-8") as f:
+        return _parse_listing(f.read())
+
+
+def load_cached_universe():
+    """The last downloaded listing, however old, without touching the network; None if there is none."""
+    path = cache_path("nasdaqlisted.txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return _parse_listing(f.read())
+
+
+def load_snapshot():
+    """The listing snapshot shipped with TradeSense, for when no download has ever succeeded."""
+    with open(SNAPSHOT_PATH, encoding="utf-8") as f:
+        return _parse_listing(f.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the bundled NASDAQ listing snapshot.")
+    parser.add_argument("--timeout", type=float, default=30, help="download timeout in seconds (default: %(default)s)")
+    args = parser.parse_args(argv)
+    text = _download(args.timeout)
+    listing = _parse_listing(text)  # refuse to overwrite the snapshot with something unparseable
+    with open(SNAPSHOT_PATH, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    print(f"Wrote {len(listing)} symbols to {SNAPSHOT_PATH}")
+
+
+if __name__ == "__main__":
+    main()